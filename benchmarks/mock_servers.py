@@ -0,0 +1,331 @@
+"""Local stand-ins for the source APIs, serving synthetic parcels.
+
+One threaded HTTP server answers all three APIs:
+
+- ArcGIS FeatureServer: ``/arcgis/rest/services/Parcels/FeatureServer/0``
+  (``?f=pjson``) and ``.../0/query`` with ``returnCountOnly``,
+  ``returnIdsOnly``, ``resultOffset``/``resultRecordCount`` paging, object ID
+  ranges and ``<edit field> >= TIMESTAMP '...'`` filters.
+- Tulsa Modeling: ``/Modeling/GetAllValidSales``,
+  ``/Modeling/GetAllLandLotParcelCharacteristics`` and
+  ``/Modeling/GetAllActualAndAssessedValues`` (Bearer token, optional
+  ``lastModified``), streamed as one chunked JSON array.
+- PVDNet: ``/pvdnetapi/v1/authenticate``, ``/pvdnetapi/v1/adhoc/tables`` and
+  ``/pvdnetapi/v1/adhoc/tables/query``, understanding the ``SELECT *``,
+  ``TOP n ... WHERE key > x ORDER BY key``, ``TOP 1`` and ``ORDER BY
+  <columns> OFFSET/FETCH`` forms the Wayne KY ETL sends.
+
+Records are generated from their index, so a 5M-record layer costs no
+memory. ``latency`` delays every response and ``error_rate`` answers that
+fraction of requests with a 503 instead.
+"""
+import re
+import sys
+import json
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+ARCGIS_LAYER = '/arcgis/rest/services/Parcels/FeatureServer/0'
+TULSA_ENDPOINTS = ('GetAllValidSales', 'GetAllLandLotParcelCharacteristics', 'GetAllActualAndAssessedValues')
+PVDNET_BASE = '/pvdnetapi/v1'
+PVDNET_TABLES = ('PARCEL', 'OWNER', 'SALES')
+TOKEN = 'bench-token'
+
+EPOCH_MS = 1577836800000  # 2020-01-01, edit date of record 0
+GRID = 2000
+CELL = 0.0005
+FIRST_NAMES = ('JOHN', 'MARY', 'JAMES', 'PATRICIA', 'ROBERT', 'LINDA', 'MICHAEL', 'BARBARA')
+LAST_NAMES = ('SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'GARCIA', 'MILLER', 'DAVIS', 'WILSON')
+STREETS = ('MAIN STREET', 'Oak Ave.', 'PINE ROAD', 'Elm St', 'CEDAR LANE', 'Maple Drive')
+
+def _owner(i):
+    n = (i * 7919) % 4000
+    first, last = FIRST_NAMES[n % len(FIRST_NAMES)], LAST_NAMES[n % len(LAST_NAMES)]
+    # Spell some owners differently so owner normalization has work to do.
+    name = f'{last}, {first.title()} {n}' if i % 3 == 0 else f'{last} {first} {n}'
+    return name, f'{100 + n % 900} {STREETS[n % len(STREETS)]}'
+
+def parcel_attributes(i):
+    name, address = _owner(i)
+    return {
+        'OBJECTID': i,
+        'PARCEL_ID': f'P{i:09d}',
+        'OWNER_NAME': name,
+        'OWNER_ADDRESS': address,
+        'LAND_VALUE': round(1000 + (i * 37) % 250000 * 1.5, 2),
+        'ACRES': round(0.1 + (i % 500) / 100, 3),
+        'EditDate': EPOCH_MS + i * 1000,
+    }
+
+def parcel_geometry(i):
+    """A clockwise (ESRI shell) square on a grid around Bossier City."""
+    x = -93.75 + (i % GRID) * CELL
+    y = 32.50 + (i // GRID) * CELL
+    d = CELL * 0.9
+    return {'rings': [[[x, y], [x, y + d], [x + d, y + d], [x + d, y], [x, y]]]}
+
+def tulsa_record(i, endpoint):
+    name, address = _owner(i)
+    record = {'ParcelNumber': f'{i:05d}-{i % 97:02d}-{i % 13:02d}', 'OwnerName': name, 'Address': address}
+    if endpoint == 'GetAllValidSales':
+        record.update(SaleDate=f'2024-{1 + i % 12:02d}-{1 + i % 28:02d}', SalePrice=50000 + (i * 131) % 900000)
+    elif endpoint == 'GetAllActualAndAssessedValues':
+        record.update(ActualValue=60000 + (i * 17) % 500000, AssessedValue=6000 + (i * 17) % 50000)
+    else:
+        record.update(LotSqFt=4000 + i % 20000, LandUse=('RES', 'COM', 'AG')[i % 3])
+    return record
+
+def pvdnet_row(table, i):
+    name, address = _owner(i)
+    if table == 'OWNER':
+        return {'OwnerId': i, 'Name': name, 'MailingAddress': address}
+    if table == 'SALES':
+        return {'SaleId': i, 'ParcelId': f'P{i:09d}', 'Price': 40000 + (i * 53) % 700000}
+    return {'ParcelId': f'P{i:09d}', 'Acres': round(0.1 + (i % 500) / 100, 3), 'District': i % 40}
+
+
+class MockState:
+    def __init__(self, records, page_size=2000, latency=0.0, error_rate=0.0, seed=0):
+        self.records = records
+        self.page_size = page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            fail = self.error_rate and self.random.random() < self.error_rate
+            self.errors += int(bool(fail))
+            return fail
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _send_json(self, obj, status=200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_array(self, items, flush_every=1000):
+        """Stream an iterable as one JSON array using chunked transfer encoding."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        buf = ['[']
+        for n, item in enumerate(items):
+            buf.append((',' if n else '') + json.dumps(item))
+            if len(buf) >= flush_every:
+                self._chunk(''.join(buf))
+                buf = []
+        buf.append(']')
+        self._chunk(''.join(buf))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def _begin(self):
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        if self.state.should_fail():
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return False
+        return True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        path = parts.path.rstrip('/')
+        if not self._begin():
+            return
+        if path == ARCGIS_LAYER:
+            return self._send_json(self.arcgis_meta())
+        if path == f'{ARCGIS_LAYER}/query':
+            return self.arcgis_query(query)
+        if path.startswith('/Modeling/') and path.rsplit('/', 1)[1] in TULSA_ENDPOINTS:
+            if self.headers.get('Authorization') != f'Bearer {TOKEN}':
+                return self._send_json({'error': 'unauthorized'}, 401)
+            return self.tulsa(path.rsplit('/', 1)[1], query.get('lastModified'))
+        if path == f'{PVDNET_BASE}/adhoc/tables':
+            if self.headers.get('AccessToken') != TOKEN:
+                return self._send_json({'error': 'unauthorized'}, 401)
+            return self._send_json({'tables': [{'name': t} for t in PVDNET_TABLES]})
+        self._send_json({'error': f'no route for {path}'}, 404)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.rstrip('/')
+        body = self._body()
+        if not self._begin():
+            return
+        if path == f'{PVDNET_BASE}/authenticate':
+            return self._send_json({'token': TOKEN, 'resourceGroups': ['Adhoc']})
+        if path == f'{PVDNET_BASE}/adhoc/tables/query':
+            if self.headers.get('AccessToken') != TOKEN:
+                return self._send_json({'error': 'unauthorized'}, 401)
+            return self.pvdnet_query((body or {}).get('Query', ''))
+        self._send_json({'error': f'no route for {path}'}, 404)
+
+    # ArcGIS
+
+    def arcgis_meta(self):
+        fields = [
+            ('OBJECTID', 'esriFieldTypeOID'), ('PARCEL_ID', 'esriFieldTypeString'),
+            ('OWNER_NAME', 'esriFieldTypeString'), ('OWNER_ADDRESS', 'esriFieldTypeString'),
+            ('LAND_VALUE', 'esriFieldTypeDouble'), ('ACRES', 'esriFieldTypeDouble'),
+            ('EditDate', 'esriFieldTypeDate'),
+        ]
+        return {
+            'name': 'Parcels', 'geometryType': 'esriGeometryPolygon', 'objectIdField': 'OBJECTID',
+            'capabilities': 'Query', 'maxRecordCount': self.state.page_size,
+            'extent': {'spatialReference': {'wkid': 4326, 'latestWkid': 4326}},
+            'editFieldsInfo': {'editDateField': 'EditDate'},
+            'fields': [{'name': n, 'type': t, 'alias': n} for n, t in fields],
+        }
+
+    def arcgis_query(self, q):
+        n = self.state.records
+        if q.get('returnCountOnly') == 'true':
+            return self._send_json({'count': n})
+        if q.get('returnIdsOnly') == 'true':
+            body = ('{"objectIdFieldName": "OBJECTID", "objectIds": ['
+                    + ','.join(map(str, range(1, n + 1))) + ']}').encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        lo, hi = 1, n
+        where = q.get('where', '1=1')
+        m = re.search(r'OBJECTID >= (\d+) AND OBJECTID <= (\d+)', where)
+        if m:
+            lo, hi = max(lo, int(m.group(1))), min(hi, int(m.group(2)))
+        m = re.search(r"(\w+) >= TIMESTAMP '([^']+)'", where)
+        if m:
+            since = datetime.strptime(m.group(2), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+            lo = max(lo, -(-(int(since.timestamp() * 1000) - EPOCH_MS) // 1000))
+        offset = int(q.get('resultOffset') or 0)
+        count = min(int(q.get('resultRecordCount') or self.state.page_size), self.state.page_size)
+        start = lo + offset
+        stop = min(hi + 1, start + count)
+        ids = range(start, stop)
+        self._send_json({
+            'objectIdFieldName': 'OBJECTID',
+            'geometryType': 'esriGeometryPolygon',
+            'spatialReference': {'wkid': 4326},
+            'features': [{'attributes': parcel_attributes(i), 'geometry': parcel_geometry(i)} for i in ids],
+            'exceededTransferLimit': stop <= hi,
+        })
+
+    # Tulsa
+
+    def tulsa(self, endpoint, last_modified):
+        n = self.state.records
+        # A lastModified filter returns the most recent tenth.
+        start = n - n // 10 if last_modified else 0
+        self._send_array(tulsa_record(i, endpoint) for i in range(start, n))
+
+    # PVDNet
+
+    def pvdnet_query(self, sql):
+        n = self.state.records
+        m = re.match(r'SELECT TOP (\d+) \* FROM (\w+)(?: WHERE \w+ > (\d+))?(?: ORDER BY \w+)?$', sql)
+        if m:
+            start = int(m.group(3)) + 1 if m.group(3) else 0
+            table, stop = m.group(2), min(n, start + int(m.group(1)))
+        else:
+            # Rows are generated in the order of every column, so any ORDER BY is honoured.
+            m = re.match(r'SELECT \* FROM (\w+) ORDER BY .+ OFFSET (\d+) ROWS FETCH NEXT (\d+) ROWS ONLY$', sql)
+            if m:
+                table, start = m.group(1), int(m.group(2))
+                stop = min(n, start + int(m.group(3)))
+            else:
+                m = re.match(r'SELECT \* FROM (\w+)$', sql)
+                if not m:
+                    return self._send_json({'error': f'unsupported query: {sql}'}, 400)
+                table, start, stop = m.group(1), 0, n
+        if table not in PVDNET_TABLES:
+            return self._send_json({'error': f'unknown table {table}'}, 400)
+        self._send_array(pvdnet_row(table, i) for i in range(start, stop))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping pooled keep-alive connections is expected, not worth a traceback.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockServer:
+    """Run :class:`MockHandler` on a free localhost port in a background thread."""
+
+    def __init__(self, records, page_size=2000, latency=0.0, error_rate=0.0, seed=0, port=0):
+        self.state = MockState(records, page_size, latency, error_rate, seed)
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self.httpd = _Server(('127.0.0.1', self.port), MockHandler)
+        self.httpd.state = self.state
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='mock-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def arcgis_url(self):
+        return self.url + ARCGIS_LAYER
+
+    @property
+    def pvdnet_url(self):
+        return self.url + PVDNET_BASE
+
+    def tulsa_url(self, endpoint='GetAllValidSales'):
+        return f'{self.url}/Modeling/{endpoint}'
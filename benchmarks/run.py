@@ -0,0 +1,248 @@
+"""End-to-end benchmarks against the local mock servers.
+
+    python -m benchmarks.run --records 100000 --latency 0.02 --error-rate 0.01
+    python -m benchmarks.run --records 1000000 --sources arcgis --report bench.json --baseline old.json
+
+Each source runs extract -> transform -> load exactly as a real config
+would, in a fresh working directory and (by default) a fresh process, so
+the reported peak RSS belongs to that source alone. The report has
+records/sec, peak RSS, HTTP counters and the per-stage metrics for each
+source. With ``--baseline`` a previous report is compared and the exit
+status is 1 when throughput drops or memory grows by more than
+``--tolerance``.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+import yaml
+
+from benchmarks.mock_servers import MockServer, ARCGIS_LAYER, PVDNET_BASE, TOKEN
+
+SOURCES = ('arcgis', 'tulsa', 'wayne')
+# Stage whose record count is the source's throughput numerator.
+RECORD_STAGES = {'arcgis': 'transform', 'tulsa': 'fetch_write', 'wayne': 'table'}
+# Retry quickly: injected errors should cost a round trip, not the production backoff.
+HTTP = {'backoff': 0.01, 'max_backoff': 0.1, 'max_retries': 8}
+
+def source_config(source, base_url, workers=4, http_cache=None, transform_workers=1):
+    """A jurisdiction config for ``source`` pointed at the mock server at ``base_url``."""
+    cfg = _source_config(source, base_url, workers)
+    if source == 'arcgis':
+        cfg['transform_workers'] = transform_workers
+    if http_cache:
+        cfg['http']['cache'] = dict(http_cache)
+    return cfg
+
+def _source_config(source, base_url, workers):
+    if source == 'arcgis':
+        try:
+            import pyarrow  # noqa: F401
+            parquet = 'output/bench.parquet'
+        except ImportError:
+            parquet = None
+        return {
+            'name': 'bench_arcgis', 'api_type': 'bossier', 'url': base_url + ARCGIS_LAYER,
+            'primary_key': ['PARCEL_ID'], 'deduplicate': True, 'owners': True, 'max_workers': workers,
+            'http': dict(HTTP), 'features_path': 'output/features.cache',
+            'output': {'geopackage': 'output/bench.gpkg', 'parquet': parquet},
+        }
+    if source == 'tulsa':
+        return {
+            'name': 'bench_tulsa', 'api_type': 'tulsa', 'url': f'{base_url}/Modeling/GetAllValidSales',
+            'token': 'TULSA_ASSESSOR_TOKEN', 'stream': True, 'http': dict(HTTP),
+            'output': {'json': 'output/tulsa.json', 'csv': 'output/tulsa.csv'},
+        }
+    if source == 'wayne':
+        return {
+            'name': 'bench_wayne', 'api_type': 'wayne_ky', 'api_base_url': base_url + PVDNET_BASE,
+            'username_env': 'BENCH_PVDNET_USER', 'password_env': 'BENCH_PVDNET_PASS',
+            'extract_all_tables': True, 'adhoc_chunk_size': 50000, 'adhoc_chunk_keys': {'OWNER': 'OwnerId'},
+            'max_workers': min(workers, 3), 'http': dict(HTTP),
+        }
+    raise ValueError(f"Unknown benchmark source: {source}")
+
+def run_source(source, base_url, workdir, workers=4, http_cache=None, transform_workers=1):
+    """Run one source end to end inside ``workdir``; returns its report entry."""
+    from customer_data.config import load_config
+    from customer_data.extract import extract_all
+    from customer_data.metrics import configure_metrics, peak_rss
+    from customer_data.transport import configure_http_client
+    os.environ.setdefault('TULSA_ASSESSOR_TOKEN', TOKEN)
+    os.environ.setdefault('BENCH_PVDNET_USER', 'bench')
+    os.environ.setdefault('BENCH_PVDNET_PASS', 'bench')
+    cwd = os.getcwd()
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    try:
+        config_path = f'{source}.yaml'
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(source_config(source, base_url, workers, http_cache, transform_workers), f)
+        cfg = load_config(config_path)
+        client = configure_http_client(cfg)
+        metrics = configure_metrics({'metrics': {'json_log': 'metrics.jsonl'}})
+        rss_before = peak_rss()
+        started = time.perf_counter()
+        status, error = 'ok', None
+        try:
+            if source == 'arcgis':
+                from customer_data.__main__ import handle_arcgis
+                handle_arcgis(cfg)
+            else:
+                extract_all(cfg, '.checkpoint')
+        except Exception as e:
+            status, error = 'failed', f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - started
+        snapshot = metrics.finish(client)
+    finally:
+        os.chdir(cwd)
+    stages = snapshot['stages']
+    if status == 'ok' and any(s['errors'] for s in stages):
+        status, error = 'failed', 'stage errors: ' + ', '.join(s['stage'] for s in stages if s['errors'])
+    records = sum(s['records'] for s in stages if s['stage'] == RECORD_STAGES[source])
+    http = (snapshot['http'] or {}).get('total', {})
+    return {
+        'source': source,
+        'status': status,
+        'error': error,
+        'records': records,
+        'seconds': round(seconds, 3),
+        'records_per_sec': round(records / seconds, 1) if seconds > 0 else None,
+        'peak_rss_bytes': snapshot['peak_rss_bytes'],
+        'baseline_rss_bytes': rss_before,
+        'http': http,
+        'stages': stages,
+    }
+
+def _child(queue, *args):
+    try:
+        queue.put(run_source(*args))
+    except BaseException as e:
+        queue.put({'source': args[0], 'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+
+def run_isolated(source, base_url, workdir, workers=4, http_cache=None, transform_workers=1):
+    """``run_source`` in a freshly spawned interpreter, so peak RSS is per source."""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, source, base_url, workdir, workers, http_cache,
+                                                    transform_workers))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+def run_benchmarks(sources=SOURCES, records=10000, latency=0.0, error_rate=0.0, page_size=2000,
+                   workers=4, isolate=True, workdir=None, keep=False, http_cache=None, port=0,
+                   transform_workers=1):
+    """Start a mock server, run each source against it and return the report.
+
+    ``http_cache`` (``ResponseCache`` options) records responses on one run
+    and replays them on the next, timing the pipeline without the server;
+    cached URLs include the server's ``port``, so both runs need the same one.
+    """
+    root = workdir or tempfile.mkdtemp(prefix='customer-data-bench-')
+    results = []
+    try:
+        with MockServer(records, page_size, latency, error_rate, port=port) as server:
+            for source in sources:
+                print(f"Benchmarking {source}: {records} records, latency {latency}s, error rate {error_rate}")
+                run = run_isolated if isolate else run_source
+                result = run(source, server.url, os.path.join(root, source), workers, http_cache, transform_workers)
+                results.append(result)
+                print(f"  {source}: {result['status']} {result.get('records', 0)} records in "
+                      f"{result.get('seconds', 0):.1f}s ({result.get('records_per_sec') or 0:.0f}/s), "
+                      f"peak RSS {(result.get('peak_rss_bytes') or 0) / 2**20:.0f} MiB")
+            requests, errors = server.state.requests, server.state.errors
+    finally:
+        if not keep and workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return {
+        'records': records,
+        'latency': latency,
+        'error_rate': error_rate,
+        'page_size': page_size,
+        'workers': workers,
+        'transform_workers': transform_workers,
+        'http_cache': (http_cache or {}).get('mode'),
+        'server': {'requests': requests, 'injected_errors': errors},
+        'python': sys.version.split()[0],
+        'sources': results,
+    }
+
+def compare(report, baseline, tolerance=0.2):
+    """Regressions of ``report`` against ``baseline``: lower records/sec or
+    higher peak RSS by more than ``tolerance`` (a fraction)."""
+    previous = {r['source']: r for r in baseline.get('sources', [])}
+    regressions = []
+    for r in report['sources']:
+        old = previous.get(r['source'])
+        if not old or old.get('status') != 'ok':
+            continue
+        if r['status'] != 'ok':
+            regressions.append(f"{r['source']}: {r['status']} ({r['error']})")
+            continue
+        if old.get('records_per_sec') and r['records_per_sec'] < old['records_per_sec'] * (1 - tolerance):
+            regressions.append(f"{r['source']}: {r['records_per_sec']:.0f} records/s, "
+                               f"was {old['records_per_sec']:.0f}")
+        if old.get('peak_rss_bytes') and r['peak_rss_bytes'] > old['peak_rss_bytes'] * (1 + tolerance):
+            regressions.append(f"{r['source']}: peak RSS {r['peak_rss_bytes'] / 2**20:.0f} MiB, "
+                               f"was {old['peak_rss_bytes'] / 2**20:.0f} MiB")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description='Benchmark extract/transform/load against local mock APIs.')
+    parser.add_argument('--records', type=int, default=10000, help='synthetic records per source (default 10000)')
+    parser.add_argument('--sources', default=','.join(SOURCES), help='comma-separated: arcgis, tulsa, wayne')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--page-size', type=int, default=2000, help='ArcGIS maxRecordCount (default 2000)')
+    parser.add_argument('--workers', type=int, default=4, help='max_workers for the ETLs (default 4)')
+    parser.add_argument('--transform-workers', type=int, default=1,
+                        help='processes for the ArcGIS transform (default 1)')
+    parser.add_argument('--report', help='write the JSON report here')
+    parser.add_argument('--baseline', help='previous report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression fraction (default 0.2)')
+    parser.add_argument('--workdir', help='keep outputs in this directory instead of a temporary one')
+    parser.add_argument('--http-cache', choices=('record', 'replay', 'revalidate'),
+                        help='record responses, or replay them instead of querying the mock server')
+    parser.add_argument('--http-cache-path', default='.bench_http_cache', help='HTTP cache directory')
+    parser.add_argument('--port', type=int, help='mock server port (default: 8765 with --http-cache, else any)')
+    parser.add_argument('--in-process', action='store_true', help='run sources in this process (shared peak RSS)')
+    args = parser.parse_args(argv)
+    sources = [s.strip() for s in args.sources.split(',') if s.strip()]
+    for source in sources:
+        if source not in SOURCES:
+            parser.error(f"unknown source {source!r}")
+    http_cache = None
+    if args.http_cache:
+        http_cache = {'mode': args.http_cache, 'path': os.path.abspath(args.http_cache_path)}
+    report = run_benchmarks(sources, args.records, args.latency, args.error_rate, args.page_size,
+                            args.workers, isolate=not args.in_process, workdir=args.workdir,
+                            http_cache=http_cache, port=args.port or (8765 if http_cache else 0),
+                            transform_workers=args.transform_workers)
+    if args.report:
+        dir_path = os.path.dirname(args.report)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote benchmark report to {args.report}")
+    failed = [r['source'] for r in report['sources'] if r['status'] != 'ok']
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}")
+    return 1 if failed or regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
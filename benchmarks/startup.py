@@ -0,0 +1,94 @@
+"""Cold-start benchmark for the CLI and each jurisdiction's ETL import.
+
+    python -m benchmarks.startup --runs 10 --max-ms 400 --report startup.json
+
+Every sample is a fresh interpreter, as for a cron invocation. ``cli`` runs
+``python -m customer_data`` up to its usage message; ``etl:<api_type>``
+imports the CLI and resolves that jurisdiction's ETL class, and records
+which heavy libraries that pulled in. The exit status is 1 when a median
+exceeds ``--max-ms`` or a jurisdiction imports a heavy library it does not
+need.
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+HEAVY = ('numpy', 'pandas', 'geopandas', 'shapely', 'pyarrow', 'aiohttp')
+# Heavy libraries each jurisdiction may import just to start.
+ALLOWED_HEAVY = {'bossier': {'numpy'}}
+
+PROBE = """
+import sys, json
+import customer_data.__main__
+from customer_data.extract import get_etl_class
+get_etl_class({api_type!r})
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+def sample(args):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable] + args, capture_output=True, text=True)
+    return (time.perf_counter() - started) * 1000, proc
+
+def measure(name, args, runs):
+    times, proc = [], None
+    for _ in range(runs):
+        ms, proc = sample(args)
+        times.append(ms)
+    return {'scenario': name, 'median_ms': round(statistics.median(times), 1), 'min_ms': round(min(times), 1),
+            'max_ms': round(max(times), 1)}, proc
+
+def run_startup(api_types=None, runs=5):
+    from customer_data.registry import available_api_types
+    api_types = api_types or available_api_types()
+    results = []
+    result, _ = measure('python', ['-c', 'pass'], runs)
+    results.append(result)
+    result, _ = measure('cli', ['-m', 'customer_data'], runs)
+    results.append(result)
+    for api_type in api_types:
+        result, proc = measure(f'etl:{api_type}', ['-c', PROBE.format(api_type=api_type, heavy=HEAVY)], runs)
+        if proc.returncode != 0:
+            result['error'] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'
+        else:
+            result['heavy_imports'] = json.loads(proc.stdout.strip().splitlines()[-1])
+            result['unexpected'] = sorted(set(result['heavy_imports']) - ALLOWED_HEAVY.get(api_type, set()))
+        results.append(result)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per scenario (default 5)')
+    parser.add_argument('--api-types', help='comma-separated api_types (default: all registered)')
+    parser.add_argument('--max-ms', type=float, help='fail when a median exceeds this many milliseconds')
+    parser.add_argument('--report', help='write the JSON results here')
+    args = parser.parse_args(argv)
+    api_types = [t.strip() for t in args.api_types.split(',')] if args.api_types else None
+    results = run_startup(api_types, args.runs)
+    failed = False
+    for r in results:
+        notes = []
+        if r.get('heavy_imports'):
+            notes.append(f"imports {', '.join(r['heavy_imports'])}")
+        if r.get('unexpected'):
+            notes.append("UNEXPECTED")
+            failed = True
+        if r.get('error'):
+            notes.append(r['error'])
+            failed = True
+        if args.max_ms and r['scenario'] != 'python' and r['median_ms'] > args.max_ms:
+            notes.append(f"over {args.max_ms:.0f} ms")
+            failed = True
+        print(f"  {r['scenario']:<20} {r['median_ms']:>8.1f} ms  (min {r['min_ms']:.1f}, max {r['max_ms']:.1f})  "
+              + '; '.join(notes))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote startup report to {args.report}")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,9 @@
 import sys
 import os
 import json
-import csv
 from .config import load_config
-from .extract import extract_all, extract_tulsa
+from .extract import extract_all
+from .metrics import configure_metrics, get_metrics
 
 def ensure_dir_exists(file_path):
     dir_path = os.path.dirname(file_path)
@@ -11,130 +11,164 @@ def ensure_dir_exists(file_path):
         os.makedirs(dir_path, exist_ok=True)
         print(f"Created directory: {dir_path}")
 
-def handle_tulsa(cfg, last_modified_override=None, data_type=None):
-    """Handle Tulsa data extraction and output directly"""
+def handle_tulsa(cfg, last_modified_override=None, data_type=None, checkpoint_file='.checkpoint', extract=extract_all):
+    """Handle Tulsa data extraction and output. The ETL picks the URL for
+    ``data_type`` and writes the configured JSON/CSV/Parquet outputs itself,
+    streamed or synced incrementally as the config asks."""
     print("Starting Tulsa extraction")
     if data_type:
         cfg['data_type'] = data_type
     if last_modified_override:
         cfg['last_modified'] = last_modified_override
         print(f"Using last_modified override: {last_modified_override}")
-    
-    # set the URL based on data type selection
-    if data_type == "all" and 'url_all' in cfg:
-        cfg['url'] = cfg['url_all']
-        print("Using 'all' data URL")
-        print(f"URL: {cfg['url']}")
-    elif data_type == "values" and 'url_values' in cfg:
-        cfg['url'] = cfg['url_values']
-        print("Using 'values' data URL")
-        print(f"URL: {cfg['url']}")
-    elif data_type == "sales" or data_type is None:
-        print("Using 'sales' data URL")
-        print(f"URL: {cfg['url']}")
-    else:
-        print(f"Invalid data_type: {data_type}. Using 'sales' data URL")
-        print(f"URL: {cfg['url']}")
-    
-    data = extract_tulsa(cfg, '.checkpoint')
-    out = cfg['output']
-    
-    # JSON
-    if out.get('json'):
-        json_path = out['json']
-        ensure_dir_exists(json_path)
-        print(f"Writing JSON to {json_path}")
-        with open(json_path, 'w') as f:
-            json.dump(data, f, indent=2)
-    
-    # CSV 
-    if out.get('csv') and data:
-        csv_path = out['csv']
-        ensure_dir_exists(csv_path)
-        print(f"Writing CSV to {csv_path}")
-    
-        all_keys = set()
-        for record in data:
-            all_keys.update(record.keys())
-        
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(data)
+    if cfg.get('data_type') not in (None, 'sales', 'all', 'values'):
+        print(f"Invalid data_type: {cfg['data_type']}. Using 'sales' data URL")
+        cfg['data_type'] = None
+    return extract(cfg, checkpoint_file)
 
-def handle_arcgis(cfg):
+def handle_arcgis(cfg, checkpoint_file='.checkpoint', extract=extract_all):
     """Handle ArcGIS data extraction and processing"""
     # Import geopandas-dependent modules only when needed
-    from .transform import features_to_gdf, deduplicate_gdf, extract_owners
-    from .load import write_geopackage, write_postgis
+    from .transform import features_to_gdf, deduplicate_gdf, build_owner_index
+    from .load import write_geopackage, write_postgis, write_geoparquet
+    from .feature_cache import FeatureCache, is_feature_cache, remove_feature_cache, write_feature_cache
+    from .parallel_transform import cache_to_gdf_parallel, features_to_gdf_parallel
     import pandas as pd
     
+    def stage(name, **fields):
+        return get_metrics().stage(name, cfg.get('name') or cfg.get('api_type'), **fields)
+
     cache_mode = cfg.get('features_cache', 'new')
-    features_path = cfg.get('features_path', 'features.json')
+    features_path = cfg.get('features_path', 'features.cache')
     ensure_dir_exists(features_path)
     
-    if cache_mode == 'load' and os.path.exists(features_path):
+    workers = cfg['transform_workers']
+    chunk_rows = cfg['transform_chunk_rows']
+    owners = owner_parcels = None
+
+    def cache_to_gdf():
+        """``(gdf, owners, owner_parcels)`` from the feature cache; owners are only
+        built here, per chunk, when the transform runs on a process pool."""
+        if workers > 1:
+            print(f"Transforming on {workers} processes")
+            return cache_to_gdf_parallel(features_path, workers, chunk_rows, cfg['primary_key'], owners=cfg['owners'])
+        return FeatureCache(features_path).to_gdf(), None, None
+
+    if cache_mode == 'load' and is_feature_cache(features_path):
+        print(f"Loading cached features from {features_path}")
+        with stage('transform') as m:
+            gdf, owners, owner_parcels = cache_to_gdf()
+            m['records'] = len(gdf)
+    elif cache_mode == 'load' and os.path.isfile(features_path):
+        # JSON cache written by older versions
         print(f"Loading meta and features from {features_path}")
         with open(features_path) as f:
             cache = json.load(f)
-        meta = cache['meta']
-        features = cache['features']
+        with stage('transform') as m:
+            if workers > 1:
+                gdf, owners, owner_parcels = features_to_gdf_parallel(
+                    cache['meta'], cache['features'], workers, chunk_rows, cfg['primary_key'],
+                    deduplicate=cfg['deduplicate'], owners=cfg['owners'])
+            else:
+                gdf = features_to_gdf(cache['meta'], cache['features'])
+                if cfg['deduplicate']:
+                    gdf = deduplicate_gdf(gdf, cfg['primary_key'])
+            m['records'] = len(gdf)
     else:
-        meta, features = extract_all(cfg, '.checkpoint')
-        print(f"Saving meta and features to {features_path}")
-        with open(features_path, 'w') as f:
-            json.dump({'meta': meta, 'features': features}, f)
-    gdf = features_to_gdf(meta, features)
-    if cfg['deduplicate']:
-        gdf = deduplicate_gdf(gdf, cfg['primary_key'])
-    owners = extract_owners(gdf) if cfg['owners'] else None
+        remove_feature_cache(features_path)
+        # The Bossier ETL streams pages into the cache and returns a count; other ETLs return the features.
+        meta, features = extract(dict(cfg, features_path=features_path), checkpoint_file)
+        if not is_feature_cache(features_path) and isinstance(features, list):
+            print(f"Saving feature cache to {features_path}")
+            write_feature_cache(features_path, meta, features)
+        del features
+        with stage('transform') as m:
+            gdf, owners, owner_parcels = cache_to_gdf()
+            m['records'] = len(gdf)
+    if cfg['owners'] and owners is None:
+        with stage('owners') as m:
+            owners, owner_parcels = build_owner_index(gdf, cfg['primary_key'])
+            m['records'] = len(owners)
     out = cfg['output']
     if out.get('geopackage'):
         ensure_dir_exists(out['geopackage'])
         print("Writing GeoPackage")
-        write_geopackage(gdf, owners if owners is not None else pd.DataFrame(), out['geopackage'])
+        with stage('load_geopackage') as m:
+            write_geopackage(gdf, owners if owners is not None else pd.DataFrame(), out['geopackage'],
+                             owner_parcels=owner_parcels, primary_key=cfg['primary_key'])
+            m['records'] = len(gdf)
+            m['bytes'] = os.path.getsize(out['geopackage'])
+    if out.get('parquet'):
+        ensure_dir_exists(out['parquet'])
+        print("Writing GeoParquet")
+        with stage('load_parquet') as m:
+            write_geoparquet(gdf, owners, out['parquet'], owner_parcels=owner_parcels)
+            m['records'] = len(gdf)
+            m['bytes'] = os.path.getsize(out['parquet'])
     if out.get('postgres', {}).get('dsn'):
         print("Writing PostGIS")
-        write_postgis(gdf, owners, out['postgres']['dsn'])
+        pg = out['postgres']
+        with stage('load_postgis') as m:
+            write_postgis(gdf, owners, pg['dsn'], pg.get('load_mode', 'replace'), cfg['primary_key'], owner_parcels)
+            m['records'] = len(gdf)
+    if out.get('spatial_index'):
+        from .spatial_index import build_spatial_index
+        print("Building spatial index")
+        with stage('spatial_index') as m:
+            build_spatial_index(gdf, out['spatial_index'], cfg['primary_key'])
+            m['records'] = len(gdf)
 
-def handle_wayne_ky(cfg):
-    """Handle Wayne, KY data extraction and output"""
-    from .extract import extract_wayne_ky
+def handle_wayne_ky(cfg, checkpoint_file='.checkpoint', extract=extract_all):
+    """Handle Wayne, KY data extraction and output. The ETL writes the Adhoc
+    tables listing, query results and table exports under output/ky/wayne."""
     print("Starting Wayne, KY extraction")
-    data = extract_wayne_ky(cfg, '.checkpoint')
-    out = cfg.get('output', {})
-    # JSON
-    if out.get('json'):
-        json_path = out['json']
-        ensure_dir_exists(json_path)
-        print(f"Writing JSON to {json_path}")
-        with open(json_path, 'w') as f:
-            json.dump(data, f, indent=2)
-    # CSV (if data is a list of dicts)
-    if out.get('csv') and isinstance(data, list) and data:
-        csv_path = out['csv']
-        ensure_dir_exists(csv_path)
-        print(f"Writing CSV to {csv_path}")
-        all_keys = set()
-        for record in data:
-            all_keys.update(record.keys())
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
-            writer.writeheader()
-            writer.writerows(data)
+    return extract(cfg, checkpoint_file)
+
+def is_arcgis(cfg):
+    """True when the config's ETL extracts an ArcGIS layer (Bossier or a subclass)."""
+    if cfg.get('api_type') in ('tulsa', 'wayne_ky'):
+        return False
+    from .extract import get_etl_class
+    from .etl.bossier_la import BossierETL
+    return issubclass(get_etl_class(cfg.get('api_type'), cfg.get('engine', 'sync'), cfg), BossierETL)
+
+def run_jurisdiction(cfg, checkpoint_file='.checkpoint', extract=extract_all):
+    """Extract one jurisdiction and write all of its configured outputs.
+
+    ``extract(cfg, checkpoint_file)`` runs the ETL; batch runs on the async
+    engine pass one that hands it to their event loop.
+    """
+    api_type = cfg.get('api_type')
+    if api_type == 'tulsa':
+        return handle_tulsa(cfg, checkpoint_file=checkpoint_file, extract=extract)
+    if api_type == 'wayne_ky':
+        return handle_wayne_ky(cfg, checkpoint_file, extract)
+    if is_arcgis(cfg):
+        return handle_arcgis(cfg, checkpoint_file, extract)
+    return extract(cfg, checkpoint_file)
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == 'batch':
+        from .batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) >= 2 and sys.argv[1] in ('index', 'query'):
+        from .spatial_index import build_main, main as query_main
+        sys.exit((build_main if sys.argv[1] == 'index' else query_main)(sys.argv[2:]))
     print("Starting main")
     try:
         print(f"sys.argv: {sys.argv}")
         if len(sys.argv) < 2 or len(sys.argv) > 4:
             print("Usage: python -m customer_data <config.yaml> [data_type] [last_modified_date]")
+            print("       python -m customer_data batch <config.yaml|dir> [...] [--max-in-flight N] [--max-per-host N] [--engine async]")
+            print("       python -m customer_data index <features.gpkg|.parquet|cache> <index_dir> [--key COLUMN ...]")
+            print("       python -m customer_data query <index_dir> [--point X,Y ...] [--points FILE.csv] [--bbox ...]")
             print("  data_type: Optional - 'sales', 'all', or 'values' for Tulsa API (default: 'sales')")
             print("  last_modified_date: Optional date for Tulsa API (MM-DD-YYYY format)")
             sys.exit(1)
         print("Loading config...")
         cfg = load_config(sys.argv[1])
-        print(f"Loaded config: {cfg}")
+        # Configs can hold tokens and database passwords, so only say which jurisdiction this is.
+        print(f"Loaded config: {cfg.get('name') or sys.argv[1]}")
         # Optionally handle data_type and last_modified_override for Tulsa
         data_type = None
         last_modified_override = None
@@ -146,8 +180,17 @@ def main():
             else:
                 last_modified_override = arg2
         print(f"api_type: {cfg.get('api_type')}")
-        from .extract import extract_all
-        extract_all(cfg, '.checkpoint')
+        if data_type:
+            cfg['data_type'] = data_type
+        if last_modified_override:
+            cfg['last_modified'] = last_modified_override
+        configure_metrics(cfg)
+        try:
+            run_jurisdiction(cfg)
+        finally:
+            from .transport import get_http_client
+            snapshot = get_metrics().finish(get_http_client())
+            print(f"Finished in {snapshot['seconds']:.1f}s, peak RSS {(snapshot['peak_rss_bytes'] or 0) / 2**20:.0f} MiB")
         print("Done")
         sys.exit(0)
     except Exception as e:
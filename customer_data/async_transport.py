@@ -0,0 +1,134 @@
+import json
+import time
+import asyncio
+from urllib.parse import urlsplit
+import requests
+from .transport import RETRY_STATUSES, _options, backoff_delay, get_http_client, retries_allowed
+
+def _aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("The async engine needs aiohttp: pip install 'customer-data[async]'") from None
+    return aiohttp
+
+
+class AsyncResponse:
+    """A fully read response with the parts of the ``requests.Response`` API the ETLs use."""
+
+    def __init__(self, url, status_code, reason, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8-sig'))
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}", response=self)
+
+
+class AsyncHttpClient:
+    """Asyncio counterpart of :class:`~customer_data.transport.HttpClient`.
+
+    One ``aiohttp`` session multiplexes every request of an event loop over
+    keep-alive connections, with the same timeouts, gzip/deflate negotiation
+    and jittered retries of connection errors and 429/5xx responses (idempotent
+    methods only, unless a request passes ``retry``).
+    ``max_in_flight`` and ``max_per_host`` become the connector's limits.
+    Requests are counted on ``counters`` (the process-wide
+    ``HttpClient`` by default), so ``stats()`` and the run metrics cover
+    both engines. The session belongs to the loop it was first used on;
+    ``close()`` it before that loop ends.
+    """
+
+    def __init__(self, connect_timeout=10, read_timeout=300, max_retries=5, backoff=0.5,
+                 max_backoff=60, pool_maxsize=10, max_per_host=None, max_in_flight=None,
+                 cache=None, counters=None):
+        self.aiohttp = _aiohttp()
+        if cache and cache.get('mode'):
+            print("Warning: the HTTP cache is not used by the async engine")
+        self.timeout = self.aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_per_host = max_per_host
+        self.max_in_flight = max_in_flight
+        self.counters = counters or get_http_client()
+        self._session = None
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls(**_options(cfg), counters=get_http_client(cfg))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None:
+            connector = self.aiohttp.TCPConnector(limit=self.max_in_flight or 0,
+                                                  limit_per_host=self.max_per_host or 0)
+            self._session = self.aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                       headers={'Accept-Encoding': 'gzip, deflate'})
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def request(self, method, url, params=None, json=None, data=None, headers=None, retry=None):
+        host = urlsplit(url).netloc
+        max_retries = self.max_retries if retries_allowed(method, retry) else 0
+        session = self._get_session()
+        if params:
+            params = {k: str(v) for k, v in params.items() if v is not None}
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with session.request(method, url, params=params, json=json, data=data,
+                                           headers=headers) as resp:
+                    body = await resp.read()
+                    result = AsyncResponse(str(resp.url), resp.status, resp.reason, resp.headers, body)
+                    wire = resp.content_length or len(body)
+            except (self.aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.counters.record(host, time.perf_counter() - started, 0, 0, error=True)
+                if attempt >= max_retries:
+                    raise
+                await self._wait(host, attempt)
+                attempt += 1
+                continue
+            self.counters.record(host, time.perf_counter() - started, len(body), wire)
+            if result.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                return result
+            print(f"HTTP {result.status_code} from {host}, retrying ({attempt + 1}/{max_retries})")
+            await self._wait(host, attempt, result.headers.get('Retry-After'))
+            attempt += 1
+
+    async def _wait(self, host, attempt, retry_after=None):
+        self.counters.count_retry(host)
+        await asyncio.sleep(backoff_delay(attempt, self.backoff, self.max_backoff, retry_after))
+
+    def stats(self):
+        return self.counters.stats()
@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .config import load_config
+from .transport import configure_http_client
+from .metrics import configure_metrics
+from .utils import ensure_dir_exists
+
+def collect_configs(paths):
+    """Expand files and directories into a sorted list of jurisdiction YAML paths.
+    ``template.yaml`` is skipped when a whole directory is given."""
+    configs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(('.yaml', '.yml')) and name != 'template.yaml':
+                    configs.append(os.path.join(path, name))
+        else:
+            configs.append(path)
+    return configs
+
+def checkpoint_files(config_paths):
+    """A separate checkpoint file per config, ``.checkpoint.<config stem>``, so
+    concurrent jurisdictions never share a checkpoint or its spool."""
+    files, seen = {}, {}
+    for path in config_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        n = seen[stem] = seen.get(stem, 0) + 1
+        files[path] = f'.checkpoint.{stem}' if n == 1 else f'.checkpoint.{stem}-{n}'
+    return files
+
+def run_one(config_path, checkpoint_file='.checkpoint', extract=None):
+    """Run one jurisdiction and write its outputs, as a single-config run does;
+    returns a report entry instead of raising."""
+    from .__main__ import run_jurisdiction
+    from .extract import extract_all
+    started = time.perf_counter()
+    entry = {'config': config_path, 'api_type': None, 'status': 'ok', 'seconds': 0.0, 'error': None}
+    try:
+        cfg = load_config(config_path)
+        entry['api_type'] = cfg.get('api_type')
+        print(f"[{config_path}] starting {entry['api_type']} extraction")
+        run_jurisdiction(cfg, checkpoint_file, extract or extract_all)
+    except BaseException as e:
+        # load_config calls sys.exit on invalid configs; keep that from ending the batch.
+        if isinstance(e, KeyboardInterrupt):
+            raise
+        entry['status'] = 'failed'
+        entry['error'] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    print(f"[{config_path}] {entry['status']} in {entry['seconds']:.1f}s")
+    return entry
+
+async def run_one_async(config_path, client, pool, checkpoint_file='.checkpoint'):
+    """``run_one`` sharing the async HTTP ``client``: the ETL runs on the
+    current event loop and the output steps on a thread of ``pool``."""
+    from .extract import extract_all_async
+    loop = asyncio.get_running_loop()
+
+    def extract(cfg, checkpoint_file):
+        return asyncio.run_coroutine_threadsafe(extract_all_async(cfg, checkpoint_file, client), loop).result()
+
+    return await loop.run_in_executor(pool, run_one, config_path, checkpoint_file, extract)
+
+async def run_all_async(config_paths, workers, http_cfg):
+    """Run every config on one event loop, ``workers`` at a time."""
+    from .async_transport import AsyncHttpClient
+    checkpoints = checkpoint_files(config_paths)
+    # Their own pool, so waiting jurisdictions never starve the loop's default
+    # executor, which the ETLs need for their disk writes.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        async with AsyncHttpClient.from_cfg(http_cfg) as client:
+            return await asyncio.gather(*(run_one_async(path, client, pool, checkpoints[path])
+                                          for path in config_paths))
+
+def run_batch(config_paths, workers=None, max_in_flight=None, max_per_host=None, report_path=None,
+              metrics_log=None, prometheus=None, engine='sync'):
+    """Run several jurisdictions concurrently in one process and write a run report.
+
+    All jurisdictions share one HTTP client, so ``max_in_flight`` and
+    ``max_per_host`` bound the requests in flight across the whole batch.
+    They also share one metrics registry, written to ``metrics_log`` (JSON
+    lines) and ``prometheus`` (textfile) when given. With ``engine='async'``
+    all jurisdictions run on one event loop instead of one thread each.
+    """
+    workers = workers or len(config_paths) or 1
+    http_cfg = {'http': {'max_in_flight': max_in_flight, 'max_per_host': max_per_host,
+                         'pool_maxsize': max(10, max_per_host or 0)}}
+    client = configure_http_client(http_cfg)
+    metrics = configure_metrics({'metrics': {'json_log': metrics_log, 'prometheus': prometheus}})
+    started = time.perf_counter()
+    if engine == 'async':
+        results = asyncio.run(run_all_async(config_paths, workers, http_cfg))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            checkpoints = checkpoint_files(config_paths)
+            futures = [pool.submit(run_one, path, checkpoints[path]) for path in config_paths]
+            results = [f.result() for f in as_completed(futures)]
+    order = {path: i for i, path in enumerate(config_paths)}
+    snapshot = metrics.finish(client)
+    report = {
+        'seconds': round(time.perf_counter() - started, 3),
+        'jurisdictions': sorted(results, key=lambda r: order[r['config']]),
+        'http': snapshot['http'],
+        'peak_rss_bytes': snapshot['peak_rss_bytes'],
+        'stages': snapshot['stages'],
+    }
+    if report_path:
+        ensure_dir_exists(report_path)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote batch report to {report_path}")
+    for r in report['jurisdictions']:
+        print(f"  {r['config']:<40} {r['status']:<7} {r['seconds']:>8.1f}s  {r['error'] or ''}")
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='customer-data batch',
+                                     description='Run several jurisdiction configs concurrently in one process.')
+    parser.add_argument('paths', nargs='+', help='jurisdiction YAML files or directories of them')
+    parser.add_argument('--workers', type=int, default=None, help='jurisdictions to run at once (default: all)')
+    parser.add_argument('--max-in-flight', type=int, default=16, help='HTTP requests in flight across all hosts')
+    parser.add_argument('--max-per-host', type=int, default=8, help='HTTP requests in flight per host')
+    parser.add_argument('--engine', choices=('sync', 'async'), default='sync',
+                        help="'async' runs every jurisdiction on one event loop (needs aiohttp)")
+    parser.add_argument('--report', default=os.path.join('output', 'batch_report.json'), help='run report path')
+    parser.add_argument('--metrics-log', default=None, help='append structured JSON metrics lines to this file')
+    parser.add_argument('--prometheus', default=None, help='write a Prometheus textfile with the run metrics')
+    args = parser.parse_args(argv)
+    configs = collect_configs(args.paths)
+    if not configs:
+        print("No jurisdiction configs found")
+        return 1
+    report = run_batch(configs, args.workers, args.max_in_flight, args.max_per_host, args.report,
+                       args.metrics_log, args.prometheus, args.engine)
+    return 0 if all(r['status'] == 'ok' for r in report['jurisdictions']) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,95 @@
 import os
 import json
+import shutil
+import threading
+import hashlib
 
 def save_checkpoint(path, offset):
-    with open(path, 'w') as f:
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
         json.dump({'resultOffset': offset}, f)
+    os.replace(tmp, path)
 
 def load_checkpoint(path):
-    return 0 
\ No newline at end of file
+    if not path or not os.path.exists(path):
+        return 0
+    try:
+        with open(path) as f:
+            return json.load(f).get('resultOffset', 0)
+    except ValueError:
+        return 0
+
+
+class PageSpool:
+    """On-disk spool of fetched pages so an interrupted extraction can resume.
+
+    Each page is written to its own file and then recorded in an append-only
+    journal, so a crash mid-write never marks a page as done. Spools live under
+    ``<checkpoint_file>.d/`` in a directory derived from ``fingerprint``; a
+    change in URL, fields or page size therefore starts a fresh spool instead
+    of resuming a stale one. ``put`` may be called from several threads at
+    once: pages go to distinct files and journal appends are serialized.
+    """
+
+    def __init__(self, checkpoint_file, fingerprint):
+        digest = hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:12]
+        self.dir = os.path.join(f'{checkpoint_file}.d', digest)
+        self.journal_path = os.path.join(self.dir, 'done.jsonl')
+        os.makedirs(self.dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.done = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash; the page will be refetched.
+                        break
+                    self.done[entry['key']] = entry.get('count')
+
+    def _page_path(self, key):
+        return os.path.join(self.dir, f'page-{key}.json')
+
+    def is_done(self, key):
+        return str(key) in self.done
+
+    def keys(self):
+        """Snapshot of the done keys, safe while other threads ``put``."""
+        with self._lock:
+            return list(self.done)
+
+    def put(self, key, page=None, count=None):
+        """Persist ``page`` (if given) and mark ``key`` as done."""
+        key = str(key)
+        if page is not None:
+            path = self._page_path(key)
+            with open(f'{path}.tmp', 'w') as f:
+                json.dump(page, f)
+            os.replace(f'{path}.tmp', path)
+            if count is None:
+                count = len(page)
+        with self._lock, open(self.journal_path, 'a') as f:
+            f.write(json.dumps({'key': key, 'count': count}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+            self.done[key] = count
+
+    def get(self, key):
+        with open(self._page_path(str(key))) as f:
+            return json.load(f)
+
+    def next_offset(self):
+        """Offset just past the furthest page recorded with integer keys."""
+        ends = [int(k) + (c or 0) for k, c in self.done.items() if k.lstrip('-').isdigit()]
+        return max(ends) if ends else 0
+
+    def iter_pages(self, keys=None):
+        """Yield stored pages one at a time, by ascending integer key by default."""
+        if keys is None:
+            keys = sorted(self.done, key=int)
+        for key in keys:
+            yield self.get(key)
+
+    def clear(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
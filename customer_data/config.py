@@ -11,14 +11,38 @@ def load_config(path):
         cfg['primary_key'] = ['OBJECTID']
     if 'deduplicate' not in cfg:
         cfg['deduplicate'] = False
+    if 'dedup_policy' not in cfg:
+        cfg['dedup_policy'] = 'first'
     if 'owners' not in cfg:
         cfg['owners'] = False
+    if 'max_workers' not in cfg:
+        cfg['max_workers'] = 1
+    if 'transform_workers' not in cfg:
+        cfg['transform_workers'] = 1
+    if 'transform_chunk_rows' not in cfg:
+        cfg['transform_chunk_rows'] = 100000
+    if 'engine' not in cfg:
+        cfg['engine'] = 'sync'
+    if 'paging' not in cfg:
+        cfg['paging'] = 'auto'
+    if 'sync' not in cfg:
+        cfg['sync'] = 'full'
+    if 'stream' not in cfg:
+        cfg['stream'] = False
+    if 'http' not in cfg:
+        cfg['http'] = {}
     if 'output' not in cfg:
         cfg['output'] = {}
     if 'geopackage' not in cfg['output']:
         cfg['output']['geopackage'] = None
+    if 'parquet' not in cfg['output']:
+        cfg['output']['parquet'] = None
+    if 'spatial_index' not in cfg['output']:
+        cfg['output']['spatial_index'] = None
     if 'postgres' not in cfg['output']:
         cfg['output']['postgres'] = {}
     if 'dsn' not in cfg['output']['postgres']:
         cfg['output']['postgres']['dsn'] = None
+    if 'load_mode' not in cfg['output']['postgres']:
+        cfg['output']['postgres']['load_mode'] = 'replace'
     return cfg 
\ No newline at end of file
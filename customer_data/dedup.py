@@ -0,0 +1,79 @@
+import json
+import hashlib
+
+POLICIES = ('first', 'last', 'edit_date')
+
+class Deduplicator:
+    """Drop features that repeat a primary key while pages stream in.
+
+    Keys are held as 128-bit blake2b digests of the JSON-encoded
+    ``key_fields`` values, so memory is 16 bytes per distinct key rather
+    than the features themselves, and digests do not depend on
+    ``PYTHONHASHSEED``.
+    ``first`` keeps the first occurrence and works in a single pass. ``last``
+    and ``edit_date`` (keep the highest ``edit_field`` value, ties going to
+    the later feature) need to know the winner before a page is emitted, so
+    every page is first passed to ``observe()`` and then to ``filter()`` in
+    the same order. ``duplicates`` maps each page number to the number of
+    features dropped from it.
+    """
+
+    def __init__(self, key_fields, policy='first', edit_field=None):
+        if policy not in POLICIES:
+            raise ValueError(f"dedup_policy must be one of {', '.join(POLICIES)}, not {policy!r}")
+        if policy == 'edit_date' and not edit_field:
+            raise ValueError("dedup_policy 'edit_date' needs a layer edit date field (or edit_date_field in the config)")
+        self.key_fields = list(key_fields)
+        self.policy = policy
+        self.edit_field = edit_field
+        self.seen = set()
+        self.winners = {}
+        self.duplicates = {}
+
+    @property
+    def needs_observe(self):
+        return self.policy != 'first'
+
+    def _key(self, feature):
+        attributes = feature.get('attributes') or {}
+        values = json.dumps([attributes.get(k) for k in self.key_fields], default=str)
+        return hashlib.blake2b(values.encode('utf-8'), digest_size=16).digest()
+
+    def observe(self, page_no, page):
+        """Planning pass for ``last``/``edit_date``: note where each key's winner is."""
+        for row, feature in enumerate(page):
+            key = self._key(feature)
+            edit = (feature.get('attributes') or {}).get(self.edit_field) if self.edit_field else None
+            if self.policy == 'edit_date' and not _newer(edit, self.winners.get(key)):
+                continue
+            self.winners[key] = (page_no, row, edit)
+
+    def filter(self, page_no, page):
+        """Return the features of ``page`` that survive, recording how many were dropped."""
+        kept = []
+        for row, feature in enumerate(page):
+            key = self._key(feature)
+            if self.policy == 'first':
+                if key in self.seen:
+                    continue
+                self.seen.add(key)
+            elif self.winners.get(key, (page_no, row))[:2] != (page_no, row):
+                continue
+            kept.append(feature)
+        dropped = len(page) - len(kept)
+        if dropped:
+            self.duplicates[page_no] = dropped
+        return kept
+
+    @property
+    def total(self):
+        return sum(self.duplicates.values())
+
+def _newer(edit, current):
+    """Whether a feature edited at ``edit`` replaces the current winner; features
+    without an edit date never replace one that has it."""
+    if current is None:
+        return True
+    if edit is None:
+        return current[2] is None
+    return current[2] is None or edit >= current[2]
@@ -1,8 +1,17 @@
 from abc import ABC, abstractmethod
+from customer_data.transport import get_http_client
+from customer_data.metrics import get_metrics
 
 class BaseJurisdictionETL(ABC):
     def __init__(self, cfg):
         self.cfg = cfg
+        self.http = get_http_client(cfg)
+        self.metrics = get_metrics()
+        self.jurisdiction = cfg.get('name') or cfg.get('api_type')
+
+    def stage(self, name, **fields):
+        """Time a pipeline stage for this jurisdiction; see ``Metrics.stage``."""
+        return self.metrics.stage(name, self.jurisdiction, **fields)
 
     @abstractmethod
     def extract(self, checkpoint_file=None):
@@ -1,54 +1,99 @@
 import os
-import requests
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from customer_data.etl.base import BaseJurisdictionETL
-from customer_data.checkpoint import save_checkpoint, load_checkpoint
+from customer_data.checkpoint import save_checkpoint, PageSpool
+from customer_data.store import RecordStore
+from customer_data.feature_cache import FeatureCacheWriter
+from customer_data.dedup import Deduplicator
+from customer_data.streaming import JsonArrayWriter
 from customer_data.utils import ensure_dir_exists
 import json
 
 class BossierETL(BaseJurisdictionETL):
     def extract(self, checkpoint_file=None):
-        cfg = self.cfg
-        url = cfg['url']
+        url = self.cfg['url']
         meta = self.fetch_metadata(url)
+        fields, out_sr, page_size = self.layer_params(meta)
+        sync_store, edit_field = self.open_sync_store(meta)
+        if sync_store is not None and sync_store.get_watermark(url) is not None:
+            records = self.sync_changes(url, meta, fields, out_sr, page_size, edit_field, sync_store)
+            return self.finish_sync(meta, records, page_size, sync_store)
+        sink = self.open_sink(meta, self.deduplicator(meta), sync_store, edit_field)
+        spool = self.fetch_all(url, meta, fields, out_sr, page_size, checkpoint_file, sink.put)
+        return self.finish_extract(meta, spool, sink, sync_store)
+
+    def layer_params(self, meta):
+        """(field names, output spatial reference, page size) for a layer."""
         sr = meta['extent']['spatialReference'].get('wkid', 4326)
         out_sr = 4326 if sr != 4326 else sr
         fields = [f['name'] for f in meta['fields']]
-        page_size = meta.get('maxRecordCount', 1000)
-        offset = load_checkpoint(checkpoint_file)
-        features = []
-        total = self.get_total_count(url)
-        print(f"Starting extraction at offset {offset}")
-        while True:
-            data = self.fetch_features(url, fields, offset, page_size, out_sr)
-            fs = data.get('features', [])
-            print(f"Fetched {len(fs)} features at offset {offset}")
-            if not fs:
-                print("No more features returned, stopping.")
-                break
-            features.extend(fs)
-            offset += len(fs)
-            save_checkpoint(checkpoint_file, offset)
-            if len(fs) < page_size:
-                print("Last page fetched (less than page_size), stopping.")
-                break
-            if total is not None and offset >= total:
-                print("Fetched all features (offset >= total), stopping.")
-                break
-        print(f"Extraction complete. Total features fetched: {len(features)}")
-        # Save output to output/la/bossier/
+        return fields, out_sr, meta.get('maxRecordCount', 1000)
+
+    def open_sync_store(self, meta):
+        """(sync store, edit date field) for incremental runs, else (None, None)."""
+        if self.cfg.get('sync') != 'incremental':
+            return None, None
+        edit_field = self.edit_date_field(meta)
+        if not edit_field:
+            print("Layer has no edit date field; falling back to a full extraction")
+            return None, None
+        path = self.cfg.get('sync_path') or os.path.join("output", "la", "bossier", "bossier_sync.sqlite")
+        return RecordStore(path), edit_field
+
+    def output_paths(self):
+        """(meta path, features path) of the JSON outputs."""
         base_dir = os.path.join("output", "la", "bossier")
-        os.makedirs(base_dir, exist_ok=True)
-        meta_path = os.path.join(base_dir, "bossier_meta.json")
-        features_path = os.path.join(base_dir, "bossier_features.json")
-        ensure_dir_exists(meta_path)
+        return os.path.join(base_dir, "bossier_meta.json"), os.path.join(base_dir, "bossier_features.json")
+
+    def open_sink(self, meta, dedup=None, sync_store=None, edit_field=None):
+        """A PageSink writing the features JSON, the ``features_path`` feature
+        cache if configured, and seeding ``sync_store`` if given."""
+        _, features_path = self.output_paths()
         ensure_dir_exists(features_path)
+        # JsonArrayWriter writes under a temporary name, so an interrupted run never leaves a truncated array behind.
+        writer = JsonArrayWriter(features_path, indent=None)
+        cache = FeatureCacheWriter(self.cfg['features_path'], meta) if self.cfg.get('features_path') else None
+        seeder = StoreSeeder(sync_store, self.object_id_field(meta), self.cfg['primary_key'], edit_field) \
+            if sync_store is not None else None
+        return PageSink(dedup, cache, writer, seeder)
+
+    def finish_sync(self, meta, records, page_size, sync_store):
+        """Write a delta sync's complete record set, streamed from the store."""
+        sink = self.open_sink(meta)
+        page = []
+        for record in records:
+            page.append(record)
+            if len(page) == page_size:
+                sink.put(page)
+                page = []
+        sink.put(page)
+        return self.finish_extract(meta, None, sink, sync_store)
+
+    def finish_extract(self, meta, spool, sink, sync_store):
+        """Flush ``sink`` (running its second pass over ``spool`` if dedup needs
+        one), set the sync store's high-water mark and write the metadata;
+        returns (meta, number of features written)."""
+        if spool is not None:
+            sink.finish(spool.iter_pages())
+        sink.close()
+        if sink.seeder is not None:
+            sink.seeder.finish(self.cfg['url'])
+        if sync_store is not None:
+            sync_store.close()
+        if sink.cache is not None:
+            print(f"Saved feature cache to {sink.cache.path}")
+        print(f"Extraction complete. Total features fetched: {sink.count}")
+        meta_path, features_path = self.output_paths()
+        ensure_dir_exists(meta_path)
         with open(meta_path, "w") as f:
             json.dump(meta, f, indent=2)
-        with open(features_path, "w") as f:
-            json.dump(features, f, indent=2)
         print(f"Saved meta to {meta_path}")
         print(f"Saved features to {features_path}")
-        return meta, features
+        if spool is not None:
+            spool.clear()
+        return meta, sink.count
 
     def transform(self, data):
         # No-op for now
@@ -58,30 +103,354 @@ class BossierETL(BaseJurisdictionETL):
         # No-op for now
         return data
 
+    def fetch_all(self, url, meta, fields, out_sr, page_size, checkpoint_file=None, on_page=None):
+        """Fetch every feature in the layer into a PageSpool and return the spool.
+        ``on_page(page)`` gets every page in layer order as soon as it and the
+        pages before it are in, pages spooled by an interrupted run included."""
+        cfg = self.cfg
+        max_workers = cfg.get('max_workers', 1)
+        paging = self.choose_paging(meta)
+        print(f"Using {paging} paging")
+        checkpoint_file = checkpoint_file or '.checkpoint'
+        on_page = on_page or (lambda page: None)
+        ids = None
+        if paging == 'keyset':
+            oid_field, ids = self.fetch_object_ids(url, meta)
+        spool = self.open_spool(checkpoint_file, url, fields, page_size, out_sr, paging, ids)
+        if paging == 'keyset':
+            keys = list(range(0, len(ids), page_size))
+            starts = [o for o in keys if not spool.is_done(o)]
+            print(f"Fetching {len(starts)} object ID batches with {max_workers} workers")
+
+            def fetch_batch(start):
+                batch = ids[start:start + page_size]
+                return self.fetch_id_range(url, fields, oid_field, batch[0], batch[-1], out_sr)
+
+            def spooled():
+                for start, fs in self.fetch_pages_concurrent(fetch_batch, starts, max_workers):
+                    print(f"Fetched {len(fs)} features for object IDs starting at {ids[start]}")
+                    spool.put(start, fs)
+                    yield start, fs
+
+            for page in self.pages_in_order(spool, keys, starts, spooled()):
+                on_page(page)
+        else:
+            total = self.get_total_count(url)
+            if max_workers > 1 and total is not None:
+                keys = list(range(0, total, page_size))
+                offsets = [o for o in keys if not spool.is_done(o)]
+                print(f"Fetching {len(offsets)} pages with {max_workers} workers")
+
+                def fetch_page(offset):
+                    return self.fetch_features(url, fields, offset, page_size, out_sr).get('features', [])
+
+                def spooled():
+                    for page_offset, fs in self.fetch_pages_concurrent(fetch_page, offsets, max_workers):
+                        print(f"Fetched {len(fs)} features at offset {page_offset}")
+                        end = page_offset + page_size
+                        if len(fs) < page_size and end < total:
+                            # The server capped this page below maxRecordCount; fill the gap serially.
+                            fs = fs + self.fetch_range(url, fields, page_offset + len(fs), end, page_size, out_sr)
+                        spool.put(page_offset, fs)
+                        yield page_offset, fs
+
+                for page in self.pages_in_order(spool, keys, offsets, spooled()):
+                    on_page(page)
+            else:
+                for page in spool.iter_pages():
+                    on_page(page)
+                offset = spool.next_offset()
+                print(f"Starting extraction at offset {offset}")
+                while total is None or offset < total:
+                    data = self.fetch_features(url, fields, offset, page_size, out_sr)
+                    fs = data.get('features', [])
+                    print(f"Fetched {len(fs)} features at offset {offset}")
+                    if not fs:
+                        print("No more features returned, stopping.")
+                        break
+                    spool.put(offset, fs)
+                    on_page(fs)
+                    offset += len(fs)
+                    save_checkpoint(checkpoint_file, offset)
+                    if len(fs) < page_size:
+                        print("Last page fetched (less than page_size), stopping.")
+                        break
+                else:
+                    print("Fetched all features (offset >= total), stopping.")
+        return spool
+
+    @staticmethod
+    def open_spool(checkpoint_file, url, fields, page_size, out_sr, paging, ids=None):
+        """The PageSpool for this layer and query. Keyset pages are ranges of
+        ``ids``, so a digest of the IDs is part of the fingerprint: after
+        features are added or deleted the ranges shift and an interrupted
+        run's pages are not reused."""
+        fingerprint = {'url': url, 'fields': fields, 'page_size': page_size, 'out_sr': out_sr, 'paging': paging}
+        if ids is not None:
+            fingerprint['ids'] = hashlib.sha1(json.dumps(sorted(ids)).encode()).hexdigest()
+        spool = PageSpool(checkpoint_file, fingerprint)
+        if spool.done:
+            print(f"Resuming from spool {spool.dir} with {len(spool.done)} pages already fetched")
+        return spool
+
+    @staticmethod
+    def pages_in_order(spool, keys, todo, fetched):
+        """Yield the page of every key in ``keys``, in order: the ``todo`` keys
+        from ``fetched`` (which yields (key, page) for them in that order) as
+        they arrive, the others read back from ``spool``."""
+        todo = set(todo)
+        for key in keys:
+            if key in todo:
+                _, page = next(fetched)
+            else:
+                page = spool.get(key)
+            yield page
+
     def fetch_metadata(self, url):
-        r = requests.get(f'{url}?f=pjson')
-        r.raise_for_status()
-        return r.json()
+        with self.stage('metadata') as m:
+            r = self.http.get(f'{url}?f=pjson')
+            r.raise_for_status()
+            m['bytes'] = len(r.content)
+            return r.json()
+
+    def fetch_features(self, url, out_fields, offset, page_size, out_sr, where='1=1', order_by=None):
+        params = self.query_params(out_fields, offset, page_size, out_sr, where, order_by)
+        print(f"Fetching features: offset={offset} page_size={page_size} where={where}")
+        with self.stage('page_fetch', offset=offset, where=where) as m:
+            r = self.http.get(f'{url}/query', params=params)
+            r.raise_for_status()
+            data = r.json()
+            m['records'] = len(data.get('features') or [])
+            m['bytes'] = len(r.content)
+        return data
 
-    def fetch_features(self, url, out_fields, offset, page_size, out_sr):
+    @staticmethod
+    def query_params(out_fields, offset, page_size, out_sr, where='1=1', order_by=None):
         params = {
             'f': 'json',
-            'where': '1=1',
+            'where': where,
             'outFields': ','.join(out_fields),
-            'resultOffset': offset,
-            'resultRecordCount': page_size,
             'returnGeometry': 'true',
             'outSR': out_sr
         }
-        print(f"Fetching features: offset={offset} page_size={page_size}")
-        r = requests.get(f'{url}/query', params=params)
-        r.raise_for_status()
-        return r.json()
+        if offset is not None:
+            params['resultOffset'] = offset
+            params['resultRecordCount'] = page_size
+        if order_by:
+            params['orderByFields'] = order_by
+        return params
+
+    def fetch_pages_concurrent(self, fetch_page, keys, max_workers):
+        """Yield (key, fetch_page(key)) for each key, in order, using a bounded pool."""
+        window = max_workers * 2
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = []
+            for key in keys:
+                pending.append((key, pool.submit(fetch_page, key)))
+                if len(pending) >= window:
+                    page_key, future = pending.pop(0)
+                    yield page_key, future.result()
+            for page_key, future in pending:
+                yield page_key, future.result()
+
+    def fetch_range(self, url, out_fields, start, end, page_size, out_sr):
+        """Serially fetch features in [start, end), used to fill short pages."""
+        features = []
+        offset = start
+        while offset < end:
+            fs = self.fetch_features(url, out_fields, offset, min(page_size, end - offset), out_sr).get('features', [])
+            if not fs:
+                break
+            features.extend(fs)
+            offset += len(fs)
+        return features
+
+    def object_id_field(self, meta):
+        if meta.get('objectIdField'):
+            return meta['objectIdField']
+        for f in meta.get('fields', []):
+            if f.get('type') == 'esriFieldTypeOID':
+                return f['name']
+        return None
+
+    def choose_paging(self, meta):
+        """'keyset' when the layer has an object ID field and supports queries, else 'offset'."""
+        paging = self.cfg.get('paging', 'auto')
+        if paging != 'auto':
+            return paging
+        capabilities = meta.get('capabilities', 'Query')
+        if self.object_id_field(meta) and 'Query' in capabilities:
+            return 'keyset'
+        return 'offset'
+
+    def fetch_object_ids(self, url, meta):
+        """Return (object ID field, sorted list of every object ID in the layer)."""
+        params = {'f': 'json', 'where': '1=1', 'returnIdsOnly': 'true'}
+        with self.stage('object_ids') as m:
+            r = self.http.get(f'{url}/query', params=params)
+            r.raise_for_status()
+            data = r.json()
+            m['records'] = len(data.get('objectIds') or [])
+            m['bytes'] = len(r.content)
+        oid_field = data.get('objectIdFieldName') or self.object_id_field(meta)
+        ids = sorted(data.get('objectIds') or [])
+        print(f"Total feature count: {len(ids)} (object IDs)")
+        return oid_field, ids
+
+    def fetch_id_range(self, url, out_fields, oid_field, lo, hi, out_sr):
+        """Fetch every feature with lo <= object ID <= hi, following exceededTransferLimit."""
+        features = []
+        while True:
+            where = f'{oid_field} >= {lo} AND {oid_field} <= {hi}'
+            data = self.fetch_features(url, out_fields, None, None, out_sr, where=where, order_by=oid_field)
+            fs = data.get('features', [])
+            features.extend(fs)
+            if not fs or not data.get('exceededTransferLimit'):
+                return features
+            lo = max(f['attributes'][oid_field] for f in fs) + 1
+
+    def deduplicator(self, meta):
+        """Streaming deduplicator for this run, or None when ``deduplicate`` is off."""
+        if not self.cfg.get('deduplicate'):
+            return None
+        policy = self.cfg.get('dedup_policy', 'first')
+        edit_field = self.edit_date_field(meta) if policy == 'edit_date' else None
+        return Deduplicator(self.cfg['primary_key'], policy, edit_field)
+
+    def edit_date_field(self, meta):
+        """Name of the layer's last-edited date field, if it tracks edits."""
+        if self.cfg.get('edit_date_field'):
+            return self.cfg['edit_date_field']
+        info = meta.get('editFieldsInfo') or {}
+        if info.get('editDateField'):
+            return info['editDateField']
+        for f in meta.get('fields', []):
+            if f.get('type') == 'esriFieldTypeDate' and f['name'].lower() in ('last_edited_date', 'editdate', 'last_edit_date'):
+                return f['name']
+        return None
+
+    def sync_changes(self, url, meta, fields, out_sr, page_size, edit_field, store):
+        """Fetch only features edited since the stored high-water mark, merge them
+        into the store, drop features whose object IDs disappeared, and return
+        an iterator over the complete current feature set."""
+        high_water = store.get_watermark(url)
+        since = datetime.fromtimestamp(high_water / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        # >= rather than > so edits sharing the watermark's timestamp are not missed; upserts are idempotent.
+        where = f"{edit_field} >= TIMESTAMP '{since}'"
+        print(f"Fetching features edited since {since} UTC")
+        changed = []
+        offset = 0
+        while True:
+            data = self.fetch_features(url, fields, offset, page_size, out_sr, where=where)
+            fs = data.get('features', [])
+            changed.extend(fs)
+            offset += len(fs)
+            if not fs or (len(fs) < page_size and not data.get('exceededTransferLimit')):
+                break
+        oid_field = self.object_id_field(meta)
+        store.upsert(store_rows(changed, self.cfg['primary_key'], oid_field))
+        deleted = 0
+        if oid_field:
+            _, ids = self.fetch_object_ids(url, meta)
+            deleted = store.delete_missing_refs(ids)
+        store.set_watermark(url, max_edit(changed, edit_field, high_water))
+        print(f"Delta sync: {len(changed)} changed, {deleted} deleted, {store.count()} features in store")
+        return store.iter_records()
 
     def get_total_count(self, url):
         params = {'f': 'json', 'where': '1=1', 'returnCountOnly': 'true'}
-        r = requests.get(f'{url}/query', params=params)
+        r = self.http.get(f'{url}/query', params=params)
         r.raise_for_status()
         count = r.json().get('count', None)
         print(f"Total feature count: {count}")
-        return count 
\ No newline at end of file
+        return count
+
+
+def store_rows(features, key_fields, oid_field):
+    for f in features:
+        attrs = f.get('attributes', {})
+        yield RecordStore.make_key(attrs, key_fields), attrs.get(oid_field) if oid_field else None, f
+
+def max_edit(features, edit_field, current=None):
+    values = [f['attributes'].get(edit_field) for f in features]
+    values = [v for v in values if v is not None]
+    if current is not None:
+        values.append(current)
+    return max(values) if values else None
+
+
+class StoreSeeder:
+    """Loads a full extraction into the sync store page by page, tracking the
+    high-water mark to set once the extraction completes."""
+
+    def __init__(self, store, oid_field, key_fields, edit_field):
+        self.store = store
+        self.oid_field = oid_field
+        self.key_fields = key_fields
+        self.edit_field = edit_field
+        self.high_water = None
+
+    def write_page(self, features):
+        self.store.upsert(store_rows(features, self.key_fields, self.oid_field))
+        self.high_water = max_edit(features, self.edit_field, self.high_water)
+
+    def finish(self, url):
+        if self.high_water is not None:
+            self.store.set_watermark(url, self.high_water)
+        print(f"Seeded sync store {self.store.path} with {self.store.count()} features, high-water mark {self.high_water}")
+
+
+class PageSink:
+    """Takes a layer's pages in order, deduplicates them as they arrive and
+    streams them to the features JSON, the feature cache and the sync store.
+
+    With no deduplicator or the ``first`` policy each page is filtered and
+    written as soon as ``put`` gets it. ``last`` and ``edit_date`` only know a
+    key's winner after the last page, so ``put`` just observes pages and
+    ``finish`` filters and writes them in a second pass over the spool.
+    """
+
+    def __init__(self, dedup=None, cache=None, writer=None, seeder=None):
+        self.dedup = dedup
+        self.cache = cache
+        self.writer = writer
+        self.seeder = seeder
+        self.pages = 0
+        self.count = 0
+
+    def put(self, page):
+        if self.dedup is not None and self.dedup.needs_observe:
+            self.dedup.observe(self.pages, page)
+        else:
+            self.emit(self.pages, page)
+        self.pages += 1
+
+    def emit(self, page_no, page):
+        if self.dedup is not None:
+            page = self.dedup.filter(page_no, page)
+        if self.cache is not None:
+            self.cache.write_page(page)
+        if self.writer is not None:
+            for feature in page:
+                self.writer.write(feature)
+        if self.seeder is not None:
+            self.seeder.write_page(page)
+        self.count += len(page)
+
+    def finish(self, spooled_pages):
+        """Second pass for ``last``/``edit_date``, then report what was dropped."""
+        if self.dedup is None:
+            return
+        if self.dedup.needs_observe:
+            for page_no, page in enumerate(spooled_pages):
+                self.emit(page_no, page)
+        for page_no, dropped in self.dedup.duplicates.items():
+            print(f"Page {page_no}: dropped {dropped} duplicate feature(s)")
+        print(f"Dropped {self.dedup.total} duplicate feature(s) by {', '.join(self.dedup.key_fields)} "
+              f"({self.dedup.policy} wins)")
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+        if self.writer is not None:
+            self.writer.close()
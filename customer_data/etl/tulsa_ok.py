@@ -1,7 +1,11 @@
 import os
+import re
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from customer_data.etl.base import BaseJurisdictionETL
-import requests
+from customer_data.streaming import iter_json_array, write_records
+from customer_data.store import RecordStore
+from customer_data.parquet import ParquetRecordWriter
 import json
 import csv
 
@@ -10,12 +14,58 @@ def ensure_dir_exists(file_path):
     if dir_path and not os.path.exists(dir_path):
         os.makedirs(dir_path, exist_ok=True)
 
+URL_KEYS = {'all': 'url_all', 'values': 'url_values'}
+
+MODIFIED_FORMATS = ('%m-%d-%Y', '%m/%d/%Y', '%Y-%m-%d')
+
+def record_value(record, field):
+    """``record[field]``, matching the field name case-insensitively."""
+    if field in record:
+        return record[field]
+    field = field.lower()
+    for name, value in record.items():
+        if name.lower() == field:
+            return value
+    return None
+
+def _iso_for_python(text):
+    """Rewrite the ISO forms .NET APIs send that ``datetime.fromisoformat``
+    only accepts from Python 3.11: a trailing ``Z``, ``+hhmm`` offsets and
+    fractional seconds that are not exactly 3 or 6 digits (e.g. 7)."""
+    if text.endswith(('Z', 'z')):
+        text = text[:-1] + '+00:00'
+    text = re.sub(r'(:\d\d(?:\.\d+)?[+-]\d\d)(\d\d)$', r'\1:\2', text)
+    return re.sub(r'\.(\d+)', lambda m: '.' + (m.group(1) + '000000')[:6], text, count=1)
+
+def parse_modified(value):
+    """A record's last-modified value (ISO timestamp, MM-DD-YYYY date or epoch
+    milliseconds) as a naive datetime, or None."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).replace(tzinfo=None)
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(_iso_for_python(text))
+    except ValueError:
+        pass
+    else:
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc)
+        return parsed.replace(tzinfo=None)
+    for fmt in MODIFIED_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    return None
+
 class TulsaOKETL(BaseJurisdictionETL):
     def extract(self, checkpoint_file=None):
         cfg = self.cfg
-        url = cfg['url']
-        token = cfg['token']
         data_type = cfg.get('data_type')
+        url = cfg.get(URL_KEYS.get(data_type), cfg['url'])
+        token = cfg['token']
         if 'last_modified' in cfg:
             last_modified = cfg['last_modified']
         else:
@@ -30,31 +80,51 @@ class TulsaOKETL(BaseJurisdictionETL):
             actual_token = os.getenv(token)
             if actual_token:
                 token = actual_token
-                print(f"Using token from environment variable: {token[:10]}...")
+                print("Using token from environment variable")
             else:
                 print(f"Warning: Environment variable {token} not found. Using placeholder token.")
         print("Starting Tulsa extraction")
+        out = cfg.get('output', {})
+        if cfg.get('sync') == 'incremental':
+            return self.sync_incremental(url, token, data_type or 'sales', last_modified)
+        if cfg.get('stream'):
+            json_path, csv_path, parquet_path = out.get('json'), out.get('csv'), out.get('parquet')
+            for path in (json_path, csv_path, parquet_path):
+                if path:
+                    ensure_dir_exists(path)
+            records = self.iter_tulsa_data(url, token, last_modified)
+            with self.stage('fetch_write') as m:
+                count = m['records'] = write_records(records, json_path, csv_path, parquet_path)
+            print(f"Streamed {count} records from Tulsa API")
+            return count
         data = self.fetch_tulsa_data(url, token, last_modified)
         print(f"Fetched {len(data)} records from Tulsa API")
         # Write output files
-        out = cfg.get('output', {})
-        if out.get('json'):
-            json_path = out['json']
-            ensure_dir_exists(json_path)
-            print(f"Writing JSON to {json_path}")
-            with open(json_path, 'w') as f:
-                json.dump(data, f, indent=2)
-        if out.get('csv') and data:
-            csv_path = out['csv']
-            ensure_dir_exists(csv_path)
-            print(f"Writing CSV to {csv_path}")
-            all_keys = set()
-            for record in data:
-                all_keys.update(record.keys())
-            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
-                writer.writeheader()
-                writer.writerows(data)
+        with self.stage('write') as m:
+            m['records'] = len(data) if isinstance(data, list) else 0
+            if out.get('json'):
+                json_path = out['json']
+                ensure_dir_exists(json_path)
+                print(f"Writing JSON to {json_path}")
+                with open(json_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+            if out.get('csv') and data:
+                csv_path = out['csv']
+                ensure_dir_exists(csv_path)
+                print(f"Writing CSV to {csv_path}")
+                all_keys = set()
+                for record in data:
+                    all_keys.update(record.keys())
+                with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=sorted(all_keys))
+                    writer.writeheader()
+                    writer.writerows(data)
+            if out.get('parquet') and isinstance(data, list):
+                parquet_path = out['parquet']
+                ensure_dir_exists(parquet_path)
+                print(f"Writing Parquet to {parquet_path}")
+                with ParquetRecordWriter(parquet_path) as writer:
+                    writer.write_many(data)
         return data
 
     def transform(self, data):
@@ -73,11 +143,68 @@ class TulsaOKETL(BaseJurisdictionETL):
             params['lastModified'] = last_modified
         print(f"Fetching Tulsa data with lastModified: {last_modified}")
         print(f"URL: {url}")
-        print(f"Headers: {headers}")
         print(f"Params: {params}")
-        r = requests.get(url, headers=headers, params=params)
-        if not r.ok:
-            print(f"API Error: {r.status_code} {r.reason}")
-            print(f"Response text: {r.text}")
-            r.raise_for_status()
-        return r.json() 
\ No newline at end of file
+        with self.stage('fetch') as m:
+            r = self.http.get(url, headers=headers, params=params)
+            if not r.ok:
+                print(f"API Error: {r.status_code} {r.reason}")
+                print(f"Response text: {r.text}")
+                r.raise_for_status()
+            data = r.json()
+            m['records'] = len(data) if isinstance(data, list) else 0
+            m['bytes'] = len(r.content)
+        return data
+
+    def sync_incremental(self, url, token, data_type, last_modified=None):
+        """Fetch records modified since this data type's watermark, upsert them into
+        the local store, and rewrite the JSON/CSV outputs from the merged store."""
+        cfg = self.cfg
+        key_fields = cfg.get('sync_keys', {}).get(data_type)
+        if not key_fields:
+            # primary_key defaults to OBJECTID, which Tulsa records do not have.
+            raise ValueError(f"Incremental Tulsa {data_type} syncs need sync_keys.{data_type} in the config")
+        modified_field = cfg.get('modified_field', 'lastModified')
+        path = (cfg.get('sync_path') or os.path.join('output', 'tulsa_{data_type}.sqlite')).format(data_type=data_type)
+        with RecordStore(path) as store:
+            since = last_modified or store.get_watermark(data_type)
+            print(f"Incremental {data_type} sync into {path}, modified since: {since or 'beginning'}")
+            latest = None
+
+            def rows():
+                nonlocal latest
+                for record in self.iter_tulsa_data(url, token, since):
+                    missing = [k for k in key_fields if k not in record]
+                    if missing:
+                        raise ValueError(f"Tulsa {data_type} records have no {missing} field; set sync_keys.{data_type} in the config")
+                    modified = parse_modified(record_value(record, modified_field))
+                    if modified is not None and (latest is None or modified > latest):
+                        latest = modified
+                    yield RecordStore.make_key(record, key_fields), None, record
+
+            changed = store.upsert(rows())
+            if latest is not None:
+                # The API filters by date, so the next run re-reads the latest day; upserts make that harmless.
+                store.set_watermark(data_type, latest.strftime('%m-%d-%Y'))
+            elif changed:
+                print(f"Warning: no {modified_field} values in the {data_type} records; watermark left at {since}")
+            out = cfg.get('output', {})
+            json_path, csv_path, parquet_path = out.get('json'), out.get('csv'), out.get('parquet')
+            for p in (json_path, csv_path, parquet_path):
+                if p:
+                    ensure_dir_exists(p)
+            total = write_records(store.iter_records(), json_path, csv_path, parquet_path)
+        print(f"Merged {changed} changed records; {total} records in current {data_type} snapshot")
+        return total
+
+    def iter_tulsa_data(self, url, token, last_modified=None):
+        """Yield records from the Tulsa response as they are parsed off the socket."""
+        headers = {'Authorization': f'Bearer {token}'}
+        params = {'lastModified': last_modified} if last_modified else {}
+        print(f"Streaming Tulsa data with lastModified: {last_modified}")
+        r = self.http.get(url, headers=headers, params=params, stream=True)
+        with r:
+            if not r.ok:
+                print(f"API Error: {r.status_code} {r.reason}")
+                print(f"Response text: {r.text}")
+                r.raise_for_status()
+            yield from iter_json_array(r.iter_content(chunk_size=1 << 16))
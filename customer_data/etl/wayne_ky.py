@@ -1,38 +1,24 @@
 import os
-import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from customer_data.etl.base import BaseJurisdictionETL
 from customer_data.utils import ensure_dir_exists
+from customer_data.checkpoint import PageSpool
+from customer_data.streaming import iter_json_array
+from customer_data.parquet import ParquetRecordWriter
 
 class WayneKYETL(BaseJurisdictionETL):
     def extract(self, checkpoint_file=None):
-        load_dotenv()
         cfg = self.cfg
         api_base_url = cfg['api_base_url']
-        username = os.getenv(cfg['username_env'])
-        password = os.getenv(cfg['password_env'])
-        if not username or not password:
-            raise ValueError(f"Missing credentials: username={username}, password={'set' if password else 'unset'}")
-        auth_url = f"{api_base_url}/authenticate"
-        payload = {"username": username, "password": password}
-        headers = {"Content-Type": "application/json"}
+        auth_url, payload = self.auth_request(api_base_url)
         print(f"Authenticating to PVDNet API at {auth_url}...")
-        r = requests.post(auth_url, json=payload, headers=headers)
-        try:
-            data = json.loads(r.content.decode("utf-8-sig"))
-            token = data.get("token")
-            resource_groups = data.get("resourceGroups")
-        except Exception as e:
-            print(f"Failed to decode JSON from response. Status: {r.status_code}")
-            print(f"Response text: {r.text}")
-            raise
-        print("\n================ ACCESS TOKEN ================" )
-        print(token)
-        print("============================================\n")
-        print("Resource Groups:")
-        print(resource_groups)
-        print("\nCopy this token and use it in the Swagger UI to explore endpoints.")
+        with self.stage('auth'):
+            r = self.http.post(auth_url, json=payload, headers={"Content-Type": "application/json"})
+            token, resource_groups = self.parse_auth(r)
+        print(f"Authenticated; resource groups: {resource_groups}")
         # Set new output directory structure
         base_dir = os.path.join("output", "ky", "wayne")
         os.makedirs(base_dir, exist_ok=True)
@@ -49,9 +35,29 @@ class WayneKYETL(BaseJurisdictionETL):
         if cfg.get('extract_all_tables'):
             output_dir = os.path.join(base_dir, "all_tables")
             os.makedirs(output_dir, exist_ok=True)
-            self.extract_all_adhoc_tables(api_base_url, token, tables_output, output_dir)
+            spool = PageSpool(checkpoint_file or '.checkpoint', {'api_base_url': api_base_url, 'output_dir': output_dir})
+            self.extract_all_adhoc_tables(api_base_url, token, tables_output, output_dir, spool)
         return {"token": token, "resourceGroups": resource_groups}
 
+    def auth_request(self, api_base_url):
+        """(authenticate URL, credentials payload) from the configured env vars."""
+        load_dotenv()
+        username = os.getenv(self.cfg['username_env'])
+        password = os.getenv(self.cfg['password_env'])
+        if not username or not password:
+            raise ValueError(f"Missing credentials: username={username}, password={'set' if password else 'unset'}")
+        return f"{api_base_url}/authenticate", {"username": username, "password": password}
+
+    def parse_auth(self, r):
+        """(token, resource groups) from an authenticate response."""
+        try:
+            data = json.loads(r.content.decode("utf-8-sig"))
+            return data.get("token"), data.get("resourceGroups")
+        except Exception:
+            print(f"Failed to decode JSON from response. Status: {r.status_code}")
+            print(f"Response text: {r.text}")
+            raise
+
     def transform(self, data):
         # No-op for now
         return data
@@ -65,9 +71,14 @@ class WayneKYETL(BaseJurisdictionETL):
         headers = {"AccessToken": token}
         url = f"{api_base_url}{endpoint}"
         print(f"Fetching Adhoc tables from {url}")
-        resp = requests.get(url, headers=headers)
-        resp.raise_for_status()
-        tables = json.loads(resp.content.decode("utf-8-sig"))
+        with self.stage('tables') as m:
+            resp = self.http.get(url, headers=headers)
+            resp.raise_for_status()
+            tables = json.loads(resp.content.decode("utf-8-sig"))
+            m['bytes'] = len(resp.content)
+        return self.save_tables(tables, output_path)
+
+    def save_tables(self, tables, output_path):
         ensure_dir_exists(output_path)
         with open(output_path, "w") as f:
             json.dump(tables, f, indent=2)
@@ -80,31 +91,245 @@ class WayneKYETL(BaseJurisdictionETL):
         url = f"{api_base_url}{endpoint}"
         payload = {"Query": query}
         print(f"Running Adhoc query: {query}")
-        resp = requests.post(url, headers=headers, json=payload)
+        # Adhoc queries only read, so a 5xx can be retried; /authenticate is not.
+        resp = self.http.post(url, headers=headers, json=payload, retry=True)
         resp.raise_for_status()
         results = json.loads(resp.content.decode("utf-8-sig"))
+        return self.save_query_results(results, output_path)
+
+    def save_query_results(self, results, output_path):
         ensure_dir_exists(output_path)
         with open(output_path, "w") as f:
             json.dump(results, f, indent=2)
         print(f"Saved Adhoc query results to {output_path}")
         return results
 
-    def extract_all_adhoc_tables(self, api_base_url, token, tables_json_path, output_dir):
+    def iter_adhoc_query(self, api_base_url, token, query):
+        """Yield result rows of an Adhoc query as they are parsed off the socket."""
+        url = f"{api_base_url}/adhoc/tables/query"
+        headers = {"AccessToken": token, "Content-Type": "application/json"}
+        resp = self.http.post(url, headers=headers, json={"Query": query}, stream=True, retry=True)
+        with resp:
+            resp.raise_for_status()
+            yield from iter_json_array(resp.iter_content(chunk_size=1 << 16), encoding="utf-8-sig")
+
+    @staticmethod
+    def _sql_literal(value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return "'" + str(value).replace("'", "''") + "'"
+
+    @staticmethod
+    def _key_columns(key):
+        """An ``adhoc_chunk_keys`` entry (one column or a list) as a list of columns."""
+        if not key:
+            return []
+        return [key] if isinstance(key, str) else list(key)
+
+    def _keyset_after(self, key, last):
+        """WHERE clause for rows after ``last`` in ``key`` order, e.g. ``a > 1 OR (a = 1 AND b > 2)``."""
+        if isinstance(key, str):
+            return f"{key} > {self._sql_literal(last)}"
+        terms = []
+        for i, column in enumerate(key):
+            ties = [f"{c} = {self._sql_literal(v)}" for c, v in zip(key[:i], last)]
+            terms.append(" AND ".join(ties + [f"{column} > {self._sql_literal(last[i])}"]))
+        return " OR ".join(f"({t})" if " AND " in t else t for t in terms)
+
+    def chunk_query(self, table_name, chunk_size, key=None, last=None, rows_done=0, order=None):
+        """SQL for the next chunk: key-range (keyset) when ``key`` is known, else OFFSET/FETCH over ``order``."""
+        if key:
+            where = f" WHERE {self._keyset_after(key, last)}" if last is not None else ""
+            return f"SELECT TOP {chunk_size} * FROM {table_name}{where} ORDER BY {', '.join(self._key_columns(key))}"
+        if not order:
+            # Only an empty table has no columns to order by.
+            return f"SELECT * FROM {table_name}"
+        return (f"SELECT * FROM {table_name} ORDER BY {', '.join(order)} "
+                f"OFFSET {rows_done} ROWS FETCH NEXT {chunk_size} ROWS ONLY")
+
+    def order_query(self, table_name):
+        """Query for one row of a table without a chunk key, to learn its columns."""
+        return f"SELECT TOP 1 * FROM {table_name}"
+
+    def order_columns(self, table_name, rows):
+        """Every column of ``rows`` (the result of :meth:`order_query`), quoted for ORDER BY.
+
+        OFFSET/FETCH pages are only stable between requests under a total
+        order; ordering by one column lets the server shuffle rows that tie
+        on it, so chunks would overlap and miss rows.
+        """
+        print(f"Warning: no adhoc_chunk_keys entry for {table_name}; paging with OFFSET/FETCH ordered by every "
+              f"column. Set a unique key (or list of columns) for faster key-range chunks.")
+        if not rows:
+            return []
+        return ["[" + str(c).replace("]", "]]") + "]" for c in rows[0]]
+
+    def run_chunked_query(self, api_base_url, token, table_name, output_path, chunk_size, key=None, spool=None):
+        """Export a table chunk by chunk to NDJSON with bounded memory.
+
+        After each chunk is flushed, its end state (rows, file size, last key)
+        is recorded in ``spool`` as ``<table>@<n>``; a resumed run truncates
+        the file to the last recorded size and continues from the next chunk.
+        """
+        state, parquet = self.open_chunked_output(table_name, output_path, spool)
+        if not key and "order" not in state:
+            rows = list(self.iter_adhoc_query(api_base_url, token, self.order_query(table_name)))
+            state["order"] = self.order_columns(table_name, rows)
+        with open(output_path, "ab") as f:
+            self.resume_chunked_output(f, parquet, output_path, state)
+            while True:
+                query = self.chunk_query(table_name, chunk_size, key, state["last"], state["rows"], state.get("order"))
+                print(f"Running Adhoc query: {query}")
+                records = self.iter_adhoc_query(api_base_url, token, query)
+                state, n = self.write_chunk(f, parquet, records, table_name, key, state, spool)
+                if n < chunk_size or not (key or state.get("order")):
+                    break
+        return self.close_chunked_output(parquet, table_name, output_path, state)
+
+    def open_chunked_output(self, table_name, output_path, spool=None):
+        """(resume state, Parquet writer or None) for a chunked table export."""
+        state = {"chunk": 0, "rows": 0, "bytes": 0, "last": None}
+        if spool is not None:
+            done = [int(k.rsplit("@", 1)[1]) for k in spool.keys() if k.startswith(f"{table_name}@")]
+            if done:
+                state = spool.get(f"{table_name}@{max(done)}")
+                print(f"Resuming {table_name} after chunk {state['chunk']} ({state['rows']} rows)")
+        parquet = None
+        if self.cfg.get('output', {}).get('parquet'):
+            parquet = ParquetRecordWriter(os.path.splitext(output_path)[0] + ".parquet")
+        return state, parquet
+
+    def resume_chunked_output(self, f, parquet, output_path, state):
+        f.truncate(state["bytes"])
+        if parquet is not None and state["bytes"]:
+            # A Parquet file cannot be appended to; rebuild it from the rows already on disk.
+            with open(output_path, "rb") as done_rows:
+                parquet.write_many(json.loads(line) for line in done_rows)
+
+    def write_chunk(self, f, parquet, records, table_name, key, state, spool=None):
+        """Append one chunk's records, flush, and record the new state; returns (state, rows).
+
+        Raises ValueError when two rows share a ``key`` value: key-range
+        chunks would skip the rest of the rows tied at a chunk boundary.
+        """
+        n = 0
+        last = None
+        for record in records:
+            if key:
+                value = record.get(key) if isinstance(key, str) else [record.get(k) for k in key]
+                if n and value == last:
+                    raise ValueError(f"adhoc_chunk_keys for {table_name} is not unique: {value!r} repeats")
+                last = value
+            f.write(json.dumps(record).encode("utf-8") + b"\n")
+            if parquet is not None:
+                parquet.write(record)
+            n += 1
+        f.flush()
+        os.fsync(f.fileno())
+        state = dict(state, chunk=state["chunk"] + 1, rows=state["rows"] + n, bytes=f.tell(),
+                     last=last if n and key else state["last"])
+        if spool is not None:
+            spool.put(f"{table_name}@{state['chunk']}", state, count=n)
+        return state, n
+
+    def close_chunked_output(self, parquet, table_name, output_path, state):
+        if parquet is not None:
+            parquet.close()
+        print(f"Saved {state['rows']} rows from {table_name} to {output_path}")
+        return state["rows"]
+
+    def extract_all_adhoc_tables(self, api_base_url, token, tables_json_path, output_dir, spool=None):
+        summary, todo = self.plan_tables(tables_json_path, output_dir, spool)
+        max_workers = self.cfg.get('max_workers', 1)
+        print(f"Extracting {len(todo)} tables with {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(self.extract_table, api_base_url, token, name, path, spool) for name, path in todo]
+            # Workers also put their tables' chunk states into the spool from their own threads; PageSpool.put is locked.
+            for future in as_completed(futures):
+                result = future.result()
+                summary.append(result)
+                if result["status"] == "ok" and spool is not None:
+                    spool.put(result["table"], count=result["rows"])
+        return self.finish_tables(summary, output_dir, spool)
+
+    def plan_tables(self, tables_json_path, output_dir, spool=None):
+        """(summary of tables skipped as already extracted, [(table, output path)] to extract)."""
         print(f"Loading table list from {tables_json_path}")
         print(f"Current working directory: {os.getcwd()}")
         with open(tables_json_path) as f:
             tables_info = json.load(f)
         tables = tables_info.get("tables", [])
         os.makedirs(output_dir, exist_ok=True)
+        extension = "ndjson" if self.cfg.get('adhoc_chunk_size') else "json"
+        summary = []
+        todo = []
         for table in tables:
             table_name = table["name"]
-            print(f"Extracting all data from table: {table_name}")
-            query = f"SELECT * FROM {table_name}"
-            output_path = os.path.join(output_dir, f"wayne_ky_{table_name}.json")
-            print(f"Writing to: {output_path}")
-            try:
-                ensure_dir_exists(output_path)
-                self.run_adhoc_query(api_base_url, token, query, output_path)
-                print(f"File exists after write? {os.path.exists(output_path)}")
-            except Exception as e:
-                print(f"Failed to extract table {table_name}: {e}") 
\ No newline at end of file
+            output_path = os.path.join(output_dir, f"wayne_ky_{table_name}.{extension}")
+            if spool is not None and spool.is_done(table_name) and os.path.exists(output_path):
+                print(f"Skipping table {table_name}: already extracted")
+                summary.append({"table": table_name, "status": "skipped", "rows": spool.done[table_name],
+                                "seconds": 0.0, "output": output_path, "error": None})
+                continue
+            todo.append((table_name, output_path))
+        return summary, todo
+
+    def finish_tables(self, summary, output_dir, spool=None):
+        failed = [r["table"] for r in summary if r["status"] == "failed"]
+        self.write_table_summary(summary, os.path.join(output_dir, "wayne_ky_extract_summary.json"))
+        # Keep the spool while anything failed so the next run retries only those tables.
+        if spool is not None and not failed:
+            spool.clear()
+        return summary
+
+    def extract_table(self, api_base_url, token, table_name, output_path, spool=None):
+        """Export one table; returns a summary dict instead of raising."""
+        started, result = self.start_table(table_name, output_path)
+        try:
+            chunk_size = self.cfg.get('adhoc_chunk_size')
+            if chunk_size:
+                key = (self.cfg.get('adhoc_chunk_keys') or {}).get(table_name)
+                result["rows"] = self.run_chunked_query(api_base_url, token, table_name, output_path, chunk_size, key, spool)
+            else:
+                results = self.run_adhoc_query(api_base_url, token, f"SELECT * FROM {table_name}", output_path)
+                result["rows"] = self.table_results_written(results, output_path)
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+        return self.finish_table(started, result)
+
+    def start_table(self, table_name, output_path):
+        print(f"Extracting all data from table: {table_name}")
+        ensure_dir_exists(output_path)
+        return time.perf_counter(), {"table": table_name, "status": "ok", "rows": None, "seconds": 0.0,
+                                     "output": output_path, "error": None}
+
+    def table_results_written(self, results, output_path):
+        """Row count of a whole-table query already saved as JSON, also writing Parquet if configured."""
+        if self.cfg.get('output', {}).get('parquet') and isinstance(results, list):
+            with ParquetRecordWriter(os.path.splitext(output_path)[0] + ".parquet") as writer:
+                writer.write_many(results)
+        return len(results) if isinstance(results, list) else None
+
+    def finish_table(self, started, result):
+        """Time and record the table metric for ``result``; returns it."""
+        output_path, table_name = result["output"], result["table"]
+        seconds = time.perf_counter() - started
+        result["seconds"] = round(seconds, 3)
+        size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        self.metrics.record('table', seconds, result["rows"] or 0, size, result["status"], self.jurisdiction,
+                            table=table_name)
+        return result
+
+    def write_table_summary(self, summary, path):
+        summary = sorted(summary, key=lambda r: r["table"])
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        counts = {}
+        for r in summary:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        print(f"Table extraction summary ({path}):")
+        for r in summary:
+            detail = r["error"] if r["status"] == "failed" else f"{r['rows']} rows"
+            print(f"  {r['table']:<40} {r['status']:<8} {r['seconds']:>8.1f}s  {detail}")
+        print("  " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
@@ -0,0 +1,107 @@
+import os
+import asyncio
+from customer_data.etl.async_base import AsyncJurisdictionETL
+from customer_data.etl.wayne_ky import WayneKYETL
+from customer_data.checkpoint import PageSpool
+
+class AsyncWayneKYETL(AsyncJurisdictionETL, WayneKYETL):
+    """``WayneKYETL`` with its Adhoc table queries multiplexed on an asyncio event loop.
+
+    Up to ``max_workers`` tables are queried at once over one session. Each
+    chunk of a chunked export is read whole before it is written, so memory
+    is bounded by ``adhoc_chunk_size`` rather than by the streaming parser.
+    """
+
+    async def extract_async(self, checkpoint_file=None):
+        cfg = self.cfg
+        api_base_url = cfg['api_base_url']
+        auth_url, payload = self.auth_request(api_base_url)
+        print(f"Authenticating to PVDNet API at {auth_url}...")
+        with self.stage('auth'):
+            r = await self.ahttp.post(auth_url, json=payload, headers={"Content-Type": "application/json"})
+            token, resource_groups = self.parse_auth(r)
+        print(f"Authenticated; resource groups: {resource_groups}")
+        base_dir = os.path.join("output", "ky", "wayne")
+        os.makedirs(base_dir, exist_ok=True)
+        tables_output = os.path.join(base_dir, "wayne_ky_adhoc_tables.json")
+        await self.fetch_adhoc_tables_async(api_base_url, token, tables_output)
+        adhoc_query = cfg.get('adhoc_query')
+        if adhoc_query:
+            query_output = os.path.join(base_dir, "wayne_ky_adhoc_query.json")
+            print(f"Running Adhoc query: {adhoc_query}")
+            results = await self.adhoc_query_async(api_base_url, token, adhoc_query)
+            await self.run_blocking(self.save_query_results, results, query_output)
+        if cfg.get('extract_all_tables'):
+            output_dir = os.path.join(base_dir, "all_tables")
+            os.makedirs(output_dir, exist_ok=True)
+            spool = PageSpool(checkpoint_file or '.checkpoint', {'api_base_url': api_base_url, 'output_dir': output_dir})
+            await self.extract_all_adhoc_tables_async(api_base_url, token, tables_output, output_dir, spool)
+        return {"token": token, "resourceGroups": resource_groups}
+
+    async def fetch_adhoc_tables_async(self, api_base_url, token, output_path):
+        url = f"{api_base_url}/adhoc/tables"
+        print(f"Fetching Adhoc tables from {url}")
+        with self.stage('tables') as m:
+            resp = await self.ahttp.get(url, headers={"AccessToken": token})
+            resp.raise_for_status()
+            tables = resp.json()
+            m['bytes'] = len(resp.content)
+        return await self.run_blocking(self.save_tables, tables, output_path)
+
+    async def adhoc_query_async(self, api_base_url, token, query):
+        url = f"{api_base_url}/adhoc/tables/query"
+        headers = {"AccessToken": token, "Content-Type": "application/json"}
+        resp = await self.ahttp.post(url, headers=headers, json={"Query": query}, retry=True)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def extract_all_adhoc_tables_async(self, api_base_url, token, tables_json_path, output_dir, spool=None):
+        summary, todo = self.plan_tables(tables_json_path, output_dir, spool)
+        print(f"Extracting {len(todo)} tables, {self.concurrency} at a time")
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def extract(name, path):
+            async with slots:
+                return await self.extract_table_async(api_base_url, token, name, path, spool)
+
+        for result in await asyncio.gather(*(extract(name, path) for name, path in todo)):
+            summary.append(result)
+            if result["status"] == "ok" and spool is not None:
+                spool.put(result["table"], count=result["rows"])
+        return self.finish_tables(summary, output_dir, spool)
+
+    async def extract_table_async(self, api_base_url, token, table_name, output_path, spool=None):
+        started, result = self.start_table(table_name, output_path)
+        try:
+            chunk_size = self.cfg.get('adhoc_chunk_size')
+            if chunk_size:
+                key = (self.cfg.get('adhoc_chunk_keys') or {}).get(table_name)
+                result["rows"] = await self.run_chunked_query_async(api_base_url, token, table_name, output_path,
+                                                                    chunk_size, key, spool)
+            else:
+                query = f"SELECT * FROM {table_name}"
+                print(f"Running Adhoc query: {query}")
+                results = await self.adhoc_query_async(api_base_url, token, query)
+                results = await self.run_blocking(self.save_query_results, results, output_path)
+                result["rows"] = self.table_results_written(results, output_path)
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+        return self.finish_table(started, result)
+
+    async def run_chunked_query_async(self, api_base_url, token, table_name, output_path, chunk_size, key=None, spool=None):
+        state, parquet = await self.run_blocking(self.open_chunked_output, table_name, output_path, spool)
+        if not key and "order" not in state:
+            rows = await self.adhoc_query_async(api_base_url, token, self.order_query(table_name))
+            state["order"] = self.order_columns(table_name, rows)
+        with open(output_path, "ab") as f:
+            await self.run_blocking(self.resume_chunked_output, f, parquet, output_path, state)
+            while True:
+                query = self.chunk_query(table_name, chunk_size, key, state["last"], state["rows"], state.get("order"))
+                print(f"Running Adhoc query: {query}")
+                records = await self.adhoc_query_async(api_base_url, token, query)
+                # NDJSON and Parquet writes go to the executor so other tables' queries keep flowing.
+                state, n = await self.run_blocking(self.write_chunk, f, parquet, records, table_name, key, state, spool)
+                if n < chunk_size or not (key or state.get("order")):
+                    break
+        return await self.run_blocking(self.close_chunked_output, parquet, table_name, output_path, state)
@@ -1,16 +1,15 @@
 import os
-import requests
-from dotenv import load_dotenv
-from .checkpoint import save_checkpoint, load_checkpoint
 import json
-from customer_data.etl.bossier_la import BossierETL
-from customer_data.etl.wayne_ky import WayneKYETL
-from customer_data.etl.tulsa_ok import TulsaOKETL
-from customer_data.etl.base import BaseJurisdictionETL
+from .registry import load_etl_class
+
+def get_http_client():
+    # requests is only imported once a request is actually made.
+    from .transport import get_http_client
+    return get_http_client()
 
 
 def fetch_metadata(url):
-    r = requests.get(f'{url}?f=pjson')
+    r = get_http_client().get(f'{url}?f=pjson')
     r.raise_for_status()
     return r.json()
 
@@ -25,13 +24,13 @@ def fetch_features(url, out_fields, offset, page_size, out_sr):
         'outSR': out_sr
     }
     print(f"Fetching features: offset={offset} page_size={page_size}")
-    r = requests.get(f'{url}/query', params=params)
+    r = get_http_client().get(f'{url}/query', params=params)
     r.raise_for_status()
     return r.json()
 
 def get_total_count(url):
     params = {'f': 'json', 'where': '1=1', 'returnCountOnly': 'true'}
-    r = requests.get(f'{url}/query', params=params)
+    r = get_http_client().get(f'{url}/query', params=params)
     r.raise_for_status()
     count = r.json().get('count', None)
     print(f"Total feature count: {count}")
@@ -50,10 +49,9 @@ def fetch_tulsa_data(url, token, last_modified=None):
     
     print(f"Fetching Tulsa data with lastModified: {last_modified}")
     print(f"URL: {url}")
-    print(f"Headers: {headers}")
     print(f"Params: {params}")
     
-    r = requests.get(url, headers=headers, params=params)
+    r = get_http_client().get(url, headers=headers, params=params)
     
     if not r.ok:
         print(f"API Error: {r.status_code} {r.reason}")
@@ -84,7 +82,7 @@ def extract_tulsa(cfg, checkpoint_file):
         actual_token = os.getenv(token)
         if actual_token:
             token = actual_token
-            print(f"Using token from environment variable: {token[:10]}...")
+            print("Using token from environment variable")
         else:
             print(f"Warning: Environment variable {token} not found. Using placeholder token.")
     
@@ -100,9 +98,9 @@ def fetch_pvdnet_endpoint(api_base_url, token, endpoint, method="GET", params=No
     headers = {"AccessToken": token, "Content-Type": "application/json"}
     url = f"{api_base_url}/{endpoint.lstrip('/')}"
     if method.upper() == "GET":
-        resp = requests.get(url, headers=headers, params=params)
+        resp = get_http_client().get(url, headers=headers, params=params)
     elif method.upper() == "POST":
-        resp = requests.post(url, headers=headers, json=data)
+        resp = get_http_client().post(url, headers=headers, json=data)
     else:
         raise ValueError(f"Unsupported method: {method}")
     resp.raise_for_status()
@@ -131,7 +129,7 @@ def fetch_adhoc_tables(api_base_url, token, output_path):
     headers = {"AccessToken": token}
     url = f"{api_base_url}{endpoint}"
     print(f"Fetching Adhoc tables from {url}")
-    resp = requests.get(url, headers=headers)
+    resp = get_http_client().get(url, headers=headers)
     resp.raise_for_status()
     import json
     tables = json.loads(resp.content.decode("utf-8-sig"))
@@ -147,7 +145,7 @@ def run_adhoc_query(api_base_url, token, query, output_path):
     url = f"{api_base_url}{endpoint}"
     payload = {"Query": query}
     print(f"Running Adhoc query: {query}")
-    resp = requests.post(url, headers=headers, json=payload)
+    resp = get_http_client().post(url, headers=headers, json=payload, retry=True)
     resp.raise_for_status()
     import json
     results = json.loads(resp.content.decode("utf-8-sig"))
@@ -177,17 +175,24 @@ def extract_all_adhoc_tables(cfg, api_base_url, token, tables_json_path, output_
         except Exception as e:
             print(f"Failed to extract table {table_name}: {e}")
 
-def get_etl_class(api_type):
-    if api_type == 'wayne_ky':
-        return WayneKYETL
-    if api_type == 'tulsa':
-        return TulsaOKETL
-    if api_type == 'bossier':
-        return BossierETL
-    raise ValueError(f"Unsupported api_type: {api_type}")
+def get_etl_class(api_type, engine='sync', cfg=None):
+    """The ETL class for ``api_type``; see :mod:`customer_data.registry`."""
+    return load_etl_class(api_type, engine, cfg)
 
 def extract_all(cfg, checkpoint_file):
     api_type = cfg.get('api_type')
-    etl_cls = get_etl_class(api_type)
+    etl_cls = get_etl_class(api_type, cfg.get('engine', 'sync'), cfg)
     etl = etl_cls(cfg)
-    return etl.extract(checkpoint_file) 
\ No newline at end of file
+    with etl.stage('extract'):
+        return etl.extract(checkpoint_file)
+
+async def extract_all_async(cfg, checkpoint_file, client=None):
+    """Run one jurisdiction on the current event loop. Async ETLs share ``client``;
+    the others run in a worker thread."""
+    import asyncio
+    from customer_data.etl.async_base import AsyncJurisdictionETL
+    etl = get_etl_class(cfg.get('api_type'), 'async', cfg)(cfg)
+    with etl.stage('extract'):
+        if isinstance(etl, AsyncJurisdictionETL):
+            return await etl.run_async(checkpoint_file, client)
+        return await asyncio.to_thread(etl.extract, checkpoint_file)
@@ -0,0 +1,337 @@
+import os
+import json
+import shutil
+import numpy as np
+
+FORMAT = 'customer-data-feature-cache'
+VERSION = 1
+
+FIELD_KINDS = {
+    'esriFieldTypeOID': 'int',
+    'esriFieldTypeInteger': 'int',
+    'esriFieldTypeSmallInteger': 'int',
+    'esriFieldTypeBigInteger': 'int',
+    'esriFieldTypeDate': 'int',
+    'esriFieldTypeDouble': 'float',
+    'esriFieldTypeSingle': 'float',
+}
+
+GEOMETRY_KINDS = {
+    'esriGeometryPolygon': 'rings',
+    'esriGeometryPolyline': 'paths',
+    'esriGeometryPoint': 'point',
+    'esriGeometryMultipoint': 'multipoint',
+}
+
+# Parts with fewer vertices than this are dropped, as in transform.esri_json_to_shapely_array.
+MIN_VERTICES = {'rings': 4, 'paths': 2, 'point': 1, 'multipoint': 1}
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    return pa
+
+def is_feature_cache(path):
+    return os.path.isfile(os.path.join(path, 'cache.json'))
+
+def remove_feature_cache(path):
+    """Delete a cache directory, or a JSON cache file from older versions."""
+    if os.path.isfile(path):
+        os.remove(path)
+    else:
+        shutil.rmtree(path, ignore_errors=True)
+
+def _geometry_kind(geom):
+    for key, kind in (('rings', 'rings'), ('paths', 'paths'), ('points', 'multipoint'), ('x', 'point')):
+        if key in geom:
+            return kind
+    return None
+
+
+class FeatureCacheWriter:
+    """Write ArcGIS features to a columnar, memory-mappable cache directory.
+
+    Every attribute column is a flat binary file: ``int`` and ``float``
+    columns (typed from the layer's ESRI field types) are raw int64/float64
+    values, other columns are UTF-8 bytes plus int64 end offsets (JSON-encoded
+    for attributes missing from the layer's field list); each has a uint8
+    validity mask. Geometries are stored as one float64 x/y coordinate
+    buffer plus vertex counts per part and part counts per feature. Pages are
+    appended as they arrive, and ``cache.json`` is written last by
+    ``close()``, so an interrupted run leaves no cache that looks complete.
+    """
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+        self.count = 0
+        self.geometry = GEOMETRY_KINDS.get(meta.get('geometryType'))
+        self.columns = {}
+        self._bytes = {}
+        self._warned = set()
+        remove_feature_cache(path)
+        os.makedirs(path)
+        for field in meta.get('fields', []):
+            self._add_column(field['name'], FIELD_KINDS.get(field.get('type'), 'str'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _append(self, name, array):
+        with open(self._file(name), 'ab') as f:
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def _add_column(self, name, kind):
+        prefix = f'c{len(self.columns)}'
+        self.columns[name] = {'kind': kind, 'file': prefix}
+        self._bytes[name] = 0
+        # Rows written before this column was first seen are null.
+        self._append(f'{prefix}.valid', np.zeros(self.count, dtype=np.uint8))
+        if kind in ('str', 'json'):
+            self._append(f'{prefix}.offsets', np.zeros(self.count, dtype=np.int64))
+            open(self._file(f'{prefix}.data'), 'ab').close()
+        else:
+            self._append(f'{prefix}.values', np.zeros(self.count, dtype=np.int64 if kind == 'int' else np.float64))
+
+    def write_page(self, features):
+        """Append one page of ESRI JSON features."""
+        if not features:
+            return
+        records = [f.get('attributes') or {} for f in features]
+        for record in records:
+            for name in record:
+                if name not in self.columns:
+                    # Not declared in the layer fields; JSON keeps whatever type it has.
+                    self._add_column(name, 'json')
+        for name, column in self.columns.items():
+            self._write_column(name, column, [r.get(name) for r in records])
+        self._write_geometries([f.get('geometry') for f in features])
+        self.count += len(features)
+
+    def _write_column(self, name, column, values):
+        prefix, kind = column['file'], column['kind']
+        valid = np.fromiter((v is not None for v in values), dtype=np.uint8, count=len(values))
+        if kind in ('str', 'json'):
+            encode = json.dumps if kind == 'json' else (lambda v: v if isinstance(v, str) else json.dumps(v))
+            encoded = [b'' if v is None else encode(v).encode('utf-8') for v in values]
+            ends = self._bytes[name] + np.cumsum([len(b) for b in encoded], dtype=np.int64)
+            with open(self._file(f'{prefix}.data'), 'ab') as f:
+                f.write(b''.join(encoded))
+            self._bytes[name] = int(ends[-1])
+            self._append(f'{prefix}.offsets', ends)
+        else:
+            cast = int if kind == 'int' else float
+            out = np.zeros(len(values), dtype=np.int64 if kind == 'int' else np.float64)
+            for i, v in enumerate(values):
+                if v is None:
+                    continue
+                try:
+                    out[i] = cast(v)
+                except (TypeError, ValueError, OverflowError):
+                    valid[i] = 0
+                    if name not in self._warned:
+                        self._warned.add(name)
+                        print(f"Warning: {self.path}: nulling values of {name!r} that are not {kind}")
+            self._append(f'{prefix}.values', out)
+        self._append(f'{prefix}.valid', valid)
+
+    def _write_geometries(self, geoms):
+        part_counts = np.zeros(len(geoms), dtype=np.int64)
+        lengths, vertices = [], []
+        for i, g in enumerate(geoms):
+            if not g or not isinstance(g, dict):
+                continue
+            if self.geometry is None:
+                self.geometry = _geometry_kind(g)
+            if self.geometry == 'point':
+                parts = [[[g['x'], g['y']]]] if g.get('x') is not None and g.get('y') is not None else []
+            elif self.geometry == 'multipoint':
+                parts = [g.get('points') or []]
+            else:
+                parts = g.get(self.geometry) or []
+            for part in parts:
+                if part and len(part) >= MIN_VERTICES.get(self.geometry, 1):
+                    part_counts[i] += 1
+                    lengths.append(len(part))
+                    vertices.extend(v[:2] for v in part)
+        self._append('geom.parts', part_counts)
+        self._append('geom.lengths', np.asarray(lengths, dtype=np.int64))
+        self._append('geom.coords', np.asarray(vertices, dtype=np.float64).reshape(-1, 2))
+
+    def close(self):
+        if os.path.exists(self._file('cache.json')):
+            return
+        if not os.path.exists(self._file('geom.parts')):
+            self._write_geometries([])
+        header = {
+            'format': FORMAT,
+            'version': VERSION,
+            'count': self.count,
+            'geometry': self.geometry,
+            'columns': self.columns,
+            'meta': self.meta,
+        }
+        tmp = self._file('cache.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(header, f)
+        os.replace(tmp, self._file('cache.json'))
+
+
+def write_feature_cache(path, meta, features, page_size=10000):
+    """Write an in-memory feature list to a cache, ``page_size`` features at a time."""
+    with FeatureCacheWriter(path, meta) as writer:
+        for start in range(0, len(features), page_size):
+            writer.write_page(features[start:start + page_size])
+    return path
+
+
+class FeatureCache:
+    """Lazy reader for a cache written by :class:`FeatureCacheWriter`.
+
+    Opening reads only ``cache.json``; column and geometry buffers are
+    memory-mapped on first use and only the requested rows are decoded.
+    ``rows`` may be a slice, an integer index array or a boolean mask.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'cache.json')) as f:
+            header = json.load(f)
+        if header.get('format') != FORMAT or header.get('version') != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} feature cache")
+        self.meta = header['meta']
+        self.count = header['count']
+        self.geometry_kind = header['geometry']
+        self.column_info = header['columns']
+        self._maps = {}
+        self._offsets = {}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def columns(self):
+        return list(self.column_info)
+
+    def _map(self, name, dtype, shape=None):
+        if name not in self._maps:
+            path = os.path.join(self.path, name)
+            if os.path.getsize(path) == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.memmap(path, dtype=dtype, mode='r')
+            self._maps[name] = array.reshape(shape) if shape else array
+        return self._maps[name]
+
+    def _value_offsets(self, prefix):
+        """A string column's offsets with a leading 0, so row i spans
+        ``offsets[i]:offsets[i + 1]``; built once per column."""
+        if prefix not in self._offsets:
+            offsets = np.zeros(self.count + 1, dtype=np.int64)
+            offsets[1:] = self._map(f'{prefix}.offsets', np.int64)
+            self._offsets[prefix] = offsets
+        return self._offsets[prefix]
+
+    def _strings(self, prefix, index):
+        """Decode the strings of ``index`` rows into an object array."""
+        offsets = self._value_offsets(prefix)
+        data = self._map(f'{prefix}.data', np.uint8)
+        pa = _pyarrow()
+        if pa is not None:
+            # Zero-copy Arrow view over the mapped buffers; take() and to_numpy() decode in C.
+            strings = pa.LargeStringArray.from_buffers(self.count, pa.py_buffer(offsets), pa.py_buffer(data))
+            return strings.take(pa.array(index, type=pa.int64())).to_numpy(zero_copy_only=False)
+        starts, ends = offsets[index], offsets[np.asarray(index) + 1]
+        lo = int(starts.min()) if len(index) else 0
+        hi = int(ends.max()) if len(index) else 0
+        raw = data[lo:hi].tobytes()
+        out = np.empty(len(index), dtype=object)
+        out[:] = [raw[a:b].decode('utf-8') for a, b in zip((starts - lo).tolist(), (ends - lo).tolist())]
+        return out
+
+    def _rows(self, rows):
+        if rows is None:
+            return np.arange(self.count)
+        index = np.arange(self.count)[rows]
+        return np.atleast_1d(index)
+
+    def column(self, name, rows=None):
+        """One attribute column as a NumPy array. As when pandas builds a
+        frame from records, numeric columns with nulls come back as float
+        with NaN and string columns as objects with None."""
+        info = self.column_info[name]
+        prefix = info['file']
+        index = self._rows(rows)
+        valid = self._map(f'{prefix}.valid', np.uint8)[index].astype(bool)
+        if info['kind'] in ('str', 'json'):
+            out = self._strings(prefix, index)
+            out[~valid] = None
+            if info['kind'] == 'json':
+                out[valid] = [json.loads(text) for text in out[valid]]
+            return out
+        values = np.asarray(self._map(f'{prefix}.values', np.int64 if info['kind'] == 'int' else np.float64)[index])
+        if valid.all():
+            return values
+        values = values.astype(np.float64)
+        values[~valid] = np.nan
+        return values
+
+    def geometries(self, rows=None):
+        """Shapely geometries for ``rows`` (all rows by default)."""
+        import shapely
+        from shapely import GeometryType
+        from .transform import polygons_from_rings, lines_from_paths
+        index = self._rows(rows)
+        part_counts = self._map('geom.parts', np.int64)
+        lengths = self._map('geom.lengths', np.int64)
+        coords = self._map('geom.coords', np.float64, (-1, 2))
+        part_ends = np.cumsum(part_counts)
+        vertex_ends = np.cumsum(lengths)
+        # Gather the parts of the selected rows, then their vertices, into contiguous arrays.
+        counts = np.asarray(part_counts[index])
+        part_idx = np.repeat(part_ends[index] - counts, counts) + (
+            np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+        part_lengths = np.asarray(lengths[part_idx])
+        vertex_idx = np.repeat(vertex_ends[part_idx] - part_lengths, part_lengths) + (
+            np.arange(part_lengths.sum()) - np.repeat(np.cumsum(part_lengths) - part_lengths, part_lengths))
+        xy = np.asarray(coords[vertex_idx])
+        owner = np.repeat(np.arange(len(index)), counts)
+        starts = np.concatenate([[0], np.cumsum(part_lengths)[:-1]]).astype(np.int64)
+        kind = self.geometry_kind
+        if kind == 'rings':
+            return polygons_from_rings(xy, owner, starts, part_lengths, len(index))
+        if kind == 'paths':
+            return lines_from_paths(xy, owner, starts, part_lengths, len(index))
+        out = np.full(len(index), None, dtype=object)
+        has_geom = counts > 0
+        if kind == 'point':
+            out[has_geom] = shapely.points(xy)
+        elif kind == 'multipoint':
+            offsets = np.concatenate([[0], np.cumsum(part_lengths)])
+            out[has_geom] = shapely.from_ragged_array(GeometryType.MULTIPOINT, xy, (offsets,))
+        return out
+
+    def to_gdf(self, columns=None, rows=None, geometry=True):
+        """Build a GeoDataFrame (EPSG:4326) from the selected columns and rows."""
+        import geopandas as gpd
+        import pandas as pd
+        names = self.columns if columns is None else columns
+        index = self._rows(rows)
+        # JSON columns hold arbitrary Python values; let pandas infer their dtype as it does for records.
+        frame = pd.DataFrame({
+            name: self.column(name, index).tolist() if self.column_info[name]['kind'] == 'json'
+            else self.column(name, index)
+            for name in names
+        }, columns=names)
+        if not geometry:
+            return frame
+        return gpd.GeoDataFrame(frame, geometry=self.geometries(index), crs='EPSG:4326')
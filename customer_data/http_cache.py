@@ -0,0 +1,304 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MODES = ('record', 'replay', 'revalidate')
+# Response headers worth keeping; cookies and anything else are dropped.
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date', 'Cache-Control')
+# Requests that carry credentials: recorded without them (see ResponseCache).
+DEFAULT_EXCLUDE = ('/authenticate',)
+# JSON fields of an excluded response replaced by REDACTED before it is stored.
+SECRET_FIELDS = ('token', 'password', 'secret')
+REDACTED = 'redacted-by-http-cache'
+TAIL_BYTES = 1 << 20
+
+
+class CacheMissError(RuntimeError):
+    """A replay-mode request that has no recorded response."""
+
+
+class ResponseCache:
+    """On-disk HTTP response cache for :class:`~customer_data.transport.HttpClient`.
+
+    Bodies are stored once per content under ``objects/`` as gzip files named
+    by their SHA-256, so identical pages recorded by different requests or
+    runs share one file. ``keys/`` maps each request (method, URL with sorted
+    query parameters and body; headers are ignored so tokens never end up in
+    keys) to the status, a few response headers and the body hash.
+
+    ``record`` always goes to the network and stores 200 responses.
+    ``replay`` never does: every request is answered from the cache and a
+    miss raises :class:`CacheMissError`. ``revalidate`` sends the stored
+    ``ETag``/``Last-Modified`` as ``If-None-Match``/``If-Modified-Since`` and
+    serves the cached body on a 304, storing it afresh otherwise.
+
+    URLs containing one of ``exclude`` (logins) always go to the network
+    outside ``replay``, and the caller gets the real response. What is
+    stored is keyed on the method and path alone, so credentials in the
+    query or body never reach disk, and only a JSON object body is kept,
+    with every field whose name contains one of ``SECRET_FIELDS`` replaced
+    by ``REDACTED``. ``replay`` serves that copy, so an offline run logs in
+    with a placeholder token, which is all it needs: headers are not part of
+    the keys.
+
+    Streamed responses are written through to the cache as the caller reads
+    them and replayed from the gzip file, so neither holds a body in memory.
+    """
+
+    def __init__(self, path='.http_cache', mode='record', exclude=DEFAULT_EXCLUDE):
+        if mode not in MODES:
+            raise ValueError(f"http cache mode must be one of {', '.join(MODES)}, not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.exclude = tuple(exclude or ())
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'not_modified': 0, 'stored': 0}
+        os.makedirs(os.path.join(path, 'keys'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'tmp'), exist_ok=True)
+
+    def handles(self, method, url):
+        return method.upper() in ('GET', 'POST')
+
+    def excluded(self, url):
+        return any(p in url for p in self.exclude)
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+    @staticmethod
+    def key(method, url, params=None, json_body=None, data=None):
+        """Request fingerprint: SHA-256 of the method, canonical URL and body."""
+        prepared = requests.Request(method.upper(), url, params=params, json=json_body, data=data).prepare()
+        parts = urlsplit(prepared.url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        canonical = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ''))
+        body = prepared.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha256(f'{method.upper()}\n{canonical}\n'.encode('utf-8') + body)
+        return digest.hexdigest(), canonical
+
+    def _key_path(self, key):
+        return os.path.join(self.path, 'keys', key[:2], f'{key}.json')
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, 'objects', digest[:2], f'{digest}.gz')
+
+    def lookup(self, key):
+        try:
+            with open(self._key_path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if os.path.exists(self._object_path(entry['body'])) else None
+
+    def request(self, send, method, url, **kwargs):
+        """Answer a request through the cache, calling ``send`` for network access."""
+        if self.excluded(url):
+            return self._excluded_request(send, method, url, **kwargs)
+        key, canonical = self.key(method, url, kwargs.get('params'), kwargs.get('json'), kwargs.get('data'))
+        entry = self.lookup(key)
+        if self.mode == 'replay':
+            if entry is None:
+                self._count('misses')
+                raise CacheMissError(f"No recorded response for {method.upper()} {canonical} in {self.path}")
+            self._count('hits')
+            return self.response(entry, kwargs.get('stream'))
+        if self.mode == 'revalidate' and entry is not None:
+            validators = {}
+            if entry['headers'].get('ETag'):
+                validators['If-None-Match'] = entry['headers']['ETag']
+            if entry['headers'].get('Last-Modified'):
+                validators['If-Modified-Since'] = entry['headers']['Last-Modified']
+            if validators:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **validators}
+        resp = send(method, url, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            resp.close()
+            self._count('not_modified')
+            return self.response(entry, kwargs.get('stream'))
+        self._count('misses')
+        if resp.status_code != 200:
+            return resp
+        meta = {
+            'method': method.upper(),
+            'url': canonical,
+            'status': resp.status_code,
+            'headers': {h: resp.headers[h] for h in STORED_HEADERS if h in resp.headers},
+        }
+        if kwargs.get('stream'):
+            resp.raw = _TeeReader(resp.raw, self, key, meta)
+        else:
+            self.store(key, meta, [resp.content])
+        return resp
+
+    def _excluded_request(self, send, method, url, **kwargs):
+        parts = urlsplit(url)
+        path = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, '', ''))
+        key = hashlib.sha256(f'{method.upper()}\n{path}\n'.encode('utf-8')).hexdigest()
+        if self.mode == 'replay':
+            entry = self.lookup(key)
+            if entry is None:
+                self._count('misses')
+                raise CacheMissError(f"No recorded response for {method.upper()} {path} in {self.path}")
+            self._count('hits')
+            return self.response(entry, kwargs.get('stream'))
+        resp = send(method, url, **kwargs)
+        self._count('misses')
+        if resp.status_code != 200 or kwargs.get('stream'):
+            return resp
+        try:
+            body = resp.json()
+        except ValueError:
+            return resp
+        if isinstance(body, dict):
+            meta = {'method': method.upper(), 'url': path, 'status': 200,
+                    'headers': {h: resp.headers[h] for h in ('Content-Type',) if h in resp.headers}}
+            self.store(key, meta, [json.dumps(_redact(body)).encode('utf-8')])
+        return resp
+
+    def store(self, key, meta, chunks):
+        """Write ``chunks`` as the body of ``key``."""
+        writer = _BodyWriter(self)
+        for chunk in chunks:
+            writer.write(chunk)
+        writer.finish(key, meta)
+
+    def response(self, entry, stream=False):
+        """A ``requests.Response`` for ``entry``.
+
+        Streamed responses read the body lazily from its gzip file, which the
+        caller closes with the response; otherwise the body is read now and
+        the file closed, as ``requests`` does for a non-streamed request.
+        """
+        resp = requests.Response()
+        resp.status_code = entry['status']
+        resp.reason = 'OK'
+        resp.url = entry['url']
+        resp.headers = CaseInsensitiveDict(entry['headers'])
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.raw = gzip.open(self._object_path(entry['body']), 'rb')
+        if not stream:
+            with resp.raw:
+                resp._content = resp.raw.read()
+            resp._content_consumed = True
+        return resp
+
+
+def _redact(value):
+    """``value`` with every field named like one of ``SECRET_FIELDS`` replaced by ``REDACTED``."""
+    if isinstance(value, dict):
+        return {k: REDACTED if any(s in str(k).lower() for s in SECRET_FIELDS) else _redact(v)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact(v) for v in value]
+    return value
+
+
+class _BodyWriter:
+    """Compress and hash a body into a temporary file, then move it into place."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.join(cache.path, 'tmp'), suffix='.gz')
+        self.out = os.fdopen(fd, 'wb')
+        self.file = gzip.GzipFile(fileobj=self.out, mode='wb', compresslevel=6)
+        self.sha = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.sha.update(chunk)
+        self.size += len(chunk)
+
+    def abort(self):
+        self.file.close()
+        self.out.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+    def finish(self, key, meta):
+        self.file.close()
+        self.out.close()
+        digest = self.sha.hexdigest()
+        target = self.cache._object_path(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            os.remove(self.tmp)
+        else:
+            os.replace(self.tmp, target)
+        entry = dict(meta, body=digest, size=self.size, stored_at=round(time.time(), 3))
+        path = self.cache._key_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        self.cache._count('stored')
+
+
+class _TeeReader:
+    """Wrap a streamed response's urllib3 body so decoded chunks are also cached.
+
+    The entry is only written once the body has been read to the end (or to
+    within ``TAIL_BYTES`` of it when the response is closed); a response
+    abandoned part way leaves nothing behind.
+    """
+
+    def __init__(self, raw, cache, key, meta):
+        self._raw = raw
+        self._cache = cache
+        self._key = key
+        self._meta = meta
+        self._writer = _BodyWriter(cache)
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            self._writer.write(chunk)
+            yield chunk
+        self._finish()
+
+    def read(self, amt=None, decode_content=None, **kwargs):
+        data = self._raw.read(amt, decode_content=decode_content, **kwargs)
+        if data:
+            self._writer.write(data)
+        if not data or amt is None:
+            self._finish()
+        return data
+
+    def _finish(self):
+        if self._writer is not None:
+            self._writer.finish(self._key, self._meta)
+            self._writer = None
+
+    def close(self):
+        if self._writer is not None:
+            # Incremental parsers stop at the closing bracket; a short tail still counts as read.
+            try:
+                tail = self._raw.read(TAIL_BYTES, decode_content=True)
+            except Exception:
+                tail = None
+            if tail is not None and len(tail) < TAIL_BYTES:
+                self._writer.write(tail)
+                self._finish()
+            else:
+                self._writer.abort()
+                self._writer = None
+        self._raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
@@ -1,30 +1,485 @@
+import io
+import os
+import json
+import queue
+import sqlite3
+import threading
+import numpy as np
+import shapely
 import geopandas as gpd
 import pandas as pd
 import psycopg2
+from psycopg2 import sql
+from pandas.api import types as ptypes
 
-def write_geopackage(gdf, owners, path):
-    gdf.to_file(path, layer='features', driver='GPKG')
+COPY_CHUNK_ROWS = 50000
+
+GPKG_BATCH_ROWS = 100000
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _layer_geometry_type(gdf):
+    """Layer geometry type for a frame: the single type present, its Multi
+    form when singles and multis are mixed, otherwise Unknown."""
+    types = set(gdf.geometry.geom_type.dropna().unique())
+    if len(types) == 1:
+        return types.pop()
+    bases = {t[5:] if t.startswith('Multi') else t for t in types}
+    return f'Multi{bases.pop()}' if len(bases) == 1 else 'Unknown'
+
+MULTI_CONSTRUCTORS = {
+    'MultiPoint': shapely.multipoints,
+    'MultiLineString': shapely.multilinestrings,
+    'MultiPolygon': shapely.multipolygons,
+}
+
+def _promote_to_multi(gdf, geometry_type):
+    """Wrap single-part geometries in their Multi type, as ``to_file`` does."""
+    make = MULTI_CONSTRUCTORS.get(geometry_type)
+    if make is None:
+        return gdf
+    geoms = np.asarray(gdf.geometry.values, dtype=object)
+    single = (gdf.geometry.geom_type == geometry_type[5:]).to_numpy()
+    if not single.any():
+        return gdf
+    geoms = geoms.copy()
+    geoms[single] = make(geoms[single][:, None])
+    return gdf.set_geometry(gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs))
+
+
+class GeoPackageWriter:
+    """Bulk GeoPackage layer writer that accepts GeoDataFrames incrementally.
+
+    With pyarrow installed every ``append()``ed batch is streamed as Arrow
+    into a single ``pyogrio.write_arrow`` session running on a background
+    thread, so GDAL writes in large transactions and builds the R-tree spatial
+    index once, in bulk, when ``close()`` ends the session. Later batches are
+    cast to the schema of the first. Without pyarrow each batch is appended
+    with ``pyogrio.write_dataframe`` instead (slower; the index is maintained
+    row by row).
+
+    Pass the ``geometry_type`` of the whole layer when appending it in
+    batches; otherwise it is taken from the first batch, and later batches
+    with other types would not fit it.
+    """
+
+    def __init__(self, path, layer='features', geometry_type=None):
+        self.path = path
+        self.layer = layer
+        self.geometry_type = geometry_type
+        self.count = 0
+        self.use_arrow = _has_pyarrow()
+        self._created = not os.path.exists(path)
+        self._queue = None
+        self._thread = None
+        self._error = None
+        self._schema = None
+        self._drained = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(abort=exc_type is not None)
+
+    def append(self, gdf):
+        if gdf.empty:
+            return
+        if not self.use_arrow:
+            import pyogrio
+            pyogrio.write_dataframe(gdf, self.path, layer=self.layer, driver='GPKG',
+                                    append=self.count > 0, geometry_type=self.geometry_type)
+            self.count += len(gdf)
+            return
+        import pyarrow as pa
+        if self.geometry_type is None:
+            self.geometry_type = _layer_geometry_type(gdf)
+        gdf = _promote_to_multi(gdf, self.geometry_type)
+        table = pa.table(gdf.to_arrow(geometry_encoding='WKB', index=False))
+        if self._thread is None:
+            self._start(gdf, table.schema)
+        else:
+            table = table.cast(self._schema)
+        for batch in table.to_batches(max_chunksize=GPKG_BATCH_ROWS):
+            self._put(batch)
+        self.count += len(gdf)
+
+    def _start(self, gdf, schema):
+        import pyarrow as pa
+        import pyogrio
+        self._schema = schema
+        self._queue = queue.Queue(maxsize=2)
+        reader = pa.RecordBatchReader.from_batches(schema, self._batches())
+
+        def run():
+            try:
+                pyogrio.write_arrow(reader, self.path, layer=self.layer, driver='GPKG',
+                                    geometry_name=gdf.geometry.name, geometry_type=self.geometry_type,
+                                    crs=gdf.crs.to_wkt() if gdf.crs else None)
+            except BaseException as e:
+                self._error = e
+                # Keep append() from blocking on a queue nobody reads any more.
+                while not self._drained:
+                    self._drained = not isinstance(self._queue.get(), pa.RecordBatch)
+
+        self._thread = threading.Thread(target=run, name=f'gpkg-{self.layer}', daemon=True)
+        self._thread.start()
+
+    def _batches(self):
+        while True:
+            item = self._queue.get()
+            if item is None or isinstance(item, BaseException):
+                self._drained = True
+                if item is None:
+                    return
+                raise item
+            yield item
+
+    def _put(self, batch):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(batch)
+
+    def close(self, abort=False):
+        """Finish the layer, building its spatial index. With ``abort`` the
+        write session is failed instead and, if this writer created the file,
+        the partial file is removed."""
+        if self._thread is not None:
+            if self._error is None:
+                self._queue.put(RuntimeError('GeoPackage write aborted') if abort else None)
+            self._thread.join()
+            self._thread = None
+        if abort and self._created and os.path.exists(self.path):
+            os.remove(self.path)
+        elif self._error is not None:
+            raise self._error
+
+def write_attribute_table(df, path, layer):
+    """Write a plain (non-spatial) GeoPackage attributes table."""
+    import pyogrio
+    pyogrio.write_dataframe(pd.DataFrame(df), path, layer=layer, driver='GPKG', use_arrow=_has_pyarrow())
+
+def _create_gpkg_indexes(path, indexes):
+    """Create plain SQLite indexes, given as ``(table, columns, unique)``, on a GeoPackage."""
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            for table, columns, unique in indexes:
+                name = f"{table}_{'_'.join(columns)}_idx".lower()
+                cols = ', '.join(f'"{c}"' for c in columns)
+                conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+                conn.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX "{name}" ON "{table}" ({cols})')
+    finally:
+        conn.close()
+
+def write_geopackage(gdf, owners, path, batch_rows=None, owner_parcels=None, primary_key=None):
+    if os.path.exists(path):
+        os.remove(path)
+    # Typed from the whole frame up front: a Multi part in a late batch must not meet a single-part layer.
+    with GeoPackageWriter(path, layer='features', geometry_type=_layer_geometry_type(gdf)) as writer:
+        step = batch_rows or GPKG_BATCH_ROWS
+        for start in range(0, len(gdf), step):
+            writer.append(gdf.iloc[start:start + step])
+    indexes = []
+    if primary_key and not gdf.empty:
+        indexes.append(('features', primary_key, False))
     if owners is not None and not owners.empty:
-        owners_gdf = gpd.GeoDataFrame(owners, geometry=None)
-        owners_gdf.to_file(path, layer='owners', driver='GPKG')
+        write_attribute_table(owners, path, 'owners')
+        if 'owner_id' in owners.columns:
+            indexes.append(('owners', ['owner_id'], True))
+    if owner_parcels is not None and not owner_parcels.empty:
+        write_attribute_table(owner_parcels, path, 'owner_parcels')
+        indexes.append(('owner_parcels', ['owner_id'], False))
+        if primary_key:
+            indexes.append(('owner_parcels', primary_key, False))
+    if indexes:
+        _create_gpkg_indexes(path, indexes)
+
+class GeoParquetWriter:
+    """Write GeoDataFrames to a GeoParquet file one row group at a time.
+
+    Each ``write`` converts and writes ``row_group_rows`` rows at a time
+    (WKB geometry, zstd, dictionary-encoded), so only one row group is ever
+    held as Arrow data. Column types come from the first row group, with
+    all-null columns as strings. The ``geo`` metadata (geometry types, bbox,
+    CRS) covers every row group and is added on ``close()``, which moves the
+    file from ``<path>.tmp`` into place; ``abort()`` deletes it instead.
+    """
+
+    def __init__(self, path, row_group_rows=100000):
+        self.path = path
+        self.tmp = path + '.tmp'
+        self.row_group_rows = row_group_rows
+        self.writer = None
+        self.schema = None
+        self.geometry = None
+        self.crs = None
+        self.types = set()
+        self.bounds = None
+        self.count = 0
 
-def write_postgis(gdf, owners, dsn):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, gdf):
+        for start in range(0, len(gdf), self.row_group_rows):
+            self._write_group(gdf.iloc[start:start + self.row_group_rows])
+
+    def _write_group(self, gdf):
+        from .parquet import _pyarrow
+        pa, pq = _pyarrow()
+        geoms = gdf.geometry
+        frame = pd.DataFrame(gdf.drop(columns=geoms.name))
+        frame[geoms.name] = shapely.to_wkb(geoms.values)
+        if self.schema is None:
+            self.geometry, self.crs = geoms.name, geoms.crs
+            schema = pa.Schema.from_pandas(frame, preserve_index=False)
+            fields = [f.with_type(pa.binary() if f.name == geoms.name else pa.string())
+                      if pa.types.is_null(f.type) else f for f in schema]
+            self.schema = pa.schema(fields, metadata=schema.metadata)
+            self.writer = pq.ParquetWriter(self.tmp, self.schema, compression='zstd', use_dictionary=True)
+        self.writer.write_table(pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False))
+        self.types.update(geoms.geom_type.dropna().unique())
+        if geoms.notna().any():
+            b = geoms.total_bounds
+            self.bounds = b if self.bounds is None else [min(self.bounds[0], b[0]), min(self.bounds[1], b[1]),
+                                                         max(self.bounds[2], b[2]), max(self.bounds[3], b[3])]
+        self.count += len(gdf)
+
+    def geo_metadata(self):
+        column = {'encoding': 'WKB', 'geometry_types': sorted(self.types)}
+        if self.bounds is not None:
+            column['bbox'] = [float(v) for v in self.bounds]
+        column['crs'] = self.crs.to_json_dict() if self.crs is not None else None
+        return {'version': '1.0.0', 'primary_column': self.geometry, 'columns': {self.geometry: column}}
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.writer.add_key_value_metadata({'geo': json.dumps(self.geo_metadata())})
+        self.writer.close()
+        self.writer = None
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        self.writer = None
+        os.remove(self.tmp)
+
+def write_geoparquet(gdf, owners, path, row_group_rows=100000, owner_parcels=None):
+    """Write features as GeoParquet (WKB geometry, zstd, dictionary-encoded) and,
+    if present, owners and owner_parcels as plain Parquet next to it.
+
+    ``gdf`` is a GeoDataFrame or an iterable of them, e.g. chunks as they are
+    transformed; either way row groups are written as they are converted,
+    by :class:`GeoParquetWriter`.
+    """
+    frames = [gdf] if isinstance(gdf, gpd.GeoDataFrame) else gdf
+    with GeoParquetWriter(path, row_group_rows) as writer:
+        for frame in frames:
+            writer.write(frame)
+    root, ext = os.path.splitext(path)
+    for name, df in (('owners', owners), ('owner_parcels', owner_parcels)):
+        if df is not None and not df.empty:
+            df.to_parquet(f'{root}_{name}{ext or ".parquet"}', compression='zstd', index=False)
+
+def _pg_type(series):
+    if ptypes.is_bool_dtype(series):
+        return 'boolean'
+    if ptypes.is_integer_dtype(series):
+        return 'bigint'
+    if ptypes.is_float_dtype(series):
+        return 'double precision'
+    if ptypes.is_datetime64_any_dtype(series):
+        return 'timestamptz' if getattr(series.dt, 'tz', None) is not None else 'timestamp'
+    return 'text'
+
+def _copy_text(series):
+    """Render a column in COPY text format: backslash-escaped, ``\\N`` for NULL."""
+    null = series.isna().to_numpy()
+    if ptypes.is_bool_dtype(series):
+        text = series.map({True: 't', False: 'f'})
+    elif ptypes.is_datetime64_any_dtype(series):
+        text = series.dt.strftime('%Y-%m-%d %H:%M:%S.%f%z')
+    else:
+        text = series.astype(str)
+        if not ptypes.is_numeric_dtype(series):
+            text = (text.str.replace('\\', '\\\\', regex=False)
+                        .str.replace('\t', '\\t', regex=False)
+                        .str.replace('\n', '\\n', regex=False)
+                        .str.replace('\r', '\\r', regex=False))
+    return pd.Series(np.where(null, '\\N', text.to_numpy(dtype=object)), index=series.index)
+
+def _geom_text(geoms, srid):
+    """Hex EWKB with SRID, which PostGIS parses directly from COPY input."""
+    values = np.asarray(geoms, dtype=object)
+    wkb = shapely.to_wkb(shapely.set_srid(values, srid), hex=True, include_srid=True)
+    return pd.Series(np.where(pd.isna(wkb), '\\N', wkb), dtype=object)
+
+def _copy_frame(cur, table, df, columns, geom=None, srid=None, chunk_rows=COPY_CHUNK_ROWS):
+    """Stream ``df`` into ``table`` with ``COPY ... FROM STDIN`` in row chunks."""
+    targets = [sql.Identifier(c.lower()) for c in columns] + ([sql.Identifier('geom')] if geom is not None else [])
+    stmt = sql.SQL('COPY {} ({}) FROM STDIN').format(sql.Identifier(table), sql.SQL(',').join(targets)).as_string(cur)
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        parts = [_copy_text(chunk[c]).reset_index(drop=True) for c in columns]
+        if geom is not None:
+            parts.append(_geom_text(geom[start:start + chunk_rows], srid))
+        if not parts:
+            continue
+        lines = parts[0].str.cat(parts[1:], sep='\t') if len(parts) > 1 else parts[0]
+        buf = io.StringIO('\n'.join(lines.tolist()) + '\n')
+        cur.copy_expert(stmt, buf)
+
+def _create_table(cur, table, df, columns, srid=None):
+    defs = [sql.SQL('{} {}').format(sql.Identifier(c.lower()), sql.SQL(_pg_type(df[c]))) for c in columns]
+    if srid is not None:
+        defs.append(sql.SQL('geom geometry(Geometry, {})').format(sql.Literal(srid)))
+    cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(table)))
+    cur.execute(sql.SQL('CREATE TABLE {} ({})').format(sql.Identifier(table), sql.SQL(',').join(defs)))
+
+def _swap_in(cur, staging, table):
+    """Replace ``table`` with ``staging``; readers see the old table until commit."""
+    cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(table)))
+    cur.execute(sql.SQL('ALTER TABLE {} RENAME TO {}').format(sql.Identifier(staging), sql.Identifier(table)))
+
+def _row_hashes(df, columns, geom=None):
+    """Deterministic 64-bit hash of each row's attributes and geometry WKB."""
+    h = pd.util.hash_pandas_object(df[columns].reset_index(drop=True), index=False).to_numpy()
+    if geom is not None:
+        wkb = shapely.to_wkb(np.asarray(geom, dtype=object))
+        h = h * np.uint64(31) + pd.util.hash_pandas_object(pd.Series(wkb), index=False).to_numpy()
+    return h.view(np.int64)
+
+def _attribute_columns(df, reserved=()):
+    """The non-geometry columns of ``df``. PostGIS columns are lower case, so
+    names that only differ in case (``ParcelID``/``PARCELID``), or that clash
+    with ``reserved`` columns the load adds itself, are a ValueError."""
+    columns = [c for c in df.columns if c != getattr(df, '_geometry_column_name', None)]
+    seen = dict.fromkeys(reserved)
+    for c in columns:
+        name = str(c).lower()
+        if name in seen:
+            other = repr(seen[name]) if seen[name] is not None else f"the {name} column the load adds"
+            raise ValueError(f"Column {c!r} collides with {other} once lowercased for PostGIS; rename one of them")
+        seen[name] = c
+    return columns
+
+def bulk_load(cur, table, df, geom=None, srid=None, primary_key=None, indexes=()):
+    """Create ``<table>_staging`` with an explicit schema, COPY ``df`` into it,
+    index and analyze it, then swap it in for ``table``. ``indexes`` lists
+    extra (non-unique) column lists to index."""
+    staging = f'{table}_staging'
+    columns = _attribute_columns(df, ('geom',) if geom is not None else ())
+    _create_table(cur, staging, df, columns, srid if geom is not None else None)
+    _copy_frame(cur, staging, df, columns, geom, srid)
+    if geom is not None:
+        # Building the GIST index once after the load is far cheaper than maintaining it per row.
+        cur.execute(sql.SQL('CREATE INDEX {} ON {} USING GIST (geom)').format(
+            sql.Identifier(f'{staging}_geom_idx'), sql.Identifier(staging)))
+    if primary_key:
+        cur.execute(sql.SQL('CREATE UNIQUE INDEX {} ON {} ({})').format(
+            sql.Identifier(f'{staging}_key_idx'), sql.Identifier(staging),
+            sql.SQL(',').join(sql.Identifier(k.lower()) for k in primary_key)))
+    extra = [(f"{'_'.join(c.lower() for c in cols)}_idx", cols) for cols in indexes]
+    for suffix, cols in extra:
+        cur.execute(sql.SQL('CREATE INDEX {} ON {} ({})').format(
+            sql.Identifier(f'{staging}_{suffix}'), sql.Identifier(staging),
+            sql.SQL(',').join(sql.Identifier(c.lower()) for c in cols)))
+    cur.execute(sql.SQL('ANALYZE {}').format(sql.Identifier(staging)))
+    _swap_in(cur, staging, table)
+    suffixes = [s for s, wanted in (('geom_idx', geom is not None), ('key_idx', bool(primary_key))) if wanted]
+    for suffix in suffixes + [s for s, _ in extra]:
+        cur.execute(sql.SQL('ALTER INDEX {} RENAME TO {}').format(
+            sql.Identifier(f'{staging}_{suffix}'), sql.Identifier(f'{table}_{suffix}')))
+
+def _table_columns(cur, table):
+    cur.execute(
+        'SELECT column_name FROM information_schema.columns '
+        'WHERE table_schema = current_schema() AND table_name = %s', (table,))
+    return {r[0] for r in cur.fetchall()}
+
+def upsert_load(cur, table, df, primary_key, geom=None, srid=None):
+    """Apply only the changed rows of ``df`` to ``table``, matched on
+    ``primary_key`` and compared by a stored ``row_hash`` column.
+
+    Falls back to a full :func:`bulk_load` when the table does not exist yet
+    or its columns no longer match. Rows with a NULL in ``primary_key`` can
+    never be matched, so they are dropped with a warning. Returns
+    ``(inserted, updated, deleted)``.
+    """
+    columns = _attribute_columns(df, ('row_hash', 'geom') if geom is not None else ('row_hash',))
+    null_key = df[list(primary_key)].isna().any(axis=1).to_numpy()
+    if null_key.any():
+        print(f"Warning: dropping {int(null_key.sum())} row(s) of {table} with no {', '.join(primary_key)} value")
+    keep = ~null_key & ~df.duplicated(subset=primary_key).to_numpy()
+    df = df[keep]
+    if geom is not None:
+        geom = np.asarray(geom, dtype=object)[keep]
+    hashed = df.assign(row_hash=_row_hashes(df, columns, geom))
+    expected = {c.lower() for c in columns} | {'row_hash'} | ({'geom'} if geom is not None else set())
+    existing = _table_columns(cur, table)
+    if existing != expected:
+        print(f"Table {table} missing or schema changed; doing a full load")
+        bulk_load(cur, table, hashed, geom=geom, srid=srid, primary_key=primary_key)
+        return len(hashed), 0, 0
+
+    incoming = f'{table}_incoming'
+    cur.execute(sql.SQL('CREATE TEMP TABLE {} (LIKE {}) ON COMMIT DROP').format(
+        sql.Identifier(incoming), sql.Identifier(table)))
+    _copy_frame(cur, incoming, hashed, columns + ['row_hash'], geom, srid)
+    cur.execute(sql.SQL('ANALYZE {}').format(sql.Identifier(incoming)))
+
+    tbl, inc = sql.Identifier(table), sql.Identifier(incoming)
+    match = sql.SQL(' AND ').join(
+        sql.SQL('t.{0} = i.{0}').format(sql.Identifier(k.lower())) for k in primary_key)
+    targets = [c.lower() for c in columns] + ['row_hash'] + (['geom'] if geom is not None else [])
+    cur.execute(sql.SQL('DELETE FROM {} t WHERE NOT EXISTS (SELECT 1 FROM {} i WHERE {})').format(tbl, inc, match))
+    deleted = cur.rowcount
+    cur.execute(sql.SQL('UPDATE {} t SET {} FROM {} i WHERE {} AND t.row_hash <> i.row_hash').format(
+        tbl, sql.SQL(',').join(sql.SQL('{0} = i.{0}').format(sql.Identifier(c)) for c in targets), inc, match))
+    updated = cur.rowcount
+    cur.execute(sql.SQL('INSERT INTO {} ({}) SELECT {} FROM {} i WHERE NOT EXISTS (SELECT 1 FROM {} t WHERE {})').format(
+        tbl, sql.SQL(',').join(map(sql.Identifier, targets)),
+        sql.SQL(',').join(sql.SQL('i.{}').format(sql.Identifier(c)) for c in targets), inc, tbl, match))
+    inserted = cur.rowcount
+    print(f"Upserted {table}: {inserted} inserted, {updated} updated, {deleted} deleted")
+    return inserted, updated, deleted
+
+def write_postgis(gdf, owners, dsn, load_mode='replace', primary_key=None, owner_parcels=None):
+    srid = gdf.crs.to_epsg() if gdf.crs is not None else None
+    srid = srid or 4326
     conn = psycopg2.connect(dsn)
-    cur = conn.cursor()
-    gdf_pg = gdf.copy()
-    gdf_pg['geom'] = gdf_pg.geometry.apply(lambda x: x.wkt if x else None)
-    cols = [c for c in gdf_pg.columns if c != 'geometry']
-    cur.execute('DROP TABLE IF EXISTS features')
-    cur.execute('CREATE TABLE features (' + ','.join(f'{c} text' for c in cols) + ', geom geometry)')
-    for _, row in gdf_pg.iterrows():
-        vals = [str(row[c]) for c in cols] + [row['geom']]
-        cur.execute('INSERT INTO features VALUES (' + ','.join(['%s']*len(vals)) + ')', vals)
-    if owners is not None and not owners.empty:
-        cur.execute('DROP TABLE IF EXISTS owners')
-        cur.execute('CREATE TABLE owners (' + ','.join(f'{c} text' for c in owners.columns) + ')')
-        for _, row in owners.iterrows():
-            vals = [str(row[c]) for c in owners.columns]
-            cur.execute('INSERT INTO owners VALUES (' + ','.join(['%s']*len(vals)) + ')', vals)
-    conn.commit()
-    cur.close()
-    conn.close() 
\ No newline at end of file
+    try:
+        with conn.cursor() as cur:
+            if load_mode == 'upsert' and primary_key:
+                upsert_load(cur, 'features', gdf, primary_key, geom=gdf.geometry.values, srid=srid)
+            elif primary_key and gdf.duplicated(subset=primary_key).any():
+                # Without deduplicate the key can repeat; index it for joins, but not as unique.
+                print(f"Warning: primary_key {primary_key} repeats in the features; indexing it as non-unique")
+                bulk_load(cur, 'features', gdf, geom=gdf.geometry.values, srid=srid, indexes=[primary_key])
+            else:
+                bulk_load(cur, 'features', gdf, geom=gdf.geometry.values, srid=srid, primary_key=primary_key)
+            if owners is not None and not owners.empty:
+                bulk_load(cur, 'owners', owners, primary_key=['owner_id'] if 'owner_id' in owners.columns else None)
+            if owner_parcels is not None and not owner_parcels.empty:
+                bulk_load(cur, 'owner_parcels', owner_parcels, indexes=[['owner_id']] + ([primary_key] if primary_key else []))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
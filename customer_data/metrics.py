@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+from datetime import datetime, timezone
+
+PREFIX = 'customer_data'
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class Metrics:
+    """Per-stage run metrics, emitted as JSON log lines and a Prometheus textfile.
+
+    ``stage()`` times a block and aggregates its duration, record and byte
+    counts under ``(stage, jurisdiction)``; every stage also becomes one JSON
+    line in ``json_log`` (if set) carrying any extra fields passed in.
+    ``finish()`` logs a run summary with peak RSS and the HTTP client's
+    request, retry and byte counters, and writes ``prometheus`` (if set) for
+    node_exporter's textfile collector.
+    """
+
+    def __init__(self, json_log=None, prometheus=None):
+        self.json_log = json_log
+        self.prometheus = prometheus
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, jurisdiction=None, **fields):
+        """Time a block. Yields a dict the block may set ``records`` and ``bytes`` on."""
+        counts = {'records': 0, 'bytes': 0}
+        started = time.perf_counter()
+        status = 'ok'
+        try:
+            yield counts
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, counts['records'], counts['bytes'],
+                        status, jurisdiction, **fields)
+
+    def record(self, name, seconds, records=0, bytes=0, status='ok', jurisdiction=None, **fields):
+        with self._lock:
+            s = self._stages.setdefault((name, jurisdiction or ''), {
+                'runs': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'records': 0, 'bytes': 0,
+            })
+            s['runs'] += 1
+            s['errors'] += int(status != 'ok')
+            s['seconds'] += seconds
+            s['max_seconds'] = max(s['max_seconds'], seconds)
+            s['records'] += records
+            s['bytes'] += bytes
+        event = {'event': 'stage', 'stage': name, 'jurisdiction': jurisdiction, 'status': status,
+                 'seconds': round(seconds, 6), 'records': records, 'bytes': bytes}
+        if records and seconds > 0:
+            event['records_per_sec'] = round(records / seconds, 1)
+        event.update(fields)
+        self.log(event)
+
+    def log(self, event):
+        if not self.json_log:
+            return
+        line = json.dumps({'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), **event},
+                          default=str)
+        with self._lock:
+            dir_path = os.path.dirname(self.json_log)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            with open(self.json_log, 'a') as f:
+                f.write(line + '\n')
+
+    def snapshot(self, http=None):
+        with self._lock:
+            stages = [{'stage': name, 'jurisdiction': j or None, **dict(s)} for (name, j), s in self._stages.items()]
+        return {
+            'seconds': round(time.time() - self.started, 3),
+            'peak_rss_bytes': peak_rss(),
+            'stages': stages,
+            'http': http.stats() if http is not None else None,
+        }
+
+    def finish(self, http=None):
+        """Log the run summary and write the Prometheus textfile; returns the snapshot."""
+        snapshot = self.snapshot(http)
+        self.log({'event': 'run', **snapshot})
+        if self.prometheus:
+            write_prometheus(self.prometheus, snapshot)
+        return snapshot
+
+
+def _labels(**labels):
+    parts = []
+    for k, v in labels.items():
+        if v is not None:
+            v = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            parts.append(f'{k}="{v}"')
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+STAGE_SERIES = [
+    ('runs', 'stage_runs_total', 'counter', 'Times the stage ran'),
+    ('errors', 'stage_errors_total', 'counter', 'Times the stage raised'),
+    ('seconds', 'stage_seconds_total', 'counter', 'Total seconds spent in the stage'),
+    ('max_seconds', 'stage_max_seconds', 'gauge', 'Longest single run of the stage'),
+    ('records', 'stage_records_total', 'counter', 'Records processed by the stage'),
+    ('bytes', 'stage_bytes_total', 'counter', 'Bytes transferred or written by the stage'),
+]
+HTTP_SERIES = [
+    ('requests', 'http_requests_total', 'counter', 'HTTP requests sent, including retries'),
+    ('errors', 'http_errors_total', 'counter', 'HTTP requests that failed to connect or timed out'),
+    ('retries', 'http_retries_total', 'counter', 'HTTP requests retried'),
+    ('seconds', 'http_seconds_total', 'counter', 'Seconds spent in HTTP requests'),
+    ('bytes', 'http_bytes_total', 'counter', 'Decoded HTTP response bytes'),
+    ('wire_bytes', 'http_wire_bytes_total', 'counter', 'HTTP response bytes on the wire'),
+]
+CACHE_SERIES = [
+    ('hits', 'http_cache_hits_total', 'counter', 'Requests answered from the HTTP cache without the network'),
+    ('not_modified', 'http_cache_not_modified_total', 'counter', 'Cached responses revalidated with a 304'),
+    ('misses', 'http_cache_misses_total', 'counter', 'Requests the HTTP cache could not answer'),
+    ('stored', 'http_cache_stored_total', 'counter', 'Responses written to the HTTP cache'),
+]
+
+def write_prometheus(path, snapshot):
+    """Write ``snapshot`` in the Prometheus text exposition format, atomically."""
+    lines = []
+
+    def series(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+        lines.extend(f'{PREFIX}_{name}{labels} {value}' for labels, value in samples)
+
+    for key, name, kind, help_text in STAGE_SERIES:
+        series(name, kind, help_text, [
+            (_labels(stage=s['stage'], jurisdiction=s['jurisdiction']), s[key]) for s in snapshot['stages']])
+    hosts = (snapshot.get('http') or {}).get('hosts', {})
+    for key, name, kind, help_text in HTTP_SERIES:
+        series(name, kind, help_text, [(_labels(host=h), s.get(key, 0)) for h, s in sorted(hosts.items())])
+    if hosts:
+        from .transport import LATENCY_BUCKETS
+        name = f'{PREFIX}_http_request_duration_seconds'
+        lines.append(f'# HELP {name} HTTP request latency (to the response headers for streamed bodies)')
+        lines.append(f'# TYPE {name} histogram')
+        for h, s in sorted(hosts.items()):
+            cumulative = 0
+            for le, n in zip(LATENCY_BUCKETS, s.get('latency') or [0] * len(LATENCY_BUCKETS)):
+                cumulative += n
+                lines.append(f'{name}_bucket{_labels(host=h, le="+Inf" if le == float("inf") else le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(host=h)} {s.get("seconds", 0)}')
+            lines.append(f'{name}_count{_labels(host=h)} {s.get("requests", 0)}')
+    cache = (snapshot.get('http') or {}).get('cache') or {}
+    for key, name, kind, help_text in CACHE_SERIES:
+        series(name, kind, help_text, [('', cache[key])] if key in cache else [])
+    if snapshot.get('peak_rss_bytes') is not None:
+        series('peak_rss_bytes', 'gauge', 'Peak resident set size of the run', [('', snapshot['peak_rss_bytes'])])
+    series('run_seconds', 'gauge', 'Wall-clock duration of the run', [('', snapshot['seconds'])])
+    series('last_run_timestamp_seconds', 'gauge', 'When the run finished', [('', round(time.time(), 3))])
+
+    dir_path = os.path.dirname(path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp, path)
+
+
+_metrics = Metrics()
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    return _metrics
+
+def configure_metrics(cfg):
+    """Start a fresh registry writing to ``cfg['metrics']`` (``json_log``, ``prometheus``)."""
+    global _metrics
+    options = cfg.get('metrics') or {}
+    with _metrics_lock:
+        _metrics = Metrics(options.get('json_log'), options.get('prometheus'))
+        return _metrics
@@ -0,0 +1,130 @@
+"""Transform large layers on a process pool.
+
+The features are split into chunks of ``chunk_rows`` and each worker builds
+its chunk's GeoDataFrame, drops duplicate primary keys within the chunk and
+extracts its owner links. Chunks come back as Arrow IPC buffers with WKB
+geometries (pickled frames and WKB without pyarrow), and the parent
+concatenates them and finishes deduplication and the owner tables across
+chunk boundaries, so results match the single-process transform.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_ROWS = 100000
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    return pa
+
+def _pack(gdf):
+    """Serialize a chunk for the trip back to the parent."""
+    pa = _pyarrow()
+    if pa is None or not hasattr(gdf, 'to_arrow'):
+        import shapely
+        import pandas as pd
+        name = gdf.geometry.name
+        return 'pickle', (pd.DataFrame(gdf.drop(columns=name)), name, shapely.to_wkb(gdf.geometry.values),
+                          gdf.crs)
+    table = pa.table(gdf.to_arrow(geometry_encoding='WKB', index=True))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return 'arrow', sink.getvalue()
+
+def _unpack(chunks):
+    """Concatenate packed chunks, in order, into one GeoDataFrame."""
+    import geopandas as gpd
+    if all(kind == 'arrow' for kind, _ in chunks):
+        pa = _pyarrow()
+        tables = [pa.ipc.open_stream(buf).read_all() for _, buf in chunks]
+        # Columns missing or all-null in some chunks, or int in one and float in another, unify as in one frame.
+        return gpd.GeoDataFrame.from_arrow(pa.concat_tables(tables, promote_options='permissive'))
+    import shapely
+    import pandas as pd
+    frames = []
+    for kind, payload in chunks:
+        if kind == 'arrow':
+            frames.append(gpd.GeoDataFrame.from_arrow(_pyarrow().ipc.open_stream(payload).read_all()))
+            continue
+        frame, name, wkb, crs = payload
+        frames.append(gpd.GeoDataFrame(frame, geometry=gpd.GeoSeries(shapely.from_wkb(wkb), index=frame.index,
+                                                                     name=name), crs=crs))
+    # Columns missing from some chunks come back as objects; give them the type one frame would have.
+    return pd.concat(frames).infer_objects()
+
+def _finish_chunk(gdf, start, primary_key, deduplicate, owners):
+    from .transform import deduplicate_gdf, owner_links
+    gdf.index = gdf.index + start
+    if deduplicate:
+        gdf = deduplicate_gdf(gdf, primary_key)
+    links = owner_links(gdf, primary_key) if owners else None
+    return _pack(gdf), links
+
+def _cache_chunk(path, start, stop, primary_key, deduplicate, owners):
+    from .feature_cache import FeatureCache
+    gdf = FeatureCache(path).to_gdf(rows=slice(start, stop))
+    return _finish_chunk(gdf, start, primary_key, deduplicate, owners)
+
+def _features_chunk(meta, features, start, primary_key, deduplicate, owners):
+    from .transform import features_to_gdf
+    return _finish_chunk(features_to_gdf(meta, features), start, primary_key, deduplicate, owners)
+
+def _merge(results, primary_key, deduplicate, owners):
+    import pandas as pd
+    from .transform import deduplicate_gdf, owner_name_columns, owners_from_links
+    gdf = _unpack([packed for packed, _ in results])
+    if deduplicate:
+        # Chunks are already unique; this drops keys repeated across chunks, first occurrence winning.
+        gdf = deduplicate_gdf(gdf, primary_key)
+    else:
+        gdf.index = pd.RangeIndex(len(gdf))
+    if not owners:
+        return gdf, None, None
+    links = pd.concat([links for _, links in results], ignore_index=True)
+    if deduplicate:
+        links = links[links['row'].isin(gdf.index)]
+    # Back into the single-pass order: name column first, then parcel.
+    rank = {c: i for i, c in enumerate(owner_name_columns(gdf.columns)[0])}
+    links = links.assign(rank=links['role'].map(rank)).sort_values(['rank', 'row'], kind='stable')
+    owner_table, owner_parcels = owners_from_links(links, primary_key)
+    return gdf, owner_table, owner_parcels
+
+def _pool(workers):
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+def cache_to_gdf_parallel(path, workers=None, chunk_rows=CHUNK_ROWS, primary_key=('OBJECTID',),
+                          deduplicate=False, owners=False):
+    """``FeatureCache(path).to_gdf()`` on ``workers`` processes (default: one per CPU).
+
+    Workers open the memory-mapped cache themselves, so only the finished
+    chunks cross process boundaries. Returns ``(gdf, owners, owner_parcels)``;
+    the owner tables are None unless ``owners`` is set.
+    """
+    from .feature_cache import FeatureCache
+    primary_key = list(primary_key)
+    starts = list(range(0, len(FeatureCache(path)), chunk_rows))
+    n = len(starts)
+    with _pool(workers) as pool:
+        results = list(pool.map(_cache_chunk, [path] * n, starts, [s + chunk_rows for s in starts],
+                                [primary_key] * n, [deduplicate] * n, [owners] * n))
+    if not results:
+        results = [_cache_chunk(path, 0, 0, primary_key, deduplicate, owners)]
+    return _merge(results, primary_key, deduplicate, owners)
+
+def features_to_gdf_parallel(meta, features, workers=None, chunk_rows=CHUNK_ROWS, primary_key=('OBJECTID',),
+                             deduplicate=False, owners=False):
+    """``features_to_gdf`` on ``workers`` processes for an in-memory feature list,
+    which is pickled to the workers chunk by chunk. Returns
+    ``(gdf, owners, owner_parcels)`` like :func:`cache_to_gdf_parallel`."""
+    primary_key = list(primary_key)
+    starts = list(range(0, len(features), chunk_rows))
+    n = len(starts)
+    with _pool(workers) as pool:
+        results = list(pool.map(_features_chunk, [meta] * n, (features[s:s + chunk_rows] for s in starts), starts,
+                                [primary_key] * n, [deduplicate] * n, [owners] * n))
+    if not results:
+        results = [_features_chunk(meta, [], 0, primary_key, deduplicate, owners)]
+    return _merge(results, primary_key, deduplicate, owners)
@@ -0,0 +1,138 @@
+import os
+
+ROW_GROUP_ROWS = 100000
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow: pip install 'customer-data[parquet]'") from None
+    return pa, pq
+
+
+class ParquetRecordWriter:
+    """Write dict records to a Parquet file one row group at a time.
+
+    Records are buffered up to ``row_group_rows`` and each flush becomes one
+    dictionary-encoded, zstd-compressed row group, so memory is bounded by a
+    single row group. The schema is inferred from the first row group (columns
+    that are entirely null there become strings) and later row groups are cast
+    to it. A Parquet file's schema is fixed once written, so when keys first
+    appear in a later row group the schema is widened with them and the row
+    groups written so far are copied, one at a time, into a new file with the
+    new columns null.
+
+    Row groups go to ``<path>.tmp`` (or the widened copy), which replaces
+    ``path`` on ``close()``. ``abort()``, or leaving a ``with`` block on an
+    exception, deletes it instead, so a failed run never leaves a partial
+    file that still reads as valid Parquet.
+    """
+
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS):
+        self.path = path
+        self.row_group_rows = row_group_rows
+        self.buffer = []
+        self.writer = None
+        self.schema = None
+        self.count = 0
+        self.widened = 0
+        self._target = path + '.tmp'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.row_group_rows:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def _column(self, pa, name, values, type=None):
+        """Build one column; values that cannot take the column's type become
+        strings (string columns) or nulls (other types, with a warning)."""
+        try:
+            arr = pa.array(values, type=type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if type is not None and not pa.types.is_string(type):
+                print(f"Warning: {self.path}: nulling values of {name!r} that are not {type}")
+                ok = []
+                for v in values:
+                    try:
+                        pa.array([v], type=type)
+                        ok.append(v)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        ok.append(None)
+                return pa.array(ok, type=type)
+            arr = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+        if type is None and pa.types.is_null(arr.type):
+            arr = arr.cast(pa.string())
+        return arr
+
+    def flush(self):
+        if not self.buffer:
+            return
+        pa, pq = _pyarrow()
+        rows = self.buffer
+        if self.schema is None:
+            keys = {}
+            for record in rows:
+                keys.update(dict.fromkeys(record))
+            arrays = [self._column(pa, k, [r.get(k) for r in rows]) for k in keys]
+            self.schema = pa.schema([pa.field(k, a.type) for k, a in zip(keys, arrays)])
+            self.writer = pq.ParquetWriter(self._target, self.schema, compression='zstd', use_dictionary=True)
+        else:
+            new = {}
+            for record in rows:
+                new.update(dict.fromkeys(k for k in record if k not in new and self.schema.get_field_index(k) < 0))
+            if new:
+                self._widen(pa, pq, [pa.field(k, self._column(pa, k, [r.get(k) for r in rows]).type) for k in new])
+            arrays = [self._column(pa, f.name, [r.get(f.name) for r in rows], f.type) for f in self.schema]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.count += len(rows)
+        self.buffer = []
+
+    def _widen(self, pa, pq, fields):
+        """Add ``fields`` to the schema, copying the rows written so far into a new file."""
+        print(f"{self.path}: adding columns first seen after row {self.count}: {[f.name for f in fields]}; "
+              f"rewriting {self.count} rows")
+        self.writer.close()
+        old = self._target
+        self.widened += 1
+        self._target = f'{self.path}.widen{self.widened}.tmp'
+        self.schema = pa.schema(list(self.schema) + fields)
+        self.writer = pq.ParquetWriter(self._target, self.schema, compression='zstd', use_dictionary=True)
+        done = pq.ParquetFile(old)
+        for i in range(done.num_row_groups):
+            table = done.read_row_group(i)
+            for field in fields:
+                table = table.append_column(field, pa.nulls(len(table), field.type))
+            self.writer.write_table(table)
+        done.close()
+        os.remove(old)
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            os.replace(self._target, self.path)
+            self._target = self.path + '.tmp'
+
+    def abort(self):
+        """Drop buffered rows and delete the partial file."""
+        self.buffer = []
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            os.remove(self._target)
+            self._target = self.path + '.tmp'
@@ -0,0 +1,71 @@
+"""Jurisdiction ETL registry.
+
+An ``api_type`` names an ETL class as a ``"module:Class"`` string, and the
+module is only imported once that ``api_type`` is actually run, so a Tulsa
+run never pays for NumPy, GeoPandas or the other ETLs. Classes are looked
+up in this order:
+
+1. ``etl_class: "package.module:Class"`` in the jurisdiction config;
+2. the built-in jurisdictions below;
+3. installed plugins, declared as entry points in the
+   ``customer_data.jurisdictions`` group (``customer_data.jurisdictions.async``
+   for async variants), named by ``api_type``::
+
+       [project.entry-points."customer_data.jurisdictions"]
+       travis_tx = "travis_etl:TravisETL"
+"""
+import importlib
+
+ENTRY_POINT_GROUP = 'customer_data.jurisdictions'
+ENGINES = ('sync', 'async')
+
+BUILTIN_ETLS = {
+    'sync': {
+        'bossier': 'customer_data.etl.bossier_la:BossierETL',
+        'tulsa': 'customer_data.etl.tulsa_ok:TulsaOKETL',
+        'wayne_ky': 'customer_data.etl.wayne_ky:WayneKYETL',
+    },
+    'async': {
+        'bossier': 'customer_data.etl.bossier_la_async:AsyncBossierETL',
+        'wayne_ky': 'customer_data.etl.wayne_ky_async:AsyncWayneKYETL',
+    },
+}
+
+def _group(engine):
+    return ENTRY_POINT_GROUP if engine == 'sync' else f'{ENTRY_POINT_GROUP}.{engine}'
+
+def entry_point_etls(engine='sync'):
+    """``{api_type: "module:Class"}`` declared by installed plugins; nothing is imported."""
+    from importlib.metadata import entry_points
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=_group(engine))
+    else:  # Python < 3.10
+        eps = eps.get(_group(engine), [])
+    return {ep.name: ep.value for ep in eps}
+
+def etl_spec(api_type, engine='sync', cfg=None):
+    """The ``"module:Class"`` string for ``api_type``, or None if nothing provides it.
+    An engine without its own class for ``api_type`` falls back to the sync one."""
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}, not {engine!r}")
+    if cfg and cfg.get('etl_class'):
+        return cfg['etl_class']
+    for candidate in dict.fromkeys((engine, 'sync')):
+        spec = BUILTIN_ETLS[candidate].get(api_type) or entry_point_etls(candidate).get(api_type)
+        if spec:
+            return spec
+    return None
+
+def load_etl_class(api_type, engine='sync', cfg=None):
+    """Import and return the ETL class for ``api_type``."""
+    spec = etl_spec(api_type, engine, cfg)
+    if spec is None:
+        raise ValueError(f"Unsupported api_type: {api_type} (available: {', '.join(available_api_types())})")
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"ETL class {spec!r} for api_type {api_type} must look like 'package.module:Class'")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def available_api_types():
+    return sorted(set(BUILTIN_ETLS['sync']) | set(entry_point_etls('sync')))
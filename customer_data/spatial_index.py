@@ -0,0 +1,377 @@
+"""Persistent spatial index over extracted parcels.
+
+    customer-data index output/la/bossier/parcels.gpkg parcels.index --key PARCEL_ID
+    customer-data query parcels.index --point -93.71,32.52 --points points.csv
+
+The index is a directory of flat binary files: a packed R-tree over the
+feature bounding boxes, the features' WKB and their key columns, all in
+tree order. Opening it reads only ``index.json``; everything else is
+memory-mapped, so a worker starts in milliseconds and the OS page cache
+is shared between processes on one host.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+
+FORMAT = 'customer-data-spatial-index'
+VERSION = 1
+# R-tree fan-out. The tree is walked one level at a time for a whole batch of
+# queries, so a small fan-out (fewer children tested per level) is fastest.
+NODE_SIZE = 4
+# Queries are searched this many at a time to bound the candidate arrays.
+QUERY_BATCH = 65536
+
+def is_spatial_index(path):
+    return os.path.isfile(os.path.join(path, 'index.json'))
+
+def _str_order(bounds, node_size):
+    """Sort-Tile-Recursive order of boxes: vertical slices by x center, then y within a slice."""
+    n = len(bounds)
+    cx = (bounds[:, 0] + bounds[:, 2]) / 2
+    cy = (bounds[:, 1] + bounds[:, 3]) / 2
+    per_slice = node_size * int(np.ceil(np.sqrt(np.ceil(n / node_size))))
+    by_x = np.argsort(cx, kind='stable')
+    slices = np.empty(n, dtype=np.int64)
+    slices[by_x] = np.arange(n) // per_slice
+    return np.lexsort((cy, slices))
+
+def _pack_levels(leaves, node_size):
+    """Bounds of every R-tree level, leaves first; node j's children are
+    ``j * node_size`` up to ``(j + 1) * node_size`` on the level below."""
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        starts = np.arange(0, len(level), node_size)
+        levels.append(np.column_stack([
+            np.minimum.reduceat(level[:, 0], starts), np.minimum.reduceat(level[:, 1], starts),
+            np.maximum.reduceat(level[:, 2], starts), np.maximum.reduceat(level[:, 3], starts),
+        ]))
+    return levels
+
+def _write_strings(path, values):
+    """Bytes (strings as UTF-8) plus int64 end offsets, as in the feature cache."""
+    encoded = [b'' if v is None else v if isinstance(v, bytes) else str(v).encode('utf-8') for v in values]
+    with open(f'{path}.data', 'wb') as f:
+        f.write(b''.join(encoded))
+    np.cumsum([len(b) for b in encoded], dtype=np.int64).tofile(f'{path}.offsets')
+
+def build_spatial_index(gdf, path, key_columns=None, node_size=NODE_SIZE):
+    """Write a spatial index for ``gdf`` (e.g. the output of ``features_to_gdf``)
+    to the directory ``path``. Rows with no or empty geometry are left out;
+    ``key_columns`` are stored with each feature and returned by queries."""
+    import shapely
+    import pandas as pd
+    from pandas.api import types as ptypes
+    key_columns = [c for c in (key_columns or []) if c in gdf.columns]
+    geoms = np.asarray(gdf.geometry.values, dtype=object)
+    bounds = shapely.bounds(geoms)
+    rows = np.flatnonzero(~np.isnan(bounds).any(axis=1))
+    order = rows[_str_order(bounds[rows], node_size)] if len(rows) else rows
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    levels = _pack_levels(bounds[order], node_size)
+    np.concatenate(levels).astype(np.float64).tofile(os.path.join(path, 'tree.bounds'))
+    order.astype(np.int64).tofile(os.path.join(path, 'rows'))
+    _write_strings(os.path.join(path, 'geom'), shapely.to_wkb(geoms[order]))
+    columns = {}
+    for i, name in enumerate(key_columns):
+        series = gdf[name].iloc[order]
+        prefix = os.path.join(path, f'k{i}')
+        if ptypes.is_integer_dtype(series) or ptypes.is_float_dtype(series):
+            kind = 'int' if ptypes.is_integer_dtype(series) else 'float'
+            series.to_numpy(np.int64 if kind == 'int' else np.float64).tofile(f'{prefix}.values')
+        else:
+            kind = 'str'
+            # pd.isna covers None, NaN and the pd.NA of nullable dtypes.
+            _write_strings(prefix, [None if pd.isna(v) else v for v in series.tolist()])
+        columns[name] = {'kind': kind, 'file': f'k{i}'}
+    header = {
+        'format': FORMAT,
+        'version': VERSION,
+        'count': len(order),
+        'source_rows': len(gdf),
+        'node_size': node_size,
+        'levels': [len(level) for level in levels],
+        'bounds': levels[-1][0].tolist() if len(order) else None,
+        'crs': gdf.crs.to_string() if gdf.crs is not None else None,
+        'columns': columns,
+    }
+    tmp = os.path.join(path, 'index.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(header, f)
+    os.replace(tmp, os.path.join(path, 'index.json'))
+    print(f"Built spatial index of {len(order)} features in {path}")
+    return path
+
+
+class SpatialIndex:
+    """Memory-mapped reader for an index written by :func:`build_spatial_index`.
+
+    Queries take whole arrays and return ``(query, position)`` pairs:
+    ``query`` indexes the input points or boxes and ``position`` is the
+    feature's place in the index; :meth:`rows` maps positions to rows of the
+    source GeoDataFrame and :meth:`keys` to the stored key columns. The
+    R-tree is walked one level at a time for every query at once, and only
+    candidate geometries are decoded for the exact predicates.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'index.json')) as f:
+            header = json.load(f)
+        if header.get('format') != FORMAT or header.get('version') != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} spatial index")
+        self.count = header['count']
+        self.node_size = header['node_size']
+        self.level_sizes = header['levels']
+        self.level_starts = np.concatenate([[0], np.cumsum(self.level_sizes)[:-1]]).astype(np.int64)
+        self.bounds = header['bounds']
+        self.crs = header['crs']
+        self.column_info = header['columns']
+        self._maps = {}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def columns(self):
+        return list(self.column_info)
+
+    def _map(self, name, dtype, shape=None):
+        if name not in self._maps:
+            path = os.path.join(self.path, name)
+            if os.path.getsize(path) == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.memmap(path, dtype=dtype, mode='r')
+            self._maps[name] = array.reshape(shape) if shape else array
+        return self._maps[name]
+
+    def _search(self, boxes):
+        """(query, position) pairs whose bounding boxes intersect ``boxes`` (an (m, 4) array)."""
+        empty = np.empty(0, dtype=np.int64)
+        if not self.count or not len(boxes):
+            return empty, empty
+        tree = self._map('tree.bounds', np.float64, (-1, 4))
+        node_size = self.node_size
+        top = len(self.level_sizes) - 1
+        query = np.repeat(np.arange(len(boxes)), self.level_sizes[top])
+        node = np.tile(np.arange(self.level_sizes[top]), len(boxes))
+        q = boxes[query]
+        for level in range(top, -1, -1):
+            b = tree[self.level_starts[level] + node]
+            hit = (b[:, 0] <= q[:, 2]) & (b[:, 2] >= q[:, 0]) & (b[:, 1] <= q[:, 3]) & (b[:, 3] >= q[:, 1])
+            query, node, q = query[hit], node[hit], q[hit]
+            if level == 0:
+                break
+            # Expand every surviving node into its children on the level below.
+            child = (node[:, None] * node_size + np.arange(node_size)).ravel()
+            keep = child < self.level_sizes[level - 1]
+            query, node, q = np.repeat(query, node_size)[keep], child[keep], np.repeat(q, node_size, axis=0)[keep]
+        return query, node
+
+    def search(self, boxes):
+        """Bounding-box candidates for ``boxes``, ``QUERY_BATCH`` queries at a time."""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        queries, positions = [], []
+        for start in range(0, len(boxes), QUERY_BATCH):
+            query, position = self._search(boxes[start:start + QUERY_BATCH])
+            queries.append(query + start)
+            positions.append(position)
+        if not queries:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(queries), np.concatenate(positions)
+
+    def geometries(self, positions):
+        """Shapely geometries at index ``positions``, decoded from the WKB buffer."""
+        import shapely
+        positions = np.asarray(positions, dtype=np.int64)
+        ends = self._map('geom.offsets', np.int64)
+        data = self._map('geom.data', np.uint8)
+        stops = ends[positions]
+        starts = np.where(positions > 0, ends[np.maximum(positions - 1, 0)], 0)
+        blobs = np.empty(len(positions), dtype=object)
+        # An object array: NumPy's bytes dtype would strip WKB's trailing zero bytes.
+        raw = memoryview(data)
+        blobs[:] = [raw[s:e].tobytes() for s, e in zip(starts.tolist(), stops.tolist())]
+        return shapely.from_wkb(blobs)
+
+    def _refine(self, query, position, test):
+        """Keep the candidate pairs for which ``test(geometries, query)`` holds,
+        decoding each distinct candidate geometry once."""
+        if not len(query):
+            return query, position
+        unique, inverse = np.unique(position, return_inverse=True)
+        geoms = self.geometries(unique)[inverse]
+        keep = test(geoms, query)
+        return query[keep], position[keep]
+
+    def query_points(self, x, y):
+        """All (point, position) pairs where the feature covers the point;
+        a point on a shared boundary matches every feature it touches."""
+        import shapely
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        query, position = self.search(np.column_stack([x, y, x, y]))
+        return self._refine(query, position, lambda geoms, q: shapely.intersects_xy(geoms, x[q], y[q]))
+
+    def locate(self, x, y):
+        """The index position of a feature covering each point, or -1; where
+        several do, the one that comes first in the index."""
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        query, position = self.query_points(x, y)
+        out = np.full(len(x), -1, dtype=np.int64)
+        # Assign in reverse so the first match per point wins.
+        out[query[::-1]] = position[::-1]
+        return out
+
+    def query_bbox(self, boxes, predicate='intersects'):
+        """(box, position) pairs for (minx, miny, maxx, maxy) ``boxes``. With
+        ``predicate=None`` bounding-box overlap is enough; otherwise it is a
+        Shapely predicate the feature must satisfy against the box, such as
+        ``'intersects'`` or ``'within'``."""
+        import shapely
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        query, position = self.search(boxes)
+        if predicate is None:
+            return query, position
+        test = getattr(shapely, predicate)
+        return self._refine(query, position, lambda geoms, q: test(geoms, shapely.box(*boxes[q].T)))
+
+    def rows(self, positions):
+        """Source GeoDataFrame rows for index ``positions``."""
+        return np.asarray(self._map('rows', np.int64)[np.asarray(positions, dtype=np.int64)])
+
+    def column(self, name, positions):
+        info = self.column_info[name]
+        positions = np.asarray(positions, dtype=np.int64)
+        if info['kind'] != 'str':
+            return np.asarray(self._map(f"{info['file']}.values", np.int64 if info['kind'] == 'int' else np.float64)[positions])
+        ends = self._map(f"{info['file']}.offsets", np.int64)
+        data = self._map(f"{info['file']}.data", np.uint8)
+        out = np.full(len(positions), None, dtype=object)
+        for j, i in enumerate(positions.tolist()):
+            start = ends[i - 1] if i else 0
+            if ends[i] > start:
+                out[j] = data[start:ends[i]].tobytes().decode('utf-8')
+        return out
+
+    def keys(self, positions):
+        """The stored key columns for ``positions`` as a list of dicts."""
+        values = {name: self.column(name, positions).tolist() for name in self.columns}
+        return [dict(zip(values, row)) for row in zip(*values.values())] if values else [{} for _ in positions]
+
+
+def read_features(path, key_columns=None):
+    """Read features for indexing from a GeoPackage, GeoParquet file or feature cache."""
+    import geopandas as gpd
+    from .feature_cache import FeatureCache, is_feature_cache
+    if is_feature_cache(path):
+        cache = FeatureCache(path)
+        return cache.to_gdf(columns=[c for c in (key_columns or []) if c in cache.columns])
+    if path.endswith('.parquet'):
+        return gpd.read_parquet(path)
+    return gpd.read_file(path, layer='features')
+
+def _points(path):
+    """(x, y) arrays from a CSV with x/y, lon/lat or longitude/latitude columns ('-' for stdin)."""
+    f = sys.stdin if path == '-' else open(path, newline='')
+    try:
+        reader = csv.DictReader(f)
+        fields = {name.lower(): name for name in reader.fieldnames or []}
+        for x_name, y_name in (('x', 'y'), ('lon', 'lat'), ('longitude', 'latitude')):
+            if x_name in fields and y_name in fields:
+                break
+        else:
+            raise ValueError(f"{path} needs x/y or lon/lat columns")
+        rows = [(r[fields[x_name]], r[fields[y_name]]) for r in reader]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    xy = np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+    return xy[:, 0], xy[:, 1]
+
+def _floats(text, count):
+    values = [float(v) for v in text.split(',')]
+    if len(values) != count:
+        raise argparse.ArgumentTypeError(f"expected {count} comma-separated numbers, got {text!r}")
+    return values
+
+def build_main(argv=None):
+    parser = argparse.ArgumentParser(prog='customer-data index',
+                                     description='Build a spatial index from a GeoPackage, GeoParquet file or feature cache.')
+    parser.add_argument('source', help='features.gpkg, features.parquet or a feature cache directory')
+    parser.add_argument('index', help='index directory to write')
+    parser.add_argument('--key', action='append', default=[], help='column to return with matches (repeatable)')
+    parser.add_argument('--node-size', type=int, default=NODE_SIZE, help=f'R-tree fan-out (default {NODE_SIZE})')
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    gdf = read_features(args.source, args.key)
+    build_spatial_index(gdf, args.index, args.key, args.node_size)
+    print(f"Indexed {args.source} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='customer-data query',
+                                     description='Find the features containing points or intersecting boxes.')
+    parser.add_argument('index', help='index directory written by customer-data index')
+    parser.add_argument('--point', action='append', default=[], type=lambda t: _floats(t, 2), help='x,y (repeatable)')
+    parser.add_argument('--points', help="CSV with x/y or lon/lat columns, '-' for stdin")
+    parser.add_argument('--bbox', action='append', default=[], type=lambda t: _floats(t, 4),
+                        help='minx,miny,maxx,maxy (repeatable)')
+    parser.add_argument('--all', action='store_true', help='every feature covering a point, not just the first')
+    parser.add_argument('--output', help='write JSON lines here instead of stdout')
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Western longitudes start with '-'; bind them to their option so argparse
+    # does not take '--point -93.7,32.5' for two options.
+    for i in range(len(argv) - 2, -1, -1):
+        if argv[i] in ('--point', '--bbox'):
+            argv[i:i + 2] = [f'{argv[i]}={argv[i + 1]}']
+    args = parser.parse_args(argv)
+    index = SpatialIndex(args.index)
+    x, y = np.empty(0), np.empty(0)
+    if args.points:
+        x, y = _points(args.points)
+    if args.point:
+        xy = np.asarray(args.point, dtype=np.float64)
+        x, y = np.concatenate([x, xy[:, 0]]), np.concatenate([y, xy[:, 1]])
+    if not len(x) and not args.bbox:
+        parser.error('give --point, --points or --bbox')
+    started = time.perf_counter()
+    if args.all:
+        query, position = index.query_points(x, y)
+    else:
+        located = index.locate(x, y)
+        query = np.arange(len(x))
+        position = located
+    found = position >= 0
+    keys = iter(index.keys(position[found]))
+    rows = iter(index.rows(position[found]).tolist())
+    results = []
+    for q, hit in zip(query.tolist(), found.tolist()):
+        results.append({'x': float(x[q]), 'y': float(y[q]), 'row': next(rows) if hit else None,
+                        'match': next(keys) if hit else None})
+    if args.bbox:
+        bbox_query, bbox_position = index.query_bbox(args.bbox)
+        for q, row, match in zip(bbox_query.tolist(), index.rows(bbox_position).tolist(), index.keys(bbox_position)):
+            results.append({'bbox': args.bbox[q], 'row': row, 'match': match})
+    seconds = time.perf_counter() - started
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for result in results:
+            out.write(json.dumps(result) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    lookups = len(x) + len(args.bbox)
+    print(f"{lookups} lookups in {seconds * 1000:.1f} ms ({lookups / max(seconds, 1e-9):,.0f}/s)", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import json
+import sqlite3
+
+class RecordStore:
+    """Local SQLite store of JSON records keyed by a primary key.
+
+    Used by incremental syncs to merge changed records into a complete local
+    copy without rewriting it. ``ref`` is an optional indexed integer per record
+    (e.g. an ArcGIS object ID) used to find records deleted upstream. Named
+    watermarks record how far each sync has progressed.
+    """
+
+    def __init__(self, path):
+        dir_path = os.path.dirname(path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        self.path = path
+        # Async ETLs hand the store to executor threads; it is never used by two threads at once.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, ref INTEGER, data TEXT NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS records_ref_idx ON records (ref)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS watermarks (name TEXT PRIMARY KEY, value TEXT)')
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def make_key(record, key_fields):
+        return json.dumps([record.get(k) for k in key_fields])
+
+    def upsert(self, rows):
+        """Insert or replace ``(key, ref, record)`` rows; returns the number written."""
+        rows = ((key, ref, json.dumps(record)) for key, ref, record in rows)
+        with self.conn:
+            cur = self.conn.executemany(
+                'INSERT INTO records (key, ref, data) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET ref = excluded.ref, data = excluded.data', rows)
+        return cur.rowcount
+
+    def delete_missing_refs(self, refs):
+        """Delete records whose ``ref`` is not in ``refs``; returns the number deleted."""
+        with self.conn:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS live_refs (ref INTEGER PRIMARY KEY)')
+            self.conn.execute('DELETE FROM live_refs')
+            self.conn.executemany('INSERT OR IGNORE INTO live_refs VALUES (?)', ((r,) for r in refs))
+            cur = self.conn.execute(
+                'DELETE FROM records WHERE ref IS NOT NULL AND ref NOT IN (SELECT ref FROM live_refs)')
+        return cur.rowcount
+
+    def get(self, key):
+        row = self.conn.execute('SELECT data FROM records WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def iter_records(self):
+        for (data,) in self.conn.execute('SELECT data FROM records ORDER BY rowid'):
+            yield json.loads(data)
+
+    def get_watermark(self, name):
+        row = self.conn.execute('SELECT value FROM watermarks WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_watermark(self, name, value):
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO watermarks (name, value) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = excluded.value', (name, json.dumps(value)))
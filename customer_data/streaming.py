@@ -0,0 +1,181 @@
+import os
+import csv
+import json
+import codecs
+import tempfile
+from .parquet import ParquetRecordWriter
+
+_decoder = json.JSONDecoder()
+_WS = ' \t\r\n'
+
+def iter_json_array(chunks, encoding='utf-8-sig'):
+    """Incrementally parse a top-level JSON array from an iterable of byte
+    chunks, yielding one element at a time. If the document is not an array
+    the whole value is yielded once."""
+    decode = codecs.getincrementaldecoder(encoding)().decode
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    eof = False
+
+    def more():
+        nonlocal buf, pos, eof
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            eof = True
+            chunk = b''
+        buf = buf[pos:] + decode(chunk, final=eof)
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            more()
+
+    skip_ws()
+    if pos >= len(buf):
+        return
+    if buf[pos] != '[':
+        while not eof:
+            more()
+        yield json.loads(buf[pos:])
+        return
+    pos += 1
+    while True:
+        skip_ws()
+        if pos >= len(buf):
+            raise ValueError('Unterminated JSON array')
+        if buf[pos] == ']':
+            return
+        if buf[pos] == ',':
+            pos += 1
+            continue
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            # A number at the very end of the buffer may still be growing.
+            if end == len(buf) and not eof and not isinstance(value, (dict, list, str)):
+                more()
+                continue
+            break
+        pos = end
+        yield value
+
+
+class JsonArrayWriter:
+    """Write records one at a time as a JSON array, formatted like
+    ``json.dump(records, f, indent=indent)``.
+
+    The array is written to ``<path>.tmp`` and moved into place by
+    ``close()``; ``abort()`` (or leaving a ``with`` block on an exception)
+    deletes it instead, so a failed run never leaves a truncated array that
+    still parses.
+    """
+
+    def __init__(self, path, indent=2):
+        self.path = path
+        self.tmp = path + '.tmp'
+        self.f = open(self.tmp, 'w')
+        self.indent = indent
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record):
+        if self.indent is None:
+            self.f.write(('[' if self.count == 0 else ', ') + json.dumps(record))
+        else:
+            pad = '\n' + ' ' * self.indent
+            text = json.dumps(record, indent=self.indent).replace('\n', pad)
+            self.f.write(('[' if self.count == 0 else ',') + pad + text)
+        self.count += 1
+
+    def close(self):
+        if self.f.closed:
+            return
+        if not self.count:
+            self.f.write('[]')
+        else:
+            self.f.write(']' if self.indent is None else '\n]')
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        """Close without the closing bracket and delete the partial file."""
+        if self.f.closed:
+            return
+        self.f.close()
+        os.remove(self.tmp)
+
+
+def write_records(records, json_path=None, csv_path=None, parquet_path=None):
+    """Stream ``records`` (an iterable of dicts) to a JSON array, CSV and/or
+    Parquet file without holding them in memory; returns the number of records
+    written.
+
+    CSV needs the full column set before its header can be written, so rows are
+    spilled to a temporary NDJSON file while columns are discovered and copied
+    into the CSV once the stream ends.
+    """
+    writer = JsonArrayWriter(json_path) if json_path else None
+    parquet = ParquetRecordWriter(parquet_path) if parquet_path else None
+    spill = None
+    if csv_path:
+        spill = tempfile.NamedTemporaryFile('w+', suffix='.ndjson', dir=os.path.dirname(csv_path) or '.',
+                                            delete=False, encoding='utf-8')
+    keys = set()
+    count = 0
+    try:
+        for record in records:
+            if writer:
+                writer.write(record)
+            if parquet:
+                parquet.write(record)
+            if spill:
+                keys.update(record.keys())
+                spill.write(json.dumps(record) + '\n')
+            count += 1
+        if spill and count:
+            spill.seek(0)
+            with open(csv_path + '.tmp', 'w', newline='', encoding='utf-8') as f:
+                csv_writer = csv.DictWriter(f, fieldnames=sorted(keys))
+                csv_writer.writeheader()
+                for line in spill:
+                    csv_writer.writerow(json.loads(line))
+        # Only now, with every record read, do the outputs replace the previous ones.
+        if writer:
+            writer.close()
+        if parquet:
+            parquet.close()
+        if spill and count:
+            os.replace(csv_path + '.tmp', csv_path)
+    except BaseException:
+        if writer:
+            writer.abort()
+        if parquet:
+            parquet.abort()
+        if csv_path and os.path.exists(csv_path + '.tmp'):
+            os.remove(csv_path + '.tmp')
+        raise
+    finally:
+        if spill:
+            spill.close()
+            os.remove(spill.name)
+    return count
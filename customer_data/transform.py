@@ -1,34 +1,171 @@
+import re
+import hashlib
+from itertools import chain
+import numpy as np
+import shapely
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import shape, Polygon, MultiPolygon, mapping
+from shapely import GeometryType
+from shapely.geometry import shape
 
 def esri_json_to_shapely(geom):
-    if not geom or not isinstance(geom, dict):
-        return None
-    if 'rings' in geom:
-        try:
-            return Polygon(geom['rings'][0]) if len(geom['rings']) == 1 else MultiPolygon([Polygon(r) for r in geom['rings']])
-        except Exception:
-            return None
-    if 'paths' in geom:
-        # Polyline, treat as LineString
-        from shapely.geometry import LineString, MultiLineString
-        try:
-            return LineString(geom['paths'][0]) if len(geom['paths']) == 1 else MultiLineString([LineString(p) for p in geom['paths']])
-        except Exception:
-            return None
-    if 'x' in geom and 'y' in geom:
-        from shapely.geometry import Point
-        return Point(geom['x'], geom['y'])
-    if 'type' in geom:
+    return esri_json_to_shapely_array([geom])[0]
+
+def _flatten(parts, min_vertices):
+    """Flatten nested part lists into an (N, 2) coordinate array plus per-part
+    feature index, start and length arrays. Parts with fewer than
+    ``min_vertices`` vertices are dropped."""
+    owner, kept = [], []
+    for i, ps in parts:
+        for p in ps:
+            if p and len(p) >= min_vertices:
+                owner.append(i)
+                kept.append(p)
+    lengths = np.fromiter((len(p) for p in kept), dtype=np.int64, count=len(kept))
+    vertices = list(chain.from_iterable(kept))
+    try:
+        coords = np.asarray(vertices, dtype=float)
+    except ValueError:
+        # Mixed 2D/3D/M vertices; keep x, y only.
+        coords = np.asarray([v[:2] for v in vertices], dtype=float)
+    coords = coords.reshape(-1, coords.shape[-1] if coords.size else 2)[:, :2]
+    starts = np.zeros(len(kept), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return coords, np.asarray(owner, dtype=np.int64), starts, lengths
+
+def _reorder(coords, starts, lengths, order):
+    """Gather the vertex runs of ``order`` into one contiguous array."""
+    lengths = lengths[order]
+    new_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    idx = np.repeat(starts[order] - new_starts, lengths) + np.arange(lengths.sum())
+    return coords[idx], np.concatenate([[0], np.cumsum(lengths)])
+
+def _ring_areas(coords, starts, lengths):
+    """Twice the signed (shoelace) area of each closed ring; negative is clockwise.
+
+    Each ring is summed on its own, relative to its first vertex, so small
+    rings at large lon/lat offsets keep their precision."""
+    if not len(starts):
+        return np.zeros(0)
+    if len(starts) > 1 and (starts[1:] != starts[:-1] + lengths[:-1]).any():
+        coords, offsets = _reorder(coords, starts, lengths, np.arange(len(starts)))
+        starts = offsets[:-1]
+    ring = np.repeat(np.arange(len(starts)), lengths)
+    origin = coords[starts][ring]
+    x = coords[starts[0]:starts[0] + len(ring), 0] - origin[:, 0]
+    y = coords[starts[0]:starts[0] + len(ring), 1] - origin[:, 1]
+    cross = np.zeros(len(ring))
+    cross[:-1] = x[:-1] * y[1:] - x[1:] * y[:-1]
+    # Drop the term pairing each ring's last vertex with the next ring's first.
+    cross[starts - starts[0] + lengths - 1] = 0.0
+    return np.add.reduceat(cross, starts - starts[0])
+
+def _polygons(parts, n_features):
+    return polygons_from_rings(*_flatten(parts, 4), n_features)
+
+def polygons_from_rings(coords, owner, starts, lengths, n_features):
+    """Build (Multi)Polygons from flat ESRI rings: ``coords`` plus each ring's
+    feature index, start and length."""
+    out = np.full(n_features, None, dtype=object)
+    if not len(owner):
+        return out
+    # ESRI shells are clockwise and holes counter-clockwise. A feature with no
+    # clockwise ring was written with the wrong winding; treat every ring as a shell.
+    is_shell = _ring_areas(coords, starts, lengths) < 0
+    shell_counts = np.bincount(owner, weights=is_shell, minlength=n_features).astype(np.int64)
+    is_shell |= shell_counts[owner] == 0
+    shell_counts = np.bincount(owner, weights=is_shell, minlength=n_features).astype(np.int64)
+
+    # Each hole belongs to the nearest preceding shell of the same feature, or
+    # the feature's first shell if it is listed before any shell.
+    part = np.cumsum(is_shell) - 1
+    first_part = np.concatenate([[0], np.cumsum(shell_counts)[:-1]])
+    part = np.where(part < first_part[owner], first_part[owner], part)
+
+    # Only features with several shells need an actual containment test.
+    ambiguous = np.flatnonzero(~is_shell & (shell_counts[owner] > 1))
+    if len(ambiguous):
+        shell_idx = np.flatnonzero(is_shell)
+        shell_coords, shell_offsets = _reorder(coords, starts, lengths, shell_idx)
+        shell_polys = shapely.from_ragged_array(
+            GeometryType.POLYGON, shell_coords, (shell_offsets, np.arange(len(shell_idx) + 1)))
+        for r in ambiguous:
+            f = owner[r]
+            candidates = np.arange(first_part[f], first_part[f] + shell_counts[f])
+            x, y = coords[starts[r]]
+            inside = candidates[shapely.contains_xy(shell_polys[candidates], x, y)]
+            if len(inside):
+                part[r] = inside[0]
+
+    order = np.lexsort((~is_shell, part))
+    ring_coords, ring_offsets = _reorder(coords, starts, lengths, order)
+    part_offsets = np.concatenate([[0], np.cumsum(np.bincount(part, minlength=part.max() + 1))])
+    has_geom = np.flatnonzero(shell_counts)
+    geom_offsets = np.concatenate([[0], np.cumsum(shell_counts[has_geom])])
+    multi = shapely.from_ragged_array(
+        GeometryType.MULTIPOLYGON, ring_coords, (ring_offsets, part_offsets, geom_offsets))
+    single = shell_counts[has_geom] == 1
+    multi[single] = shapely.get_geometry(multi[single], 0)
+    out[has_geom] = multi
+    return out
+
+def _lines(parts, n_features):
+    return lines_from_paths(*_flatten(parts, 2), n_features)
+
+def lines_from_paths(coords, owner, starts, lengths, n_features):
+    """Build (Multi)LineStrings from flat ESRI paths, stored contiguously in feature order."""
+    out = np.full(n_features, None, dtype=object)
+    if not len(owner):
+        return out
+    path_counts = np.bincount(owner, minlength=n_features)
+    has_geom = np.flatnonzero(path_counts)
+    geom_offsets = np.concatenate([[0], np.cumsum(path_counts[has_geom])])
+    path_offsets = np.concatenate([[0], starts + lengths])
+    multi = shapely.from_ragged_array(
+        GeometryType.MULTILINESTRING, coords[:, :2], (path_offsets, geom_offsets))
+    single = path_counts[has_geom] == 1
+    multi[single] = shapely.get_geometry(multi[single], 0)
+    out[has_geom] = multi
+    return out
+
+def esri_json_to_shapely_array(geoms):
+    """Convert a sequence of ESRI JSON geometries to a NumPy array of Shapely
+    geometries in bulk. Unparseable or empty geometries become ``None``."""
+    n = len(geoms)
+    out = np.full(n, None, dtype=object)
+    rings, paths, points, other = [], [], [], []
+    for i, g in enumerate(geoms):
+        if not g or not isinstance(g, dict):
+            continue
+        if 'rings' in g:
+            rings.append((i, g['rings'] or []))
+        elif 'paths' in g:
+            paths.append((i, g['paths'] or []))
+        elif 'x' in g and 'y' in g:
+            if g['x'] is not None and g['y'] is not None:
+                points.append((i, g['x'], g['y']))
+        elif 'type' in g:
+            other.append(i)
+    if rings:
+        polys = _polygons(rings, n)
+        mask = polys != None  # noqa: E711
+        out[mask] = polys[mask]
+    if paths:
+        lines = _lines(paths, n)
+        mask = lines != None  # noqa: E711
+        out[mask] = lines[mask]
+    if points:
+        idx, xs, ys = zip(*points)
+        out[list(idx)] = shapely.points(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+    for i in other:
         try:
-            return shape(geom)
+            out[i] = shape(geoms[i])
         except Exception:
-            return None
-    return None
+            pass
+    return out
 
 def features_to_gdf(meta, features):
-    geoms = [esri_json_to_shapely(f.get('geometry')) for f in features]
+    geoms = esri_json_to_shapely_array([f.get('geometry') for f in features])
     records = [f['attributes'] for f in features]
     gdf = gpd.GeoDataFrame(records, geometry=geoms, crs='EPSG:4326')
     return gdf
@@ -36,8 +173,109 @@ def features_to_gdf(meta, features):
 def deduplicate_gdf(gdf, primary_key):
     return gdf.drop_duplicates(subset=primary_key)
 
-def extract_owners(gdf):
-    cols = [c for c in gdf.columns if 'owner' in c.lower()]
-    if not cols:
-        return pd.DataFrame()
-    return gdf[cols].drop_duplicates().reset_index(drop=True) 
\ No newline at end of file
+OWNER_ADDRESS_PATTERN = re.compile(r'addr|street|city|state|zip|mail', re.IGNORECASE)
+
+# Spelled-out forms mapped to the abbreviation kept after normalization.
+NAME_ABBREVIATIONS = {
+    'INCORPORATED': 'INC', 'CORPORATION': 'CORP', 'COMPANY': 'CO', 'LIMITED': 'LTD',
+    'TRUSTEE': 'TR', 'TRUSTEES': 'TRS', 'ESTATE': 'EST', 'AND': '&',
+}
+ADDRESS_ABBREVIATIONS = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'ROAD': 'RD', 'DRIVE': 'DR', 'LANE': 'LN', 'COURT': 'CT',
+    'CIRCLE': 'CIR', 'PLACE': 'PL', 'BOULEVARD': 'BLVD', 'HIGHWAY': 'HWY', 'PARKWAY': 'PKWY',
+    'SUITE': 'STE', 'APARTMENT': 'APT', 'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+}
+
+NAME_PATTERNS = [(r'\bL L C\b', 'LLC'), (r'\bL L P\b', 'LLP')]
+ADDRESS_PATTERNS = [(r'\b(?:P O|POST OFFICE) BOX\b', 'PO BOX')]
+
+def _normalize_text(values, abbreviations, patterns):
+    """Upper-case, strip accents and punctuation, collapse whitespace and
+    abbreviate common words; empty results become NA."""
+    s = pd.Series(values, dtype='string').str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+    s = s.str.upper().str.replace(r'[^A-Z0-9&#/]+', ' ', regex=True).str.strip()
+    for pattern, replacement in patterns:
+        s = s.str.replace(pattern, replacement, regex=True)
+    words = r'\b(' + '|'.join(abbreviations) + r')\b'
+    s = s.str.replace(words, lambda m: abbreviations[m.group(1)], regex=True)
+    return s.mask(s == '')
+
+def normalize_owner_names(values):
+    return _normalize_text(values, NAME_ABBREVIATIONS, NAME_PATTERNS)
+
+def normalize_addresses(values):
+    return _normalize_text(values, ADDRESS_ABBREVIATIONS, ADDRESS_PATTERNS)
+
+def owner_id(name, address=None):
+    """Stable owner ID: a short hash of the normalized name and address."""
+    key = f'{name}|{address or ""}'
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+OWNER_COLUMNS = ['owner_id', 'owner_name', 'owner_address', 'name_raw', 'parcel_count']
+
+def owner_name_columns(columns):
+    """``(name_cols, address_cols)``: the owner name and mailing address columns."""
+    owner_cols = [c for c in columns if 'owner' in c.lower()]
+    address_cols = [c for c in owner_cols if OWNER_ADDRESS_PATTERN.search(c)]
+    return [c for c in owner_cols if c not in address_cols], address_cols
+
+def owner_links(gdf, primary_key):
+    """The per-parcel half of :func:`build_owner_index`: one row per parcel
+    and owner name column with the normalized owner, its ``owner_id`` and
+    the parcel's index label as ``row``. Works on any slice of a layer."""
+    name_cols, address_cols = owner_name_columns(gdf.columns)
+    key_cols = [k for k in primary_key if k in gdf.columns]
+    if len(key_cols) != len(primary_key):
+        raise ValueError(f"primary_key {primary_key} is not in the feature columns")
+    if not name_cols:
+        return pd.DataFrame(columns=['row', *key_cols, 'name_raw', 'owner_name', 'owner_address', 'role', 'owner_id'])
+
+    frame = pd.DataFrame(gdf[key_cols + name_cols + address_cols])
+    if address_cols:
+        parts = [frame[c].astype('string').fillna('') for c in address_cols]
+        address = normalize_addresses(parts[0].str.cat(parts[1:], sep=' '))
+    else:
+        address = pd.Series(pd.NA, index=frame.index, dtype='string')
+    links = pd.concat([
+        pd.DataFrame({
+            'row': frame.index,
+            **{k: frame[k] for k in key_cols},
+            'name_raw': frame[c].astype('string'),
+            'owner_name': normalize_owner_names(frame[c]),
+            'owner_address': address,
+            'role': c,
+        })
+        for c in name_cols
+    ], ignore_index=True)
+    links = links[links['owner_name'].notna()]
+    pairs = pd.MultiIndex.from_frame(links[['owner_name', 'owner_address']].astype(object).fillna(''))
+    unique = pairs.unique()
+    ids = pd.Series([owner_id(name, address) for name, address in unique], index=unique)
+    return links.assign(owner_id=ids.reindex(pairs).to_numpy())
+
+def owners_from_links(links, primary_key):
+    """Build ``(owners, owner_parcels)`` from :func:`owner_links` rows, which
+    must be in column-then-row order; the first spelling of an owner is its
+    ``name_raw``."""
+    key_cols = list(primary_key)
+    owner_parcels = links[['owner_id', *key_cols, 'role']].drop_duplicates().reset_index(drop=True)
+    if links.empty:
+        return pd.DataFrame(columns=OWNER_COLUMNS), owner_parcels
+    counts = owner_parcels.drop_duplicates(['owner_id', *key_cols]).groupby('owner_id').size()
+    owners = links.drop_duplicates('owner_id').set_index('owner_id')
+    owners = owners.assign(parcel_count=counts).reset_index()[OWNER_COLUMNS]
+    return owners.sort_values('owner_id', ignore_index=True), owner_parcels
+
+def build_owner_index(gdf, primary_key):
+    """Build ``(owners, owner_parcels)`` from the parcel owner columns.
+
+    Columns whose name contains "owner" are owner fields; those that look like
+    mailing address parts (address, street, city, state, zip, mail) are joined
+    into one address, the rest are owner names (e.g. OWNER1, OWNER2). Names
+    and addresses are normalized so spelling variants of the same owner
+    collapse onto one stable ``owner_id``. ``owners`` has one row per owner
+    with its parcel count; ``owner_parcels`` links each owner to the
+    ``primary_key`` of every parcel it owns, with the name column it came from
+    as ``role``.
+    """
+    return owners_from_links(owner_links(gdf, primary_key), primary_key)
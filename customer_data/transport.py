@@ -0,0 +1,235 @@
+import time
+import bisect
+import functools
+import contextlib
+import random
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests that can be repeated without changing the result more than once.
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# Upper bounds (seconds) of the request latency histogram buckets; the last catches the rest.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float('inf'))
+
+DEFAULTS = {
+    'connect_timeout': 10,
+    'read_timeout': 300,
+    'max_retries': 5,
+    'backoff': 0.5,
+    'max_backoff': 60,
+    'pool_maxsize': 10,
+    'max_per_host': None,
+    'max_in_flight': None,
+    'cache': None,
+}
+
+def backoff_delay(attempt, backoff, max_backoff, retry_after=None):
+    """Jittered exponential backoff, honoring a numeric ``Retry-After``."""
+    delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(max_backoff, int(retry_after)))
+    return delay
+
+
+def retries_allowed(method, retry=None):
+    """Whether a request may be retried: ``retry`` if given, else only idempotent methods."""
+    return method.upper() in IDEMPOTENT_METHODS if retry is None else retry
+
+
+class HttpClient:
+    """Pooled HTTP client shared by every jurisdiction ETL.
+
+    One ``requests.Session`` keeps a keep-alive connection pool per host,
+    negotiates gzip/deflate, applies timeouts, and retries connection errors
+    and 429/5xx responses with jittered exponential backoff. Only idempotent
+    methods are retried by default; pass ``retry=True`` for a POST that is
+    safe to repeat (a read-only query) or ``retry=False`` to never retry.
+    ``stats()`` reports request counts, retries, bytes and a latency
+    histogram, overall and per host. Streamed bodies are counted as they are
+    read; their latency is the time to the response headers.
+    ``max_per_host`` caps requests in flight to any one host across threads and
+    ``max_in_flight`` caps them across all hosts. ``cache`` (a dict of
+    :class:`~customer_data.http_cache.ResponseCache` options: ``mode``,
+    ``path``, ``exclude``) records responses to disk and replays or
+    revalidates them on later runs.
+    """
+
+    def __init__(self, connect_timeout=10, read_timeout=300, max_retries=5, backoff=0.5,
+                 max_backoff=60, pool_maxsize=10, max_per_host=None, max_in_flight=None,
+                 cache=None, sleep=time.sleep):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.max_per_host = max_per_host
+        self._host_slots = {}
+        self._global_slot = threading.BoundedSemaphore(max_in_flight) if max_in_flight else contextlib.nullcontext()
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.cache = None
+        if cache and cache.get('mode'):
+            from .http_cache import ResponseCache
+            self.cache = ResponseCache(**cache)
+            print(f"HTTP cache: {self.cache.mode} ({self.cache.path})")
+
+    def _slot(self, host):
+        if not self.max_per_host:
+            return contextlib.nullcontext()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, retry=None, **kwargs):
+        send = functools.partial(self._send, retry=retry)
+        if self.cache is not None and self.cache.handles(method, url):
+            return self.cache.request(send, method, url, **kwargs)
+        return send(method, url, **kwargs)
+
+    def _send(self, method, url, retry=None, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        max_retries = self.max_retries if retries_allowed(method, retry) else 0
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                with self._global_slot, self._slot(host):
+                    resp = self.session.request(method, url, **kwargs)
+                    body, wire = self._sizes(resp, host, kwargs.get('stream'))
+            except (requests.ConnectionError, requests.Timeout):
+                self.record(host, time.perf_counter() - started, 0, 0, error=True)
+                if attempt >= max_retries:
+                    raise
+                self._wait(host, attempt)
+                attempt += 1
+                continue
+            self.record(host, time.perf_counter() - started, body, wire)
+            if resp.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                return resp
+            print(f"HTTP {resp.status_code} from {host}, retrying ({attempt + 1}/{max_retries})")
+            self._wait(host, attempt, resp.headers.get('Retry-After'))
+            resp.close()
+            attempt += 1
+
+    def _sizes(self, resp, host, stream):
+        """Decoded body size and on-the-wire (possibly compressed) size. A
+        streamed body is not read yet; it is counted as it is consumed."""
+        if stream:
+            self._count_stream(resp, host)
+            return 0, 0
+        body = len(resp.content)
+        try:
+            wire = resp.raw.tell() or body
+        except Exception:
+            wire = body
+        return body, wire
+
+    def _count_stream(self, resp, host):
+        # content, text, json() and iter_lines() all read through iter_content.
+        iter_content = resp.iter_content
+
+        def counted(*args, **kwargs):
+            read = 0
+            for chunk in iter_content(*args, **kwargs):
+                try:
+                    wire = resp.raw.tell() - read
+                except Exception:
+                    wire = len(chunk)
+                read += wire
+                self.add_bytes(host, len(chunk), wire)
+                yield chunk
+
+        resp.iter_content = counted
+
+    def _wait(self, host, attempt, retry_after=None):
+        self.count_retry(host)
+        self._sleep(backoff_delay(attempt, self.backoff, self.max_backoff, retry_after))
+
+    def count_retry(self, host):
+        with self._lock:
+            self._host(host)['retries'] += 1
+
+    def _host(self, host):
+        return self._stats.setdefault(host, {
+            'requests': 0, 'errors': 0, 'retries': 0,
+            'seconds': 0.0, 'bytes': 0, 'wire_bytes': 0,
+            'latency': [0] * len(LATENCY_BUCKETS),
+        })
+
+    def record(self, host, seconds, body, wire, error=False):
+        """Count one request; the async client records its requests here too."""
+        with self._lock:
+            s = self._host(host)
+            s['requests'] += 1
+            s['errors'] += int(error)
+            s['seconds'] += seconds
+            s['bytes'] += body
+            s['wire_bytes'] += wire
+            s['latency'][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def add_bytes(self, host, body, wire):
+        """Count body bytes read after a request was recorded (streamed responses)."""
+        with self._lock:
+            s = self._host(host)
+            s['bytes'] += body
+            s['wire_bytes'] += wire
+
+    def stats(self):
+        """Snapshot of counters: ``{'total': {...}, 'hosts': {host: {...}}}``,
+        plus ``'cache'`` hit/miss counts when a response cache is on."""
+        with self._lock:
+            hosts = {h: dict(s, latency=list(s['latency'])) for h, s in self._stats.items()}
+        total = {}
+        for s in hosts.values():
+            for k, v in s.items():
+                if isinstance(v, list):
+                    total[k] = [a + b for a, b in zip(total.get(k, [0] * len(v)), v)]
+                else:
+                    total[k] = total.get(k, 0) + v
+        stats = {'total': total, 'hosts': hosts}
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def _options(cfg):
+    options = dict(DEFAULTS)
+    options.update(cfg.get('http') or {})
+    options['pool_maxsize'] = max(options['pool_maxsize'], cfg.get('max_workers', 1))
+    return options
+
+def get_http_client(cfg=None):
+    """Return the process-wide client, creating it from ``cfg['http']`` on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(**_options(cfg or {}))
+        return _client
+
+def configure_http_client(cfg):
+    """Replace the process-wide client, e.g. with batch-wide limits, before any ETL runs."""
+    global _client
+    with _client_lock:
+        _client = HttpClient(**_options(cfg))
+        return _client
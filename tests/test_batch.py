@@ -0,0 +1,35 @@
+import json
+import pytest
+import yaml
+
+from benchmarks.mock_servers import MockServer, ARCGIS_LAYER
+from customer_data.batch import checkpoint_files, main
+
+
+def test_checkpoint_file_per_config():
+    assert checkpoint_files(['a/parcels.yaml', 'b/parcels.yml', 'tulsa_ok.yaml']) == {
+        'a/parcels.yaml': '.checkpoint.parcels', 'b/parcels.yml': '.checkpoint.parcels-2',
+        'tulsa_ok.yaml': '.checkpoint.tulsa_ok'}
+
+
+@pytest.mark.parametrize('engine', ['sync', 'async'])
+def test_batch_writes_outputs_and_reports_failures(tmp_path, monkeypatch, capsys, engine):
+    if engine == 'async':
+        pytest.importorskip('aiohttp')
+    pytest.importorskip('geopandas')
+    monkeypatch.chdir(tmp_path)
+    with MockServer(250, page_size=100) as server:
+        (tmp_path / 'parcels.yaml').write_text(yaml.safe_dump({
+            'name': 'Parcels', 'api_type': 'bossier', 'url': server.url + ARCGIS_LAYER, 'max_workers': 2,
+            'primary_key': ['PARCEL_ID'], 'features_path': 'output/parcels.cache',
+            'output': {'geopackage': 'output/parcels.gpkg'}}))
+        (tmp_path / 'broken.yaml').write_text(yaml.safe_dump({'name': 'Broken', 'api_type': 'bossier'}))
+        code = main([str(tmp_path), '--engine', engine, '--report', 'report.json'])
+    assert code == 1
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert [(r['config'].rsplit('/', 1)[1], r['status']) for r in report['jurisdictions']] == [
+        ('broken.yaml', 'failed'), ('parcels.yaml', 'ok')]
+    assert report['jurisdictions'][0]['error'].startswith('SystemExit')
+    assert (tmp_path / 'output' / 'parcels.gpkg').exists()
+    summary = capsys.readouterr().out.split('Wrote batch report to report.json')[1]
+    assert 'broken.yaml' in summary and 'failed' in summary and 'SystemExit' in summary
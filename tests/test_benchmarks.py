@@ -0,0 +1,35 @@
+import json
+import requests
+from benchmarks.mock_servers import MockServer
+from benchmarks.run import run_benchmarks, compare
+
+
+def test_mock_arcgis_pages_and_injects_errors():
+    with MockServer(25, page_size=10, error_rate=1.0) as server:
+        assert requests.get(server.arcgis_url, params={'f': 'pjson'}).status_code == 503
+        server.state.error_rate = 0.0
+        query = server.arcgis_url + '/query'
+        assert requests.get(query, params={'returnCountOnly': 'true'}).json() == {'count': 25}
+        page = requests.get(query, params={'where': '1=1', 'resultOffset': 20, 'resultRecordCount': 10}).json()
+        assert [f['attributes']['OBJECTID'] for f in page['features']] == [21, 22, 23, 24, 25]
+        assert not page['exceededTransferLimit']
+        rows = requests.post(server.pvdnet_url + '/adhoc/tables/query', headers={'AccessToken': 'bench-token'},
+                             json={'Query': 'SELECT TOP 5 * FROM OWNER WHERE OwnerId > 21 ORDER BY OwnerId'}).json()
+        assert [r['OwnerId'] for r in rows] == [22, 23, 24]
+
+
+def test_end_to_end_report(tmp_path):
+    report = run_benchmarks(records=300, page_size=100, error_rate=0.05, workers=2, isolate=False,
+                            workdir=str(tmp_path))
+    results = {r['source']: r for r in report['sources']}
+    assert {s: r['status'] for s, r in results.items()} == {'arcgis': 'ok', 'tulsa': 'ok', 'wayne': 'ok'}
+    assert results['arcgis']['records'] == 300
+    assert results['tulsa']['records'] == 300
+    assert results['wayne']['records'] == 900
+    assert (tmp_path / 'arcgis' / 'output' / 'bench.gpkg').exists()
+    assert len((tmp_path / 'tulsa' / 'output' / 'tulsa.csv').read_text().splitlines()) == 301
+    json.dumps(report)
+
+    slower = json.loads(json.dumps(report))
+    slower['sources'][0]['records_per_sec'] /= 2
+    assert compare(slower, report) and not compare(report, report)
@@ -0,0 +1,58 @@
+import pytest
+
+from benchmarks.mock_servers import MockServer, ARCGIS_LAYER
+from customer_data.etl.bossier_la import BossierETL
+
+
+class Interrupted(Exception):
+    pass
+
+
+def fetch(server, checkpoint, paging, max_workers=1, stop_after=None):
+    """(object IDs of every page in order, requests after the metadata) for one fetch_all run."""
+    etl = BossierETL({'api_type': 'bossier', 'url': server.url + ARCGIS_LAYER, 'paging': paging,
+                      'max_workers': max_workers})
+    meta = etl.fetch_metadata(etl.cfg['url'])
+    fields, out_sr, page_size = etl.layer_params(meta)
+    pages = []
+
+    def on_page(page):
+        if stop_after is not None and len(pages) == stop_after:
+            raise Interrupted()
+        pages.append([f['attributes']['OBJECTID'] for f in page])
+
+    before = server.state.requests
+    try:
+        etl.fetch_all(etl.cfg['url'], meta, fields, out_sr, page_size, checkpoint, on_page)
+    except Interrupted:
+        pass
+    return pages, server.state.requests - before
+
+
+def test_keyset_resume_reuses_pages_only_for_the_same_ids(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = str(tmp_path / '.checkpoint')
+    with MockServer(450, page_size=100) as server:
+        pages, _ = fetch(server, checkpoint, 'keyset', stop_after=2)
+        assert len(pages) == 2
+        pages, requests = fetch(server, checkpoint, 'keyset')
+        assert [p[0] for p in pages] == [1, 101, 201, 301, 401]
+        # The object IDs and the two batches the first run never spooled.
+        assert requests == 3
+        # Features were added since those pages were spooled: the ID ranges
+        # moved, so nothing spooled is reused.
+        server.state.records = 520
+        pages, requests = fetch(server, checkpoint, 'keyset')
+        assert [p[0] for p in pages] == [1, 101, 201, 301, 401, 501] and requests == 7
+
+
+def test_concurrent_offset_pages_arrive_in_order_and_resume(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    checkpoint = str(tmp_path / '.checkpoint')
+    with MockServer(1050, page_size=100, latency=0.005) as server:
+        pages, _ = fetch(server, checkpoint, 'offset', max_workers=4, stop_after=3)
+        assert [p[0] for p in pages] == [1, 101, 201]
+        pages, requests = fetch(server, checkpoint, 'offset', max_workers=4)
+    assert [i for page in pages for i in page] == list(range(1, 1051))
+    # The count, then at most the eight pages the interrupted run had not delivered.
+    assert requests <= 1 + 8
@@ -0,0 +1,45 @@
+from customer_data.checkpoint import PageSpool, save_checkpoint, load_checkpoint
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    path = str(tmp_path / '.checkpoint')
+    assert load_checkpoint(path) == 0
+    save_checkpoint(path, 2000)
+    assert load_checkpoint(path) == 2000
+
+
+def test_spool_resumes_after_reopen(tmp_path):
+    checkpoint = str(tmp_path / '.checkpoint')
+    fingerprint = {'url': 'https://example.test/FeatureServer/0', 'page_size': 2}
+    spool = PageSpool(checkpoint, fingerprint)
+    spool.put(0, [{'id': 1}, {'id': 2}])
+    spool.put(2, [{'id': 3}])
+
+    reopened = PageSpool(checkpoint, fingerprint)
+    assert reopened.is_done(0) and reopened.is_done(2)
+    assert reopened.next_offset() == 3
+    assert [f['id'] for page in reopened.iter_pages() for f in page] == [1, 2, 3]
+
+
+def test_spool_ignores_torn_journal_line(tmp_path):
+    checkpoint = str(tmp_path / '.checkpoint')
+    spool = PageSpool(checkpoint, {'url': 'a'})
+    spool.put(0, [{'id': 1}])
+    with open(spool.journal_path, 'a') as f:
+        f.write('{"key": "1", "co')
+    assert list(PageSpool(checkpoint, {'url': 'a'}).done) == ['0']
+
+
+def test_spool_is_isolated_by_fingerprint(tmp_path):
+    checkpoint = str(tmp_path / '.checkpoint')
+    PageSpool(checkpoint, {'url': 'a'}).put('parcels', count=10)
+    assert not PageSpool(checkpoint, {'url': 'b'}).done
+
+
+def test_spool_put_from_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    spool = PageSpool(str(tmp_path / '.checkpoint'), {'url': 'threads'})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: spool.put(f't{i % 4}@{i}', {'rows': i}, count=1), range(200)))
+    assert len(spool.keys()) == 200
+    assert len(PageSpool(str(tmp_path / '.checkpoint'), {'url': 'threads'}).done) == 200
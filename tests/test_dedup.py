@@ -0,0 +1,53 @@
+import pytest
+from customer_data.dedup import Deduplicator
+
+PAGES = [
+    [{'attributes': {'pk': 1, 'edit': 5, 'v': 'a'}}, {'attributes': {'pk': 2, 'edit': 9, 'v': 'a'}}],
+    [{'attributes': {'pk': 1, 'edit': 7, 'v': 'b'}}, {'attributes': {'pk': 2, 'edit': 3, 'v': 'b'}},
+     {'attributes': {'pk': 3, 'edit': None, 'v': 'b'}}],
+    [{'attributes': {'pk': 1, 'edit': 6, 'v': 'c'}}],
+]
+
+def run(policy):
+    dedup = Deduplicator(['pk'], policy, 'edit')
+    if dedup.needs_observe:
+        for n, page in enumerate(PAGES):
+            dedup.observe(n, page)
+    kept = [f['attributes'] for n, page in enumerate(PAGES) for f in dedup.filter(n, page)]
+    return {a['pk']: a['v'] for a in kept}, dedup.duplicates
+
+def test_policies():
+    assert run('first') == ({1: 'a', 2: 'a', 3: 'b'}, {1: 2, 2: 1})
+    assert run('last') == ({1: 'c', 2: 'b', 3: 'b'}, {0: 2, 1: 1})
+    assert run('edit_date') == ({1: 'b', 2: 'a', 3: 'b'}, {0: 1, 1: 1, 2: 1})
+
+def test_edit_date_needs_field():
+    with pytest.raises(ValueError):
+        Deduplicator(['pk'], 'edit_date', None)
+
+def test_keys_do_not_collide():
+    # hash((-1,)) == hash((-2,)) in CPython; distinct keys must both survive.
+    page = [{'attributes': {'pk': -1}}, {'attributes': {'pk': -2}}, {'attributes': {'pk': '-1'}},
+            {'attributes': {'pk': -1}}]
+    dedup = Deduplicator(['pk'])
+    assert [f['attributes']['pk'] for f in dedup.filter(0, page)] == [-1, -2, '-1']
+
+class Collect(list):
+    write = list.append
+
+def test_page_sink_filters_first_while_fetching():
+    from customer_data.etl.bossier_la import PageSink
+    sink = PageSink(Deduplicator(['pk']), writer=Collect())
+    sink.put(PAGES[0])
+    sink.put(PAGES[1])
+    assert [f['attributes']['v'] for f in sink.writer] == ['a', 'a', 'b']
+    sink.put(PAGES[2])
+    sink.finish(iter(PAGES))
+    assert len(sink.writer) == 3
+
+    sink = PageSink(Deduplicator(['pk'], 'last'), writer=Collect())
+    for page in PAGES:
+        sink.put(page)
+    assert sink.writer == []
+    sink.finish(iter(PAGES))
+    assert {f['attributes']['pk']: f['attributes']['v'] for f in sink.writer} == {1: 'c', 2: 'b', 3: 'b'}
@@ -0,0 +1,65 @@
+import numpy as np
+import shapely
+from customer_data.feature_cache import FeatureCache, FeatureCacheWriter
+from customer_data.transform import features_to_gdf
+
+META = {
+    'geometryType': 'esriGeometryPolygon',
+    'fields': [
+        {'name': 'OBJECTID', 'type': 'esriFieldTypeOID'},
+        {'name': 'OWNER', 'type': 'esriFieldTypeString'},
+        {'name': 'VALUE', 'type': 'esriFieldTypeDouble'},
+    ],
+}
+
+def square(x, y, size=1):
+    return [[x, y], [x, y + size], [x + size, y + size], [x + size, y], [x, y]]
+
+def test_cache_round_trip_matches_json_path(tmp_path):
+    features = []
+    for i in range(25):
+        rings = [square(i, 0, 4), square(i + 1, 1)[::-1]] if i % 2 else [square(i, 0), square(i + 10, 0)]
+        attributes = {'OBJECTID': i, 'OWNER': None if i % 4 == 0 else f'Owner {i}', 'VALUE': None if i % 5 == 0 else i / 2}
+        if i >= 20:
+            attributes['LATE'] = i
+        features.append({'attributes': attributes, 'geometry': None if i == 3 else {'rings': rings}})
+    path = str(tmp_path / 'features.cache')
+    with FeatureCacheWriter(path, META) as writer:
+        for start in range(0, len(features), 10):
+            writer.write_page(features[start:start + 10])
+
+    cache = FeatureCache(path)
+    expected = features_to_gdf(META, features)
+    actual = cache.to_gdf()
+    assert len(cache) == 25 and cache.columns == ['OBJECTID', 'OWNER', 'VALUE', 'LATE']
+    assert actual['OBJECTID'].tolist() == expected['OBJECTID'].tolist()
+    assert actual['OWNER'].tolist() == expected['OWNER'].tolist()
+    np.testing.assert_array_equal(actual['LATE'], expected['LATE'])
+    assert actual.geometry.iloc[3] is None
+    both = ~expected.geometry.isna()
+    assert shapely.equals_exact(actual.geometry[both].values, expected.geometry[both].values).all()
+
+    subset = cache.to_gdf(columns=['OBJECTID'], rows=[21, 2])
+    assert subset['OBJECTID'].tolist() == [21, 2]
+    assert shapely.equals_exact(subset.geometry.values, expected.geometry.values[[21, 2]]).all()
+
+
+def test_string_columns_decode_with_and_without_pyarrow(tmp_path, monkeypatch):
+    import customer_data.feature_cache as feature_cache
+    path = str(tmp_path / 'features.cache')
+    features = [{'attributes': {'OBJECTID': i, 'OWNER': None if i % 3 == 0 else f'Propriétaire {i}',
+                                'EXTRA': {'n': i} if i % 2 else None}, 'geometry': None} for i in range(12)]
+    with FeatureCacheWriter(path, META) as writer:
+        writer.write_page(features[:5])
+        writer.write_page(features[5:])
+    rows = [11, 0, 4, 7]
+    expected_owner = ['Propriétaire 11', None, 'Propriétaire 4', 'Propriétaire 7']
+    expected_extra = [{'n': 11}, None, None, {'n': 7}]
+    cache = FeatureCache(path)
+    assert cache.column('OWNER', rows).tolist() == expected_owner
+    assert cache.column('EXTRA', rows).tolist() == expected_extra
+    monkeypatch.setattr(feature_cache, '_pyarrow', lambda: None)
+    cache = FeatureCache(path)
+    assert cache.column('OWNER', rows).tolist() == expected_owner
+    assert cache.column('EXTRA', rows).tolist() == expected_extra
+    assert cache.column('OWNER', []).tolist() == []
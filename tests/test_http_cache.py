@@ -0,0 +1,117 @@
+import os
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from customer_data.http_cache import CacheMissError, REDACTED
+from customer_data.streaming import iter_json_array
+from customer_data.transport import HttpClient
+
+
+class PagesHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        PagesHandler.hits.append((self.path, self.headers.get('If-None-Match')))
+        body = b'[{"id": 1}, {"id": 2}]' if 'query' in self.path else b'{"name": "Parcels"}'
+        etag = '"v1"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Set-Cookie', 'session=secret')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        PagesHandler.hits.append((self.path, None))
+        self.rfile.read(int(self.headers['Content-Length']))
+        body = b'{"token": "real-token", "resourceGroups": ["RG1"], "user": {"accessToken": "t2"}}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = HTTPServer(('127.0.0.1', 0), PagesHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    PagesHandler.hits = []
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def client(path, mode):
+    return HttpClient(cache={'path': str(path), 'mode': mode}, sleep=lambda s: None)
+
+
+def test_record_then_replay_offline(tmp_path, base_url):
+    recorder = client(tmp_path, 'record')
+    assert recorder.get(f'{base_url}/layer', params={'f': 'pjson', 'a': 1}).json() == {'name': 'Parcels'}
+    with recorder.get(f'{base_url}/query', params={'offset': 0}, stream=True) as r:
+        assert list(iter_json_array(r.iter_content(chunk_size=4))) == [{'id': 1}, {'id': 2}]
+    assert recorder.stats()['cache']['stored'] == 2
+
+    replayer = client(tmp_path, 'replay')
+    # Parameter order does not matter, and nothing reaches the server.
+    hits = len(PagesHandler.hits)
+    resp = replayer.get(f'{base_url}/layer', params={'a': 1, 'f': 'pjson'})
+    assert resp.json() == {'name': 'Parcels'}
+    assert 'Set-Cookie' not in resp.headers
+    with replayer.get(f'{base_url}/query', params={'offset': 0}, stream=True) as r:
+        assert list(iter_json_array(r.iter_content(chunk_size=4))) == [{'id': 1}, {'id': 2}]
+    assert len(PagesHandler.hits) == hits
+    assert replayer.stats()['cache']['hits'] == 2
+    with pytest.raises(CacheMissError):
+        replayer.get(f'{base_url}/query', params={'offset': 2})
+
+
+def test_revalidate_sends_validators_and_serves_304(tmp_path, base_url):
+    client(tmp_path, 'record').get(f'{base_url}/layer')
+    client(tmp_path, 'record').get(f'{base_url}/other')  # same body, stored once
+    objects = [f for _, _, files in os.walk(tmp_path / 'objects') for f in files]
+    assert len(objects) == 1
+
+    revalidator = client(tmp_path, 'revalidate')
+    assert revalidator.get(f'{base_url}/layer').json() == {'name': 'Parcels'}
+    assert PagesHandler.hits[-1] == ('/layer', '"v1"')
+    stats = revalidator.stats()
+    assert stats['cache']['not_modified'] == 1 and stats['total']['bytes'] == 0
+
+
+def test_replay_closes_bodies_and_replays_logins_redacted(tmp_path, base_url):
+    recorder = client(tmp_path, 'record')
+    recorder.get(f'{base_url}/layer')
+    login = recorder.post(f'{base_url}/authenticate', params={'key': 's3cret'},
+                          json={'username': 'me', 'password': 'hunter2'})
+    assert login.json()['token'] == 'real-token'
+    stored = b''.join(gzip.open(p).read() if p.suffix == '.gz' else p.read_bytes()
+                      for p in tmp_path.rglob('*') if p.is_file())
+    assert b'real-token' not in stored and b't2' not in stored
+    assert b's3cret' not in stored and b'hunter2' not in stored
+
+    replayer = client(tmp_path, 'replay')
+    resp = replayer.get(f'{base_url}/layer')
+    assert resp.raw.closed
+    assert resp.json() == {'name': 'Parcels'} and list(resp.iter_content(4))
+    hits = len(PagesHandler.hits)
+    # Other credentials log in too: only the method and path are keyed.
+    login = replayer.post(f'{base_url}/authenticate', json={'username': 'x', 'password': 'y'})
+    assert login.json() == {'token': REDACTED, 'resourceGroups': ['RG1'], 'user': {'accessToken': REDACTED}}
+    with pytest.raises(CacheMissError):
+        replayer.get(f'{base_url}/authenticate')
+    assert len(PagesHandler.hits) == hits
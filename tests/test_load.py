@@ -0,0 +1,55 @@
+import pytest
+import sqlite3
+import geopandas as gpd
+import pandas as pd
+import pyogrio
+import shapely
+from customer_data.load import write_geopackage
+
+
+def test_write_geopackage_indexes_once_and_writes_owners(tmp_path):
+    path = str(tmp_path / 'out.gpkg')
+    geoms = [shapely.box(i, i, i + 1, i + 1) for i in range(10)]
+    # Only the last batch has a MultiPolygon; the layer type must still cover it.
+    geoms[9] = shapely.MultiPolygon([shapely.box(9, 9, 10, 10), shapely.box(11, 11, 12, 12)])
+    gdf = gpd.GeoDataFrame({'OBJECTID': range(10)}, geometry=geoms, crs='EPSG:4326')
+    owners = pd.DataFrame({'owner': ['A', 'B'], 'parcel_count': [3, 7]})
+
+    write_geopackage(gdf, owners, path, batch_rows=4)
+
+    hits = pyogrio.read_dataframe(path, layer='features', bbox=(7.5, 7.5, 8.5, 8.5))
+    assert sorted(hits['OBJECTID']) == [7, 8]
+    layers = dict(pyogrio.list_layers(path))
+    assert layers == {'features': 'MultiPolygon', 'owners': None}
+    assert pyogrio.read_dataframe(path, layer='owners').to_dict('list') == owners.to_dict('list')
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT count(*) FROM rtree_features_geom').fetchone() == (10,)
+
+
+def test_write_geopackage_indexes_owner_parcels(tmp_path):
+    from customer_data.transform import build_owner_index
+    path = str(tmp_path / 'out.gpkg')
+    gdf = gpd.GeoDataFrame({'PIN': ['A', 'B'], 'OWNER': ['Doe Jane', 'DOE, JANE']},
+                           geometry=[shapely.Point(0, 0), shapely.Point(1, 1)], crs='EPSG:4326')
+    owners, owner_parcels = build_owner_index(gdf, ['PIN'])
+    write_geopackage(gdf, owners, path, owner_parcels=owner_parcels, primary_key=['PIN'])
+    with sqlite3.connect(path) as conn:
+        plan = conn.execute('EXPLAIN QUERY PLAN SELECT "PIN" FROM owner_parcels WHERE owner_id = ?',
+                            (owners['owner_id'][0],)).fetchall()
+        assert 'owner_parcels_owner_id_idx' in str(plan)
+        assert conn.execute('SELECT count(*) FROM owner_parcels').fetchone() == (2,)
+
+
+def test_write_geoparquet_in_row_groups(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    from customer_data.load import write_geoparquet
+    gdf = gpd.GeoDataFrame({'OBJECTID': range(5), 'NOTE': [None, None, 'x', None, 'y']},
+                           geometry=[shapely.box(i, i, i + 1, i + 1) for i in range(4)] + [None], crs='EPSG:4326')
+    path = str(tmp_path / 'features.parquet')
+    write_geoparquet([gdf.iloc[:3], gdf.iloc[3:]], None, path, row_group_rows=2)
+    assert pq.ParquetFile(path).num_row_groups == 3
+    back = gpd.read_parquet(path)
+    assert back.crs == gdf.crs and list(back['NOTE'].dropna()) == ['x', 'y'] and back['NOTE'].isna().sum() == 3
+    assert back.geometry.iloc[:4].geom_equals(gdf.geometry.iloc[:4]).all() and back.geometry.iloc[4] is None
+    assert list(back.total_bounds) == [0, 0, 4, 4]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['features.parquet']
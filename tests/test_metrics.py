@@ -0,0 +1,35 @@
+import json
+import pytest
+from customer_data.metrics import Metrics
+from customer_data.transport import HttpClient
+
+
+def test_stages_log_and_prometheus(tmp_path):
+    log, prom = tmp_path / 'metrics.jsonl', tmp_path / 'metrics.prom'
+    metrics = Metrics(str(log), str(prom))
+    for offset in (0, 10):
+        with metrics.stage('page_fetch', 'Bossier, LA', offset=offset) as m:
+            m['records'], m['bytes'] = 10, 2048
+    with pytest.raises(RuntimeError):
+        with metrics.stage('load_geopackage', 'Bossier, LA'):
+            raise RuntimeError('disk full')
+    http = HttpClient()
+    http.record('gis.example', 0.2, 100, 40)
+    http.record('gis.example', 3.0, 100, 40)
+    snapshot = metrics.finish(http)
+
+    events = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [e['event'] for e in events] == ['stage', 'stage', 'stage', 'run']
+    assert events[1]['offset'] == 10 and events[1]['records'] == 10
+    assert events[2]['status'] == 'error'
+    pages = next(s for s in snapshot['stages'] if s['stage'] == 'page_fetch')
+    assert (pages['runs'], pages['records'], pages['bytes']) == (2, 20, 4096)
+
+    text = prom.read_text()
+    assert '# TYPE customer_data_stage_seconds_total counter' in text
+    assert 'customer_data_stage_records_total{stage="page_fetch",jurisdiction="Bossier, LA"} 20' in text
+    assert 'customer_data_stage_errors_total{stage="load_geopackage",jurisdiction="Bossier, LA"} 1' in text
+    assert 'customer_data_peak_rss_bytes ' in text
+    assert 'customer_data_http_request_duration_seconds_bucket{host="gis.example",le="0.25"} 1' in text
+    assert 'customer_data_http_request_duration_seconds_bucket{host="gis.example",le="+Inf"} 2' in text
+    assert 'customer_data_http_request_duration_seconds_count{host="gis.example"} 2' in text
@@ -0,0 +1,61 @@
+import pandas as pd
+import shapely
+from customer_data.feature_cache import write_feature_cache, FeatureCache
+from customer_data.parallel_transform import cache_to_gdf_parallel, features_to_gdf_parallel
+from customer_data.transform import build_owner_index, deduplicate_gdf, features_to_gdf
+
+META = {
+    'geometryType': 'esriGeometryPolygon',
+    'fields': [
+        {'name': 'PIN', 'type': 'esriFieldTypeString'},
+        {'name': 'OWNER1', 'type': 'esriFieldTypeString'},
+        {'name': 'OWNER2', 'type': 'esriFieldTypeString'},
+        {'name': 'OWNER_ADDRESS', 'type': 'esriFieldTypeString'},
+    ],
+}
+
+def features(n=95):
+    out = []
+    for i in range(n):
+        attributes = {'PIN': f'P{i % 80}', 'OWNER1': ('Doe, Jane', 'DOE JANE', 'Acme Company', None)[i % 4],
+                      'OWNER2': 'Smith John' if i % 3 == 0 else None, 'OWNER_ADDRESS': f'{i % 5} Main Street'}
+        if i >= 60:
+            attributes['VALUE'] = i  # only in later chunks
+        out.append({'attributes': attributes,
+                    'geometry': None if i == 7 else {'rings': [[[i, 0], [i, 1], [i + 1, 1], [i + 1, 0], [i, 0]]]}})
+    return out
+
+def assert_same(actual, expected):
+    pd.testing.assert_frame_equal(pd.DataFrame(actual.drop(columns='geometry')),
+                                  pd.DataFrame(expected.drop(columns='geometry')))
+    assert shapely.equals_exact(actual.geometry.values, expected.geometry.values).tolist() == \
+        (~expected.geometry.isna()).tolist()
+
+
+def test_cache_transform_in_chunks_matches_single_process(tmp_path):
+    path = str(tmp_path / 'features.cache')
+    write_feature_cache(path, META, features(), page_size=30)
+    expected = FeatureCache(path).to_gdf()
+    owners, owner_parcels = build_owner_index(expected, ['PIN'])
+
+    gdf, chunk_owners, chunk_owner_parcels = cache_to_gdf_parallel(path, workers=2, chunk_rows=20,
+                                                                   primary_key=['PIN'], owners=True)
+    assert_same(gdf, expected)
+    assert gdf.crs == expected.crs
+    pd.testing.assert_frame_equal(chunk_owners, owners)
+    pd.testing.assert_frame_equal(chunk_owner_parcels, owner_parcels)
+
+
+def test_feature_list_dedups_across_chunks(tmp_path):
+    feats = features()
+    expected = deduplicate_gdf(features_to_gdf(META, feats), ['PIN'])
+    owners, owner_parcels = build_owner_index(expected, ['PIN'])
+
+    gdf, chunk_owners, chunk_owner_parcels = features_to_gdf_parallel(META, feats, workers=2, chunk_rows=25,
+                                                                      primary_key=['PIN'], deduplicate=True,
+                                                                      owners=True)
+    assert len(gdf) == 80
+    assert gdf.index.tolist() == expected.index.tolist()
+    assert_same(gdf, expected)
+    pd.testing.assert_frame_equal(chunk_owners, owners)
+    pd.testing.assert_frame_equal(chunk_owner_parcels, owner_parcels)
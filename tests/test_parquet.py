@@ -0,0 +1,28 @@
+import pytest
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+from customer_data.parquet import ParquetRecordWriter
+
+
+def test_columns_first_seen_late_widen_the_file(tmp_path):
+    path = str(tmp_path / 'out.parquet')
+    records = [{'id': i, 'name': f'n{i}'} for i in range(5)]
+    records += [{'id': 5, 'late': 1.5}, {'id': 6, 'name': 'n6', 'later': None}, {'id': 7, 'later': 'x'}]
+    with ParquetRecordWriter(path, row_group_rows=2) as writer:
+        writer.write_many(records)
+    assert writer.widened == 2
+    table = pq.read_table(path)
+    assert table.column_names == ['id', 'name', 'late', 'later']
+    assert table.to_pylist() == [
+        {'id': r['id'], 'name': r.get('name'), 'late': r.get('late'), 'later': r.get('later')} for r in records]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out.parquet']
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = str(tmp_path / 'out.parquet')
+    with pytest.raises(RuntimeError):
+        with ParquetRecordWriter(path, row_group_rows=2) as writer:
+            writer.write_many({'id': i} for i in range(5))
+            raise RuntimeError('source failed')
+    assert list(tmp_path.iterdir()) == []
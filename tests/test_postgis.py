@@ -0,0 +1,62 @@
+import os
+import geopandas as gpd
+import psycopg2
+import pytest
+import shapely
+from customer_data.load import bulk_load, upsert_load, write_postgis
+
+DSN = os.environ.get('CUSTOMER_DATA_TEST_DSN')
+needs_db = pytest.mark.skipif(not DSN, reason='set CUSTOMER_DATA_TEST_DSN to a scratch PostGIS database')
+
+
+def parcels(ids, values):
+    return gpd.GeoDataFrame({'PIN': ids, 'VALUE': values},
+                            geometry=[shapely.box(i, i, i + 1, i + 1) for i in range(len(ids))], crs='EPSG:4326')
+
+
+def test_case_insensitive_column_collisions_are_rejected():
+    gdf = parcels(['A'], [1]).assign(ParcelID=1, PARCELID=2)
+    with pytest.raises(ValueError, match="'PARCELID' collides with 'ParcelID'"):
+        bulk_load(None, 'features', gdf, geom=gdf.geometry.values)
+    with pytest.raises(ValueError, match='row_hash'):
+        upsert_load(None, 'features', gdf[['PIN', 'geometry']].assign(ROW_HASH=1), ['PIN'], geom=gdf.geometry.values)
+
+
+@pytest.fixture
+def conn():
+    conn = psycopg2.connect(DSN)
+    yield conn
+    with conn.cursor() as cur:
+        for table in ('features', 'features_staging', 'owners', 'owner_parcels'):
+            cur.execute(f'DROP TABLE IF EXISTS {table}')
+    conn.commit()
+    conn.close()
+
+
+def rows(conn):
+    with conn.cursor() as cur:
+        cur.execute('SELECT pin, value FROM features ORDER BY pin')
+        return cur.fetchall()
+
+
+@needs_db
+def test_replace_swaps_in_a_keyed_table(conn):
+    write_postgis(parcels(['A', 'B'], [1, 2]), None, DSN, primary_key=['PIN'])
+    write_postgis(parcels(['A', 'C'], [5, 6]), None, DSN, primary_key=['PIN'])
+    assert rows(conn) == [('A', 5), ('C', 6)]
+    with conn.cursor() as cur:
+        cur.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'features' ORDER BY indexname")
+        assert [r[0] for r in cur.fetchall()] == ['features_geom_idx', 'features_key_idx']
+        cur.execute("SELECT to_regclass('features_staging')")
+        assert cur.fetchone() == (None,)
+
+
+@needs_db
+def test_upsert_applies_changes_and_drops_null_keys(conn, capsys):
+    write_postgis(parcels(['A', 'B', 'C'], [1, 2, 3]), None, DSN, 'upsert', ['PIN'])
+    write_postgis(parcels(['A', 'B', 'D', None], [1, 20, 4, 9]), None, DSN, 'upsert', ['PIN'])
+    out = capsys.readouterr().out
+    assert '1 inserted, 1 updated, 1 deleted' in out and 'dropping 1 row(s) of features' in out
+    write_postgis(parcels(['A', 'B', 'D', None], [1, 20, 4, 9]), None, DSN, 'upsert', ['PIN'])
+    assert '0 inserted, 0 updated, 0 deleted' in capsys.readouterr().out
+    assert rows(conn) == [('A', 1), ('B', 20), ('D', 4)]
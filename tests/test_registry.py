@@ -0,0 +1,37 @@
+import sys
+import json
+import subprocess
+import pytest
+
+from customer_data.registry import load_etl_class, etl_spec, available_api_types
+
+
+def test_builtin_api_types_resolve():
+    assert {'bossier', 'tulsa', 'wayne_ky'} <= set(available_api_types())
+    assert load_etl_class('tulsa').__name__ == 'TulsaOKETL'
+    # No async Tulsa ETL: the async engine falls back to the threaded one.
+    assert etl_spec('tulsa', 'async') == etl_spec('tulsa')
+
+
+def test_config_etl_class_overrides():
+    cfg = {'api_type': 'bossier', 'etl_class': 'customer_data.etl.tulsa_ok:TulsaOKETL'}
+    assert load_etl_class('bossier', cfg=cfg).__name__ == 'TulsaOKETL'
+    with pytest.raises(ValueError, match='package.module:Class'):
+        load_etl_class('bossier', cfg={'etl_class': 'customer_data.etl.tulsa_ok'})
+
+
+def test_unknown_api_type():
+    with pytest.raises(ValueError, match='Unsupported api_type: nowhere'):
+        load_etl_class('nowhere')
+    with pytest.raises(ValueError, match='engine'):
+        load_etl_class('tulsa', engine='threads')
+
+
+@pytest.mark.parametrize('api_type', ['tulsa', 'wayne_ky'])
+def test_resolving_etl_skips_geo_stack(api_type):
+    code = ("import sys, json, customer_data.__main__\n"
+            "from customer_data.extract import get_etl_class\n"
+            f"get_etl_class({api_type!r})\n"
+            "print(json.dumps(sorted(m for m in ('numpy', 'pandas', 'geopandas', 'shapely') if m in sys.modules)))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert json.loads(out) == []
@@ -0,0 +1,70 @@
+import json
+import numpy as np
+import geopandas as gpd
+import shapely
+from customer_data.load import write_geopackage
+from customer_data.spatial_index import SpatialIndex, build_spatial_index, main, build_main
+
+
+def parcels(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 10, (n, 2))
+    geoms = shapely.buffer(shapely.points(centers), rng.uniform(0.05, 0.6, n), quad_segs=3)
+    geoms[7] = None
+    return gpd.GeoDataFrame({'PARCEL_ID': [f'P{i}' for i in range(n)], 'OBJECTID': np.arange(n)},
+                            geometry=geoms, crs='EPSG:4326')
+
+
+def test_point_and_bbox_queries_match_strtree(tmp_path):
+    gdf = parcels()
+    build_spatial_index(gdf, str(tmp_path / 'idx'), ['PARCEL_ID', 'OBJECTID'])
+    index = SpatialIndex(str(tmp_path / 'idx'))
+    assert len(index) == len(gdf) - 1 and index.crs == 'EPSG:4326'
+    tree = shapely.STRtree(gdf.geometry.values)
+
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(-1, 11, 2000), rng.uniform(-1, 11, 2000)
+    query, position = index.query_points(x, y)
+    expected = tree.query(shapely.points(x, y), predicate='intersects')
+    assert sorted(zip(query.tolist(), index.rows(position).tolist())) == sorted(zip(*expected.tolist()))
+
+    located = index.locate(x, y)
+    hit = located >= 0
+    assert set(np.flatnonzero(hit)) == set(expected[0])
+    assert [k['PARCEL_ID'] for k in index.keys(located[hit])] == [f'P{r}' for r in index.rows(located[hit])]
+
+    boxes = [[1, 1, 2, 3], [20, 20, 21, 21]]
+    query, position = index.query_bbox(boxes)
+    expected = tree.query(shapely.box(*np.asarray(boxes).T), predicate='intersects')
+    assert sorted(zip(query.tolist(), index.rows(position).tolist())) == sorted(zip(*expected.tolist()))
+    candidates, _ = index.query_bbox(boxes, predicate=None)
+    assert len(candidates) >= len(query)
+
+
+def test_cli_builds_from_geopackage_and_queries(tmp_path, capsys):
+    gdf = parcels(50)
+    gpkg = str(tmp_path / 'out.gpkg')
+    write_geopackage(gdf, None, gpkg)
+    assert build_main([gpkg, str(tmp_path / 'idx'), '--key', 'PARCEL_ID']) == 0
+    inside = gdf.geometry.iloc[3].representative_point()
+    points = tmp_path / 'points.csv'
+    points.write_text(f"lon,lat\n{inside.x},{inside.y}\n50,50\n")
+    capsys.readouterr()
+
+    assert main([str(tmp_path / 'idx'), '--points', str(points), '--bbox', '-100,-100,-99,-99']) == 0
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(results) == 2
+    assert results[0]['match'] is not None
+    assert gdf.geometry.iloc[results[0]['row']].intersects(inside)
+    assert results[0]['match']['PARCEL_ID'] == f"P{results[0]['row']}"
+    assert results[1] == {'x': 50.0, 'y': 50.0, 'row': None, 'match': None}
+
+
+def test_nullable_string_keys(tmp_path):
+    gdf = parcels(20)
+    gdf['PARCEL_ID'] = gdf['PARCEL_ID'].astype('string')
+    gdf.loc[3, 'PARCEL_ID'] = None
+    build_spatial_index(gdf, str(tmp_path / 'idx'), ['PARCEL_ID'])
+    index = SpatialIndex(str(tmp_path / 'idx'))
+    keys = {r: k['PARCEL_ID'] for r, k in zip(index.rows(np.arange(len(index))), index.keys(np.arange(len(index))))}
+    assert keys[3] is None and keys[4] == 'P4'
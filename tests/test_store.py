@@ -0,0 +1,49 @@
+from customer_data.store import RecordStore
+
+
+def test_upsert_delete_and_watermark(tmp_path):
+    with RecordStore(str(tmp_path / 'sync.sqlite')) as store:
+        rows = [(RecordStore.make_key({'pk': i}, ['pk']), i, {'pk': i, 'v': 0}) for i in range(5)]
+        store.upsert(rows)
+        store.upsert([(RecordStore.make_key({'pk': 2}, ['pk']), 2, {'pk': 2, 'v': 1})])
+        assert store.count() == 5
+        assert store.get(RecordStore.make_key({'pk': 2}, ['pk']))['v'] == 1
+
+        assert store.delete_missing_refs([0, 1, 2]) == 2
+        assert sorted(r['pk'] for r in store.iter_records()) == [0, 1, 2]
+
+        assert store.get_watermark('layer') is None
+        store.set_watermark('layer', 1700000000000)
+    with RecordStore(str(tmp_path / 'sync.sqlite')) as store:
+        assert store.get_watermark('layer') == 1700000000000
+
+
+def test_tulsa_sync_watermark_follows_data(tmp_path, monkeypatch):
+    import pytest
+    from customer_data.etl.tulsa_ok import TulsaOKETL
+    records = [{'ParcelNumber': 'A', 'LastModified': '2025-06-10T14:23:00'},
+               {'ParcelNumber': 'B', 'LastModified': '2025-06-12T08:00:00Z'},
+               {'ParcelNumber': 'C'}]
+    cfg = {'sync_path': str(tmp_path / 'tulsa_{data_type}.sqlite'), 'primary_key': ['OBJECTID'],
+           'output': {'json': str(tmp_path / 'tulsa.json')}}
+    etl = TulsaOKETL(dict(cfg, sync_keys={'all': ['ParcelNumber']}))
+    monkeypatch.setattr(etl, 'iter_tulsa_data', lambda url, token, since: iter(records))
+    assert etl.sync_incremental('url', 'token', 'all') == 3
+    with RecordStore(str(tmp_path / 'tulsa_all.sqlite')) as store:
+        assert store.get_watermark('all') == '06-12-2025'
+    with pytest.raises(ValueError, match='sync_keys.all'):
+        TulsaOKETL(cfg).sync_incremental('url', 'token', 'all')
+
+
+def test_parse_modified_dotnet_timestamps():
+    from datetime import datetime
+    from customer_data.etl.tulsa_ok import _iso_for_python, parse_modified
+    # Forms datetime.fromisoformat rejects before Python 3.11.
+    assert _iso_for_python('2024-03-05T10:20:30.1234567Z') == '2024-03-05T10:20:30.123456+00:00'
+    assert _iso_for_python('2024-03-05T10:20:30.5-0500') == '2024-03-05T10:20:30.500000-05:00'
+    assert parse_modified('2024-03-05T10:20:30.1234567Z') == datetime(2024, 3, 5, 10, 20, 30, 123456)
+    assert parse_modified('2024-03-05T10:20:30.5-0500') == datetime(2024, 3, 5, 15, 20, 30, 500000)
+    assert parse_modified('2024-03-05T10:20:30Z') == datetime(2024, 3, 5, 10, 20, 30)
+    assert parse_modified('03-05-2024') == datetime(2024, 3, 5)
+    assert parse_modified('2024-03-05') == datetime(2024, 3, 5)
+    assert parse_modified(1709634030000) == datetime(2024, 3, 5, 10, 20, 30)
@@ -0,0 +1,61 @@
+import csv
+import json
+import pytest
+
+from customer_data.streaming import iter_json_array, write_records, JsonArrayWriter
+
+RECORDS = [
+    {'parcel': 'A1', 'price': 125000, 'note': 'café, "quoted" ] [ {'},
+    {'parcel': 'B2', 'price': -1.5e3, 'extra': [1, 2, {'x': None}]},
+    {'parcel': 'C3', 'flag': True},
+]
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_iter_json_array_across_chunk_boundaries():
+    data = b'\xef\xbb\xbf ' + json.dumps(RECORDS + [12345, 'tail']).encode('utf-8')
+    for size in (1, 2, 7, 64, 4096):
+        assert list(iter_json_array(chunked(data, size))) == RECORDS + [12345, 'tail']
+
+
+def test_iter_json_array_non_array_and_empty():
+    assert list(iter_json_array([b'{"error": ', b'"nope"}'])) == [{'error': 'nope'}]
+    assert list(iter_json_array([b' [ ] '])) == []
+
+
+def test_write_records_matches_json_dump(tmp_path):
+    json_path = tmp_path / 'out.json'
+    csv_path = tmp_path / 'out.csv'
+    assert write_records(iter(RECORDS), str(json_path), str(csv_path)) == 3
+    assert json_path.read_text() == json.dumps(RECORDS, indent=2)
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ['extra', 'flag', 'note', 'parcel', 'price']
+    assert [r['parcel'] for r in rows] == ['A1', 'B2', 'C3']
+    assert not list(tmp_path.glob('*.ndjson'))
+
+
+def test_json_array_writer_compact(tmp_path):
+    for records in (RECORDS, []):
+        path = tmp_path / 'compact.json'
+        with JsonArrayWriter(str(path), indent=None) as writer:
+            for record in records:
+                writer.write(record)
+        assert path.read_text() == json.dumps(records)
+
+
+def test_write_records_leaves_nothing_when_the_stream_fails(tmp_path):
+    json_path, csv_path = tmp_path / 'out.json', tmp_path / 'out.csv'
+    json_path.write_text('"previous run"')
+
+    def failing():
+        yield from RECORDS
+        raise ConnectionError('stream cut')
+
+    with pytest.raises(ConnectionError):
+        write_records(failing(), str(json_path), str(csv_path))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['out.json']
+    assert json_path.read_text() == '"previous run"'
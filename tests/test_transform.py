@@ -0,0 +1,85 @@
+import numpy as np
+import geopandas as gpd
+from customer_data.transform import esri_json_to_shapely_array, features_to_gdf, _flatten, _ring_areas
+
+# ESRI winding: shells clockwise, holes counter-clockwise.
+SHELL = [[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]]
+HOLE = [[2, 2], [4, 2], [4, 4], [2, 4], [2, 2]]
+SHELL2 = [[20, 0], [20, 10], [30, 10], [30, 0], [20, 0]]
+HOLE2 = [[22, 2], [24, 2], [24, 4], [22, 4], [22, 2]]
+
+
+def test_polygon_keeps_holes():
+    [geom] = esri_json_to_shapely_array([{'rings': [SHELL, HOLE]}])
+    assert geom.geom_type == 'Polygon'
+    assert len(geom.interiors) == 1
+    assert geom.area == 100 - 4
+
+
+def test_holes_are_matched_to_containing_shell():
+    [geom] = esri_json_to_shapely_array([{'rings': [SHELL, SHELL2, HOLE2, HOLE]}])
+    assert geom.geom_type == 'MultiPolygon'
+    assert [len(p.interiors) for p in geom.geoms] == [1, 1]
+    assert geom.area == 2 * (100 - 4)
+
+
+def test_counter_clockwise_only_rings_are_shells():
+    [geom] = esri_json_to_shapely_array([{'rings': [HOLE]}])
+    assert geom.geom_type == 'Polygon' and geom.area == 4
+
+
+def test_mixed_batch():
+    geoms = esri_json_to_shapely_array([
+        {'x': 1.5, 'y': 2.5},
+        None,
+        {'paths': [[[0, 0], [1, 1]]]},
+        {'paths': [[[0, 0], [1, 1]], [[2, 2], [3, 3, 7]]]},
+        {'rings': [[[0, 0], [1, 1]]]},
+        {'rings': [SHELL]},
+    ])
+    assert geoms[0].coords[0] == (1.5, 2.5)
+    assert geoms[1] is None
+    assert geoms[2].geom_type == 'LineString'
+    assert geoms[3].geom_type == 'MultiLineString'
+    assert geoms[4] is None
+    assert geoms[5].area == 100
+
+
+def test_features_to_gdf():
+    features = [
+        {'attributes': {'OBJECTID': 1}, 'geometry': {'rings': [SHELL, HOLE]}},
+        {'attributes': {'OBJECTID': 2}, 'geometry': None},
+    ]
+    gdf = features_to_gdf({}, features)
+    assert list(gdf['OBJECTID']) == [1, 2]
+    assert gdf.geometry.iloc[0].area == 96
+    assert gdf.geometry.iloc[1] is None
+
+def test_build_owner_index_merges_spelling_variants():
+    from customer_data.transform import build_owner_index
+    gdf = gpd.GeoDataFrame({
+        'PIN': ['A', 'B', 'C'],
+        'OwnerName': ['Smith, John A.', 'SMITH JOHN A', 'Acme Holdings L.L.C.'],
+        'OwnerAddress': ['12 Main Street', '12 MAIN ST.', 'P.O. Box 9'],
+    }, geometry=[None, None, None])
+    owners, owner_parcels = build_owner_index(gdf, ['PIN'])
+    assert sorted(owners['owner_name']) == ['ACME HOLDINGS LLC', 'SMITH JOHN A']
+    smith = owners.set_index('owner_name').loc['SMITH JOHN A']
+    assert smith['owner_address'] == '12 MAIN ST' and smith['parcel_count'] == 2
+    assert sorted(owner_parcels.loc[owner_parcels['owner_id'] == smith['owner_id'], 'PIN']) == ['A', 'B']
+
+
+def test_ring_winding_of_many_small_rings_at_lon_lat_offsets():
+    # Parcel-sized rings (~1 m) near Bossier City; late rings must not lose
+    # their sign to rounding in sums accumulated over the earlier ones.
+    rng = np.random.default_rng(0)
+    size = 1e-5
+    parts = []
+    for i in range(20000):
+        x, y = -93.7 + rng.uniform(0, 0.5), 32.5 + rng.uniform(0, 0.5)
+        ring = [[x, y], [x, y + size], [x + size, y + size], [x + size, y], [x, y]]
+        parts.append((i, [ring if i % 2 else ring[::-1]]))
+    coords, _, starts, lengths = _flatten(parts, 4)
+    areas = _ring_areas(coords, starts, lengths)
+    np.testing.assert_allclose(np.abs(areas), 2 * size * size, rtol=1e-6)
+    assert ((areas < 0) == (np.arange(len(parts)) % 2 == 1)).all()
@@ -0,0 +1,92 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from customer_data.transport import HttpClient
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    failures = 0
+
+    def do_GET(self):
+        if FlakyHandler.failures:
+            FlakyHandler.failures -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'{"count": 3}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = HTTPServer(('127.0.0.1', 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_retries_5xx_and_counts_bytes():
+    server = serve()
+    try:
+        FlakyHandler.failures = 2
+        delays = []
+        client = HttpClient(max_retries=3, sleep=delays.append)
+        resp = client.get(f'http://127.0.0.1:{server.server_port}/query')
+        assert resp.json() == {'count': 3}
+        assert len(delays) == 2
+        total = client.stats()['total']
+        assert total['requests'] == 3
+        assert total['retries'] == 2
+        assert total['bytes'] == len(b'{"count": 3}')
+    finally:
+        server.shutdown()
+
+
+def test_gives_up_after_max_retries():
+    server = serve()
+    try:
+        FlakyHandler.failures = 5
+        client = HttpClient(max_retries=1, sleep=lambda s: None)
+        resp = client.get(f'http://127.0.0.1:{server.server_port}/query')
+        assert resp.status_code == 503
+    finally:
+        FlakyHandler.failures = 0
+        server.shutdown()
+
+
+def test_post_is_retried_only_when_the_caller_opts_in():
+    server = serve()
+    url = f'http://127.0.0.1:{server.server_port}/query'
+    try:
+        client = HttpClient(max_retries=3, sleep=lambda s: None)
+        FlakyHandler.failures = 1
+        assert client.post(url, json={}).status_code == 503
+        FlakyHandler.failures = 1
+        assert client.post(url, json={}, retry=True).status_code == 200
+        assert client.stats()['total']['retries'] == 1
+    finally:
+        FlakyHandler.failures = 0
+        server.shutdown()
+
+
+def test_streamed_bytes_and_latency_are_counted():
+    server = serve()
+    try:
+        client = HttpClient(sleep=lambda s: None)
+        resp = client.get(f'http://127.0.0.1:{server.server_port}/query', stream=True)
+        assert client.stats()['total']['bytes'] == 0
+        assert b''.join(resp.iter_content(4)) == b'{"count": 3}'
+        client.get(f'http://127.0.0.1:{server.server_port}/query')
+        total = client.stats()['total']
+        assert total['bytes'] == total['wire_bytes'] == 2 * len(b'{"count": 3}')
+        assert sum(total['latency']) == total['requests'] == 2
+    finally:
+        server.shutdown()
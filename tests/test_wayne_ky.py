@@ -0,0 +1,69 @@
+import re
+import json
+import sqlite3
+
+import pytest
+
+from customer_data.checkpoint import PageSpool
+from customer_data.etl.wayne_ky import WayneKYETL
+
+# 30 rows whose first column has only three values, plus one exact duplicate row.
+ROWS = [(f'D{i % 3}', i, f'name {i}') for i in range(30)] + [('D0', 0, 'name 0')]
+
+
+class SqliteWayne(WayneKYETL):
+    """Answers Adhoc queries from SQLite, shuffling rows that tie under ORDER BY
+    the way SQL Server is free to."""
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        self.db = sqlite3.connect(':memory:')
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('CREATE TABLE SALES (District TEXT, SaleId INTEGER, Name TEXT)')
+        self.db.executemany('INSERT INTO SALES VALUES (?, ?, ?)', ROWS)
+        self.queries = []
+
+    def iter_adhoc_query(self, api_base_url, token, query):
+        self.queries.append(query)
+        sql = re.sub(r'OFFSET (\d+) ROWS FETCH NEXT (\d+) ROWS ONLY', r'LIMIT \2 OFFSET \1', query)
+        top = re.match(r'SELECT TOP (\d+) (.*)$', sql)
+        if top:
+            sql = f'SELECT {top.group(2)} LIMIT {top.group(1)}'
+        sql = re.sub(r'ORDER BY (.*?)( LIMIT|$)', r'ORDER BY \1, random()\2', sql)
+        return [dict(row) for row in self.db.execute(sql)]
+
+
+def export(tmp_path, key=None, spool=None):
+    etl = SqliteWayne({'api_type': 'wayne_ky'})
+    path = tmp_path / 'sales.ndjson'
+    rows = etl.run_chunked_query('', 'token', 'SALES', str(path), 4, key, spool)
+    return rows, [tuple(json.loads(line).values()) for line in path.read_text().splitlines()], etl.queries
+
+
+def test_offset_chunks_order_by_every_column(tmp_path):
+    for _ in range(3):
+        (tmp_path / 'sales.ndjson').unlink(missing_ok=True)
+        rows, exported, queries = export(tmp_path)
+        assert rows == len(ROWS) and sorted(exported) == sorted(ROWS)
+    assert queries[0] == 'SELECT TOP 1 * FROM SALES'
+    assert 'ORDER BY [District], [SaleId], [Name] OFFSET 4 ROWS' in queries[2]
+
+
+def test_composite_key_chunks_and_resume(tmp_path):
+    spool = PageSpool(str(tmp_path / '.checkpoint'), {})
+    etl = SqliteWayne({'api_type': 'wayne_ky'})
+    etl.db.execute('DELETE FROM SALES WHERE rowid = 31')
+    path = str(tmp_path / 'sales.ndjson')
+    state, parquet = etl.open_chunked_output('SALES', path, spool)
+    with open(path, 'ab') as f:
+        query = etl.chunk_query('SALES', 4, ['District', 'SaleId'])
+        etl.write_chunk(f, parquet, etl.iter_adhoc_query('', '', query), 'SALES', ['District', 'SaleId'], state, spool)
+    assert etl.run_chunked_query('', '', 'SALES', path, 4, ['District', 'SaleId'], spool) == 30
+    assert "WHERE District > 'D0' OR (District = 'D0' AND SaleId > 9)" in etl.queries[1]
+    exported = [tuple(json.loads(line).values()) for line in open(path)]
+    assert exported == sorted(ROWS[:30])
+
+
+def test_non_unique_key_fails(tmp_path):
+    with pytest.raises(ValueError, match='not unique'):
+        export(tmp_path, key='District')